@@ -0,0 +1,49 @@
+import Lean
+open Lean Meta
+
+-- this file implements a lean program that streams every constant in the environment to stdout as a line of json
+-- this gives the type of every declaration from a single lean run, rather than running '#check' once per declaration
+-- usage: lake exe exportEnv [module names] (the LeanBackend module is exported if no modules are given)
+-- each line has the form {"name": ..., "type": ..., "module": ..., "kind": ...}
+
+-- the following function names the kind of a constant
+def constant_kind : ConstantInfo → String
+  | .axiomInfo _   => "axiom"
+  | .defnInfo _    => "def"
+  | .thmInfo _     => "theorem"
+  | .opaqueInfo _  => "opaque"
+  | .quotInfo _    => "quot"
+  | .inductInfo _  => "inductive"
+  | .ctorInfo _    => "constructor"
+  | .recInfo _     => "recursor"
+
+-- the following function decides if a constant is exported, internal, private, and automatically generated constants are skipped
+def is_exported (env : Environment) (name : Name) (info : ConstantInfo) : Bool :=
+  !name.isInternal && !isPrivateName name && !isAuxRecursor env name && !isNoConfusion env name && !info.isUnsafe
+
+-- the following function writes a line of json for each exported constant
+def export_constants (stdout : IO.FS.Stream) : CoreM Unit := do
+  let env ← getEnv
+  for (name, info) in env.constants.toList do
+    if is_exported env name info then
+      let module := match env.getModuleIdxFor? name with
+        | some idx => env.header.moduleNames[idx.toNat]!.toString
+        | none     => ""
+      try
+        -- the type is printed on a single line, the same way '#check' would print it
+        let type ← MetaM.run' (ppExpr info.type)
+        stdout.putStrLn (Json.compress (Json.mkObj [
+          ("name", toJson name.toString),
+          ("type", toJson (type.pretty 1000000)),
+          ("module", toJson module),
+          ("kind", toJson (constant_kind info))
+        ]))
+      catch _ =>
+        pure ()
+  stdout.flush
+
+def main (args : List String) : IO Unit := do
+  initSearchPath (← findSysroot)
+  let modules := if args.isEmpty then [`LeanBackend] else args.map String.toName
+  let env ← importModules (modules.toArray.map ({ module := · })) {} 0
+  let _ ← (export_constants (← IO.getStdout)).toIO { fileName := "<export>", fileMap := default } { env := env }
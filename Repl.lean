@@ -0,0 +1,78 @@
+import Lean
+open Lean Elab
+
+-- this file implements a long lived lean process that elaborates lean scripts sent over stdin
+-- each script is terminated by a line containing only the end of query marker, and all of the messages
+-- produced while elaborating the script are written to stdout followed by the same marker
+-- environments are cached by their imports, so a set of imports is only loaded again once it has been evicted from the cache
+
+def end_of_query_marker := "-- END_OF_QUERY"
+
+-- the following function reads lines from the stream until the end of query marker is reached
+-- none is returned once the stream has been closed
+partial def read_query (stream : IO.FS.Stream) (acc : String := "") : IO (Option String) := do
+  let line ← stream.getLine
+  if line.isEmpty then
+    return none
+  else if line.trimRight = end_of_query_marker then
+    return some acc
+  else
+    read_query stream (acc ++ line)
+
+-- below is the number of environments kept besides the first one loaded, each can take gigabytes once mathlib is imported
+def max_cached_environments := 4
+
+-- the regions an environment was loaded into are only released by hand, which is safe once nothing refers to the environment
+unsafe def free_environment_unsafe (env : Environment) : IO Unit := env.freeRegions
+@[implemented_by free_environment_unsafe] opaque free_environment (env : Environment) : IO Unit
+
+-- the following function returns the environment for a set of imports, loading it if it isn't cached
+-- the cache holds the first environment loaded, which is kept for the life of the process since almost every script shares
+-- it (eg. LeanBackend on its own), followed by the most recently used others, most recent first
+-- so that a run over many files doesn't keep an environment for each one, the least recently used is freed past the limit
+def lookup_environment (env_cache : IO.Ref (List (String × Environment))) (imports : Array Import) : IO Environment := do
+  let key := toString (imports.map (·.module))
+  match ← env_cache.get with
+  | [] =>
+    let env ← importModules imports {} 0
+    env_cache.set [(key, env)]
+    return env
+  | base :: recent =>
+    if base.1 = key then
+      return base.2
+    let env ← match List.lookup key recent with
+      | some env => pure env
+      | none => importModules imports {} 0
+    let recent := (key, env) :: recent.filter (·.1 != key)
+    env_cache.set (base :: recent.take max_cached_environments)
+    for (_, evicted) in recent.drop max_cached_environments do
+      free_environment evicted
+    return env
+
+-- the following function elaborates a single script, reusing the cached environment if its imports have been loaded before
+def run_query (env_cache : IO.Ref (List (String × Environment))) (input : String) : IO String := do
+  let input_ctx := Parser.mkInputContext input "<query>"
+  let (header, parser_state, messages) ← Parser.parseHeader input_ctx
+  let env ← lookup_environment env_cache (headerToImports header)
+  let command_state := Command.mkState env messages {}
+  let s ← IO.processCommands input_ctx parser_state command_state
+  -- messages are rendered the same way as the lean executable renders them
+  let mut output := ""
+  for msg in s.commandState.messages.toList do
+    output := output ++ (← msg.toString)
+  return output
+
+def main : IO Unit := do
+  initSearchPath (← findSysroot)
+  let stdin ← IO.getStdin
+  let stdout ← IO.getStdout
+  let env_cache ← IO.mkRef ([] : List (String × Environment))
+  repeat
+    match ← read_query stdin with
+    | none => break
+    | some query =>
+      -- errors raised while importing (eg. unknown package) are reported like elaboration errors
+      let output ← tryCatch (run_query env_cache query) (λ e => pure s!"<query>:1:0: error: {e}\n")
+      stdout.putStr output
+      stdout.putStrLn end_of_query_marker
+      stdout.flush
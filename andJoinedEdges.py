@@ -0,0 +1,77 @@
+# this file implements the and-joined theorems of the derivation graph as virtual edges
+# populateGraphWithAndJoinedArgs adds an edge for every way of and-joining the first arguments of every multi-argument theorem,
+# which grows the graph quickly with the number of arguments, even though almost none of these edges are ever used
+# instead, the edges leaving a conjunction node can be generated when a search reaches it, and the lambda naming
+# the derived theorem is only built for the edges on the path that is returned
+from typeTerms import TypeTable, TypeTerm
+from typing import Iterator, NamedTuple
+
+
+# this function builds the name of a theorem derived from a multi-argument theorem by and-joining its first i+1 arguments
+def andJoinedName(objectName : str, newFuncInput : str, i : int) -> str:
+    return f'''(fun (args : {newFuncInput}) =>
+                        {objectName} ({") (".join(["args" + j*".right" + (".left" if j < i else "") for j in range(i+1)])}))'''
+
+# below is a class used to store a virtual edge, which is enough to build its edge data if it ends up on a path
+class AndJoinedEdge(NamedTuple):
+    objectName : str # the name of the multi-argument theorem the edge is derived from
+    input : str # the and-joined input type of the edge
+    i : int # the number of and-joined arguments minus one
+    importPath : str
+
+    def data(self) -> dict:
+        return {'objectName': andJoinedName(self.objectName, self.input, self.i), 'importPath': self.importPath}
+
+# below is a class that generates the and-joined edges of a derivation graph on demand
+# the graph can be a networkx graph or a compact graph, and should be the output of generateDerivationGraph
+class AndJoinedEdges:
+    def __init__(self, G, typeTable : TypeTable = None):
+        self.G = G
+        self.typeTable = TypeTable() if typeTable is None else typeTable
+        self.expanded = {} # maps each node to the list of (target, edge) pairs leaving it
+        self.outputs = None # the types the virtual edges can lead to, found when they are first needed (see isOutput)
+
+    # this function returns the (target, edge) pairs of the virtual edges leaving a node
+    def successors(self, node : str) -> list[tuple[str, AndJoinedEdge]]:
+        if not node in self.expanded:
+            self.expanded[node] = list(self.expand(node))
+        return self.expanded[node]
+
+    def expand(self, node : str) -> Iterator[tuple[str, AndJoinedEdge]]:
+        # a conjunction 'arg1 ∧ arg2 ∧ ... ∧ argN' can be the and-joined input of a theorem with 2 to N arguments,
+        # where the last argument is the rest of the conjunction (eg. 'p ∧ q ∧ r' can be the arguments p, q ∧ r or p, q, r)
+        term = self.typeTable.parse(node)
+        node = term.key
+        leading = [] # the leading arguments of the conjunction
+        while term.op == '∧':
+            leading.append(term.children[0])
+            term = term.children[1]
+            yield from self.matchArguments(node, leading + [term])
+
+    # this function checks if a virtual edge can lead to a type, which is the case for the types left after applying a
+    # theorem to two or more of its arguments, that is the targets of G with one or more of their leading arguments dropped
+    # the types are only found the first time this is called, since it is only needed for types that aren't nodes of G
+    def isOutput(self, node : str) -> bool:
+        if self.outputs is None:
+            self.outputs = set()
+            for target in self.G.nodes():
+                if '→' in target and any(True for _ in self.G.predecessors(target)):
+                    arguments, objectOutputType = self.typeTable.arrowSpine(self.typeTable.parse(target))
+                    for i in range(1, len(arguments) + 1):
+                        self.outputs.add(self.typeTable.joinAll('→', arguments[i:] + [objectOutputType]).key)
+        return self.typeTable.parse(node).key in self.outputs
+
+    # this function yields the virtual edges with the passed and-joined input whose theorems take the passed first arguments
+    def matchArguments(self, node : str, objectArguments : list[TypeTerm]) -> Iterator[tuple[str, AndJoinedEdge]]:
+        firstArgument = objectArguments[0].key
+        if not firstArgument in self.G:
+            return
+        for rest in self.G.successors(firstArgument):
+            # the binary split of each theorem is an edge from its first argument to the rest of its type
+            arguments, objectOutputType = self.typeTable.arrowSpine(self.typeTable.parse(rest))
+            i = len(objectArguments) - 1
+            if len(arguments) < i or any(argument.id != term.id for argument, term in zip(arguments, objectArguments[1:])):
+                continue
+            data = self.G.get_edge_data(firstArgument, rest)
+            newFuncOutput = self.typeTable.joinAll('→', arguments[i:] + [objectOutputType]).key
+            yield newFuncOutput, AndJoinedEdge(data.get('objectName', None), node, i, data.get('importPath', None))
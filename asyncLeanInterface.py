@@ -0,0 +1,66 @@
+# this file contains an asyncio interface to lean, for services that answer many queries at the same time
+# each query runs its own lean process, which is passed the script over stdin, so queries never share a scratch file,
+# and the process is started directly rather than through a shell
+# the number of lean processes running at once is limited, and each query can time out or be cancelled,
+# in which case its lean process is killed
+import asyncio
+import os
+import signal
+from leanInterface import parseCheckOutput
+
+
+# below is the default command used to run a script passed over stdin
+defaultStdinCommand = ['lake', 'env', 'lean', '--stdin']
+
+# below is a class that runs lean scripts concurrently
+class AsyncLean:
+    def __init__(self, command : list[str] = defaultStdinCommand, maxConcurrency : int = 4, timeout : float = None, cwd : str = None):
+        self.leanCommand = command
+        self.timeout = timeout # the default number of seconds a query can take, or None for no limit
+        self.cwd = cwd
+        self.semaphore = asyncio.Semaphore(maxConcurrency)
+        self.processes = set() # the lean processes currently running
+        self.peakConcurrency = 0 # the most lean processes that have run at the same time
+
+    # runs a lean 4 script and returns the output as a string
+    # raises TimeoutError if lean takes longer than the timeout, and kills lean if the query is cancelled
+    async def run(self, leanScript : str, timeout : float = None) -> str:
+        timeout = timeout if timeout is not None else self.timeout
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_exec(*self.leanCommand, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.DEVNULL, cwd=self.cwd, start_new_session=True)
+            self.processes.add(process)
+            self.peakConcurrency = max(self.peakConcurrency, len(self.processes))
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(leanScript.encode('utf-8')), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f'lean took longer than {timeout}s to answer the query')
+            finally:
+                # the process is still running if the query timed out or was cancelled, it is killed along with its children
+                # (eg. 'lake env' runs lean as a child process), which share its process group
+                if process.returncode is None:
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    await process.wait()
+                self.processes.discard(process)
+        return stdout.decode('utf-8')
+
+    # below are functions that run a single command with LeanBackend and the required packages imported
+    async def command(self, command : str, requiredImports : list[str] = [], timeout : float = None) -> str:
+        return await self.run(f'''
+            import LeanBackend
+            {' '.join(f'import {package}' for package in requiredImports)}
+            {command}
+        ''', timeout)
+
+    # returns the type of a lean object, raising NameError or ImportError if lean can't find it (see parseCheckOutput)
+    async def check(self, name : str, requiredImports : list[str] = [], timeout : float = None) -> str:
+        return parseCheckOutput(name, await self.command(f'#check @{name}', requiredImports, timeout))
+
+    async def eval(self, expression : str, requiredImports : list[str] = [], timeout : float = None) -> str:
+        return (await self.command(f'#eval {expression}', requiredImports, timeout)).strip('\n')
+
+    async def print(self, name : str, requiredImports : list[str] = [], timeout : float = None) -> str:
+        return await self.command(f'#print {name}', requiredImports, timeout)
@@ -0,0 +1,99 @@
+# this benchmark measures the latency of findPath queries with each search method, on the derivation graphs from the
+# tests and on larger generated graphs, compared with the uninformed nx.astar_path search findPath used before
+# the generated graphs have mathlib-like types as nodes and a few theorems leaving each node, and about half of the
+# random queries have no answer, which is where the old search had to walk the whole reachable set of the input
+# the searches are also run with a reachability index, which rejects the queries without an answer before searching
+import networkx as nx
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from compactGraph import CompactGraph, writeCompactGraph
+from prover import findPath, searchMethods
+from reachabilityIndex import ReachabilityIndex
+
+
+# this function builds the derivation graph used by the prover tests
+def testGraph () -> nx.DiGraph:
+    G = nx.DiGraph()
+    G.add_edge('p', 'q', objectName='a', importPath='import1')
+    G.add_edge('p', 'q → p ∧ q', objectName='b', importPath='import2')
+    G.add_edge('p', 'q → j', objectName='c', importPath='import3')
+    G.add_edge('p ∧ q', 'j', objectName='(fun (args : p ∧ q) => c (a1.left) (a1.right))', importPath='import3')
+    G.add_edge('q', 'k', objectName='d', importPath='import4')
+    return G
+
+# this function generates a random derivation graph with the passed number of nodes
+# most theorems stay within a cluster of related types, with a few linking clusters together, like the namespaces of mathlib
+def generateGraph (rng : random.Random, numNodes : int, clusterSize : int = 200) -> nx.DiGraph:
+    atoms = ['a ≤ b', 'x ∈ s', 'f x = g x', 'n + 1 < m', 'IsOpen U', 'Continuous f', 'Nat.Prime p', 'Finite α']
+    nodes = []
+    for nodeNum in range(numNodes):
+        terms = [rng.choice(atoms).replace('x', f'x{nodeNum % 97}') for _ in range(rng.randint(1, 3))]
+        nodes.append(f'{rng.choice([" ∧ ", " ∨ "]).join(terms)} {nodeNum}')
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    for nodeNum, node in enumerate(nodes):
+        cluster = nodeNum - nodeNum % clusterSize
+        for edgeNum in range(rng.randint(0, 4)):
+            if rng.random() < 0.05:
+                target = rng.randrange(numNodes)
+            else:
+                target = cluster + rng.randrange(min(clusterSize, numNodes - cluster))
+            G.add_edge(node, nodes[target], objectName=f'theorem_{nodeNum}_{edgeNum}', importPath=f'Module{cluster}')
+    return G
+
+# this function runs the queries with a search and returns the latency of each in milliseconds, and whether it was answered
+def measure (search, queries : list[tuple[str, str]]) -> tuple[list[float], list[bool]]:
+    latencies = []
+    answered = []
+    for inputType, outputType in queries:
+        start = time.perf_counter()
+        try:
+            search(inputType, outputType)
+            answered.append(True)
+        except nx.NetworkXNoPath:
+            answered.append(False)
+        latencies.append(1000 * (time.perf_counter() - start))
+    return latencies, answered
+
+# this function gives a percentile of a list of latencies
+def percentile (latencies : list[float], fraction : float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+# this function prints the latency percentiles of every search on a graph
+def report (name : str, G : nx.DiGraph, queries : list[tuple[str, str]], compactG : CompactGraph):
+    print(f'{name}: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges, {len(queries)} queries')
+    searches = [('nx.astar_path', lambda inputType, outputType: nx.astar_path(G, inputType, outputType))]
+    searches += [(method, lambda inputType, outputType, method=method: findPath(G, inputType, outputType, method=method))
+                 for method in searchMethods]
+    searches += [(f'{method} (compact)', lambda inputType, outputType, method=method: findPath(compactG, inputType, outputType, method=method))
+                 for method in searchMethods]
+    start = time.perf_counter()
+    index = ReachabilityIndex(compactG)
+    print(f'  reachability index built in {time.perf_counter() - start:.2f}s ({index.numComponents} components)')
+    searches += [(f'{method} (indexed)', lambda inputType, outputType, method=method: 
+                  findPath(compactG, inputType, outputType, method=method, reachabilityIndex=index)) for method in searchMethods]
+    for searchName, search in searches:
+        latencies, answered = measure(search, queries)
+        # the queries without an answer are reported on their own as well, since they are the slowest without the index
+        noPathLatencies = [latency for latency, isAnswered in zip(latencies, answered) if not isAnswered]
+        print(f'  {searchName:24} p50 {percentile(latencies, 0.5):8.3f}ms  p90 {percentile(latencies, 0.9):8.3f}ms  '
+              f'p99 {percentile(latencies, 0.99):8.3f}ms  max {max(latencies):8.3f}ms  ({sum(answered)} answered)  '
+              f'no path p50 {percentile(noPathLatencies, 0.5) if len(noPathLatencies) > 0 else 0:8.3f}ms')
+
+# the program begins below
+if __name__ == '__main__':
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        graphs = [('test graph', testGraph())] + [(f'generated graph', generateGraph(rng, numNodes)) for numNodes in [1000, 10000, 100000]]
+        for graphNum, (name, G) in enumerate(graphs):
+            nodes = list(G.nodes())
+            queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(200 if len(nodes) < 100000 else 50)]
+            writeCompactGraph(G, os.path.join(directory, f'{graphNum}.compact'))
+            with CompactGraph(os.path.join(directory, f'{graphNum}.compact')) as compactG:
+                report(name, G, queries, compactG)
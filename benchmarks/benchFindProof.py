@@ -0,0 +1,90 @@
+# this benchmark compares findProof, which searches from a set of hypotheses at once, with running findPath from the
+# conjunction of every subset of the hypotheses, on a derivation graph (with the and-joined edges) of generated theorems
+# that each take one to three propositions to another proposition
+# each query chains two theorems with several arguments: the hypotheses are the arguments of both except the one the first
+# theorem proves (shuffled, along with a few unrelated propositions), and the goal is the output of the second theorem
+# findPath can only use one conjunction of the hypotheses as its input, so it can't combine the output of the first theorem
+# with the other hypotheses, and only finds the proofs that a single theorem gives, while the number of subsets it tries
+# doubles with each unrelated hypothesis
+# usage: python benchmarks/benchFindProof.py [number of theorems, 50000 by default] [number of unrelated hypotheses, 2 by default]
+import itertools
+import networkx as nx
+import random
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from benchFindPath import percentile
+from prover import ConjunctionIndex, findPath, findProof
+from pythonComponent import generateDerivationGraph, populateGraphWithAndJoinedArgs
+from typeTerms import TypeTable
+
+
+# this function generates the object list of random theorems over a set of propositions
+def generateTheorems (rng : random.Random, numTheorems : int) -> list[list[str]]:
+    propositions = [f'P{propositionNum} x' for propositionNum in range(numTheorems // 5)]
+    objects = []
+    for theoremNum in range(numTheorems):
+        arguments = rng.sample(propositions, rng.choice([1, 1, 2, 2, 3]))
+        objects.append([f'theorem{theoremNum}', ' → '.join(arguments + [rng.choice(propositions)]), 'Import'])
+    return objects
+
+# this function runs findPath from the conjunction of each subset of the hypotheses (in order) until one reaches the goal
+def findPathFromSubsets (G : nx.DiGraph, typeTable : TypeTable, hypotheses : list[str], goal : str) -> tuple | None:
+    for size in range(1, len(hypotheses) + 1):
+        for subset in itertools.combinations(hypotheses, size):
+            try:
+                return findPath(G, typeTable.joinAll('∧', [typeTable.parse(hypothesis) for hypothesis in subset]).key, goal)
+            except nx.NetworkXException:
+                continue
+    return None
+
+# this function runs each search on the queries and returns the latency of each in milliseconds, and whether it found a proof
+def measure (search, queries : list[tuple[list[str], str]]) -> tuple[list[float], int]:
+    latencies = []
+    numFound = 0
+    for hypotheses, goal in queries:
+        start = time.perf_counter()
+        try:
+            numFound += search(hypotheses, goal) is not None
+        except nx.NetworkXNoPath:
+            pass
+        latencies.append(1000 * (time.perf_counter() - start))
+    return latencies, numFound
+
+# the program begins below
+if __name__ == '__main__':
+    numTheorems = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    numUnrelated = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    rng = random.Random(0)
+    objects = generateTheorems(rng, numTheorems)
+    G = populateGraphWithAndJoinedArgs(generateDerivationGraph(objects))
+    typeTable = TypeTable()
+    start = time.perf_counter()
+    conjunctionIndex = ConjunctionIndex(G, typeTable)
+    print(f'{G}, conjunction index built in {time.perf_counter() - start:.2f}s')
+
+    # index the theorems with several arguments by the propositions they take
+    theorems = [typeTable.arrowSpine(typeTable.parse(objectType)) for _, objectType, _ in objects]
+    theorems = [([argument.key for argument in arguments], output.key) for arguments, output in theorems if len(arguments) > 1]
+    theoremsTaking = {}
+    for arguments, output in theorems:
+        for argument in arguments:
+            theoremsTaking.setdefault(argument, []).append((arguments, output))
+    queries = []
+    while len(queries) < 100:
+        firstArguments, firstOutput = rng.choice(theorems)
+        if not firstOutput in theoremsTaking:
+            continue
+        secondArguments, secondOutput = rng.choice(theoremsTaking[firstOutput])
+        hypotheses = list(dict.fromkeys(firstArguments + [argument for argument in secondArguments if argument != firstOutput]))
+        hypotheses += [f'P{rng.randrange(numTheorems // 5)} x' for _ in range(numUnrelated)]
+        queries.append((rng.sample(hypotheses, len(hypotheses)), secondOutput))
+    print(f'{len(queries)} queries, {sum(len(hypotheses) for hypotheses, _ in queries) / len(queries):.1f} hypotheses on average')
+
+    for name, search in [('findPath from each subset', lambda hypotheses, goal: findPathFromSubsets(G, typeTable, hypotheses, goal)),
+                         ('findProof', lambda hypotheses, goal: findProof(G, hypotheses, goal, maxNodes=100000,
+                                                                          conjunctionIndex=conjunctionIndex))]:
+        latencies, numFound = measure(search, queries)
+        print(f'{name:26} p50 {percentile(latencies, 0.5):8.3f}ms  p90 {percentile(latencies, 0.9):8.3f}ms  '
+              f'max {max(latencies):8.3f}ms  total {sum(latencies) / 1000:.2f}s  ({numFound} of {len(queries)} proved)')
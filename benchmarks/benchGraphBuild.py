@@ -0,0 +1,48 @@
+# this benchmark measures how the parallel derivation graph build (see graphBuild.py) scales with the number of workers,
+# on a generated object list of mathlib sized type signatures, checking that every build gives the same graph
+# the time spent adding the workers' results to the graph (the reduce step, which runs on one core) is shown separately
+# usage: python benchmarks/benchGraphBuild.py [number of objects, 200000 by default] [most workers, the number of cores by default]
+import networkx as nx
+import os
+import random
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from benchSplitTerms import generateSignature
+from graphBuild import generateDerivationGraphParallel, populateGraphWithAndJoinedArgsParallel
+from pipelineMetrics import metrics
+from pythonComponent import generateDerivationGraph, populateGraphWithAndJoinedArgs
+
+
+# the program begins below
+if __name__ == '__main__':
+    numObjects = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    maxWorkers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rng = random.Random(0)
+    objects = [[f'object{objectNum}', generateSignature(rng), f'Import{objectNum % 100}'] for objectNum in range(numObjects)]
+    print(f'{numObjects} objects, {os.cpu_count()} cores')
+
+    start = time.perf_counter()
+    G = generateDerivationGraph(objects)
+    buildTime = time.perf_counter() - start
+    start = time.perf_counter()
+    G2 = populateGraphWithAndJoinedArgs(G)
+    andJoinedTime = time.perf_counter() - start
+    print(f'one core:  build {buildTime:.2f}s, and-joined edges {andJoinedTime:.2f}s ({G2})')
+
+    numWorkers = 1
+    while numWorkers <= maxWorkers:
+        metrics.reset()
+        start = time.perf_counter()
+        parallelG = generateDerivationGraphParallel(iter(objects), numWorkers)
+        parallelBuildTime = time.perf_counter() - start
+        start = time.perf_counter()
+        parallelG2 = populateGraphWithAndJoinedArgsParallel(parallelG, numWorkers)
+        parallelAndJoinedTime = time.perf_counter() - start
+        print(f'{numWorkers} workers: build {parallelBuildTime:.2f}s ({buildTime / parallelBuildTime:.1f}x), '
+              f'and-joined edges {parallelAndJoinedTime:.2f}s ({andJoinedTime / parallelAndJoinedTime:.1f}x), '
+              f'reduce {metrics.snapshot()["stages"]["graph.reduce"]["totalSeconds"]:.2f}s of both')
+        if not nx.utils.misc.graphs_equal(parallelG2, G2):
+            sys.exit(f'the graph built with {numWorkers} workers is different')
+        numWorkers *= 2
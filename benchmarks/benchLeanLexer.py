@@ -0,0 +1,104 @@
+# this benchmark compares the streaming lexer in leanLexer.py with the word splitting approach that
+# extractLeanObjects used before it, on a synthetic corpus of lean files with known declarations
+# both the throughput and the accuracy (how many of the expected declaration names are found) are reported
+import random
+import re
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from leanLexer import iterDeclarations
+
+
+# this function finds declarations the way extractLeanObjects used to, by stripping comments with regular expressions
+# and then scanning the words of the file
+def wordSplitDeclarations (text : str) -> list[str]:
+    singleLinCommentPattern = re.escape('--') + r'(.*?)' + re.escape('\n')
+    multipleLineCommentPattern = re.escape('OPEN_COMMENT') + r'(.*?)' + re.escape('CLOSE_COMMENT')
+    stringPattern = re.escape('"') + r'(.*?)' + re.escape('"')
+    text = text.replace('/-', 'OPEN_COMMENT').replace('-/', 'CLOSE_COMMENT')
+    text = re.sub(singleLinCommentPattern, '', text)
+    text = text.replace('\n', ' ')
+    text = re.sub(multipleLineCommentPattern, '', text)
+    text = re.sub(stringPattern, '', text)
+    words = ['PAD'] * 3 + text.split(' ') + ['PAD'] * 3
+
+    names = []
+    namespaces = []
+    for wordNum, word in enumerate(words):
+        if word == 'namespace':
+            namespaces += words[wordNum+1].split('.')
+        elif word == 'end' and len(namespaces) > 0 and words[wordNum+1] == namespaces[-1]:
+            namespaces.pop()
+        elif ((word == 'def' or word == 'inductive' or word == 'theorem') and words[wordNum-1] != 'private' and words[wordNum-2] != 'private' and 
+                not any(words[wordNum+1].startswith(edge_case) for edge_case in ['_root_', '[', '(', '{', '$', '"', '«'])):
+            rootObj = words[wordNum+1].split(':')[0]
+            names.append('.'.join(namespaces) + f'.{rootObj}' if len(namespaces) > 0 else rootObj)
+    return names
+
+# this function finds declarations using the lexer, keeping the same kinds as the word splitting approach
+def lexerDeclarations (text : str) -> list[str]:
+    return [declaration.fullName for declaration in iterDeclarations(text) 
+            if declaration.kind in ['def', 'inductive', 'theorem'] and not 'private' in declaration.modifiers]
+
+# this function generates a synthetic lean file, returning its text and the full names of the public declarations in it
+def generateFile (rng : random.Random, numDeclarations : int) -> tuple[str, list[str]]:
+    lines = []
+    expected = []
+    namespaces = []
+    for declarationNum in range(numDeclarations):
+        roll = rng.random()
+        if roll < 0.05:
+            namespace = f'Ns{declarationNum}.Sub'
+            lines.append(f'namespace {namespace}')
+            namespaces.append(namespace)
+        elif roll < 0.1 and len(namespaces) > 0:
+            lines.append(f'end {namespaces.pop()}')
+        elif roll < 0.13:
+            lines.append(f'section\nvariable (n : Nat)')
+            namespaces.append(None)
+        elif roll < 0.16 and len(namespaces) > 0 and namespaces[-1] is None:
+            lines.append('end')
+            namespaces.pop()
+
+        name = f'decl_{declarationNum}'
+        kind = rng.choice(['def', 'theorem', 'inductive'])
+        style = rng.random()
+        fullName = '.'.join([namespace for namespace in namespaces if namespace is not None] + [name])
+        if style < 0.15: # a doc comment with a nested comment inside of it
+            lines.append(f'/-- docs for {name} /- nested -/ mentioning def fake_{declarationNum} -/')
+        elif style < 0.25: # an attribute before the declaration
+            lines.append('@[simp, norm_cast]')
+        elif style < 0.3: # a private declaration, which should not be found
+            lines.append(f'private {kind} {name} : True := trivial')
+            continue
+        elif style < 0.35: # a protected declaration
+            kind = 'protected ' + kind
+        elif style < 0.4: # a tab between the keyword and the name
+            lines.append(f'{kind}\t{name} : Nat := "def not_a_declaration"')
+            expected.append(fullName)
+            continue
+        lines.append(f'{kind} {name} (a b : Nat) (h : a ≤ b) : a + 0 ≤ b := by\n  -- def inLineComment\n  simpa using h')
+        expected.append(fullName)
+    return '\n'.join(lines) + '\n', expected
+
+# this function runs a declaration finder over the corpus, returning the elapsed time and the fraction of expected names found
+# names that are found but not expected count against the finder as well
+def measure (finder, corpus : list[tuple[str, list[str]]]) -> tuple[float, float, float]:
+    start = time.perf_counter()
+    found = [finder(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+    numExpected = sum(len(expected) for _, expected in corpus)
+    numCorrect = sum(len(set(names) & set(expected)) for names, (_, expected) in zip(found, corpus))
+    numFound = sum(len(set(names)) for names in found)
+    return elapsed, numCorrect / numExpected, numCorrect / max(numFound, 1)
+
+# the program begins below
+if __name__ == '__main__':
+    rng = random.Random(0)
+    corpus = [generateFile(rng, 400) for _ in range(100)]
+    megabytes = sum(len(text.encode('utf-8')) for text, _ in corpus) / 1e6
+    print(f'corpus: {len(corpus)} files, {megabytes:.1f} MB, {sum(len(expected) for _, expected in corpus)} declarations')
+    for finderName, finder in [('word split', wordSplitDeclarations), ('lexer', lexerDeclarations)]:
+        elapsed, recall, precision = measure(finder, corpus)
+        print(f'{finderName:>10}: {megabytes / elapsed:6.2f} MB/s, recall {recall:.3f}, precision {precision:.3f}')
@@ -0,0 +1,127 @@
+# this benchmark compares removeRedundantTypeParentheses in typeTerms.py with a line by line transliteration of
+# remove_redundant_parentheses from LeanBackend.lean (one replace pass per operator and a character by character split),
+# checking that both give the same results on random expressions, including ascii operators and unbalanced parentheses
+# if lake is installed, a sample of the expressions is also checked against lean itself, and the time lean takes is reported
+import json
+import random
+import shutil
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from leanInterface import runLeanCommands
+from typeTerms import leanOperators, leanOperatorRanks, leanOperatorPrecedence, removeRedundantTypeParentheses
+
+
+# below are the functions from LeanBackend.lean, transliterated one to one
+def collapse_spaces (string : str) -> str:
+    output = ''
+    for char in string:
+        if not (char == ' ' and output[-1:] == ' '):
+            output += char
+    return output
+
+def split_terms (string : str, delim : str) -> list[str]:
+    terms = ['']
+    numOpenParentheses = 0
+    for char in string:
+        if char == '(':
+            numOpenParentheses += 1
+        elif char == ')':
+            numOpenParentheses = max(numOpenParentheses - 1, 0)
+        elif char == delim and numOpenParentheses == 0:
+            terms.append('')
+            continue
+        terms[-1] += char
+    return terms
+
+def pad_operators (string : str) -> str:
+    string = string.replace('(', ' ( ').replace(')', ' ) ')
+    for op in leanOperators:
+        string = string.replace(op, ' ' + op + ' ')
+    return string
+
+def make_unary_minus_explicit (string : str) -> str:
+    terms = [term for term in split_terms(pad_operators(string), ' ') if term != '']
+    output = '[START]'
+    for term in terms:
+        if term == '-':
+            prevTerm = terms[-1]
+            output += ' unary_minus' if prevTerm in leanOperators or output == '[START]' else ' -'
+        else:
+            output += ' ' + term
+    return collapse_spaces(output[7:].lstrip(' ').rstrip(' '))
+
+def remove_redundant_parentheses (string : str, numParentheses : int = None) -> str:
+    numParentheses = string.count('(') if numParentheses is None else numParentheses
+    if numParentheses == 0:
+        return collapse_spaces(string)
+    terms = [term for term in split_terms(make_unary_minus_explicit(pad_operators(string)), ' ') if term != '']
+    maxExternal = 0
+    for term in terms:
+        if not '(' in term:
+            maxExternal = max(maxExternal, leanOperatorRanks.get(term, 0))
+    output = ''
+    for term in terms:
+        if '(' in term:
+            termSimplified = remove_redundant_parentheses(term[2:][::-1][2:][::-1], numParentheses - 1)
+            subTerms = [subTerm for subTerm in split_terms(pad_operators(termSimplified), ' ') if subTerm != '']
+            minInternal = len(leanOperatorPrecedence)
+            for subTerm in subTerms:
+                if not '(' in subTerm and 0 < leanOperatorRanks.get(subTerm, 0) < minInternal:
+                    minInternal = leanOperatorRanks[subTerm]
+            output += ' ' + termSimplified if minInternal >= maxExternal else ' (' + termSimplified + ') '
+        else:
+            output += ' ' + term
+    return collapse_spaces(output.lstrip(' ').rstrip(' ')).replace('unary_minus ', '-')
+
+# this function generates a random expression using the operators lean knows about, along with a few it doesn't
+def generateExpression (rng : random.Random, depth : int = 0) -> str:
+    atoms = ['a', 'b', 'x', 'f x', 'n', '2', 'Nat.succ n', 'Iff', 'And', 'unary_minus', '∀', 'x ∈ s', 'g']
+    operators = ['↔', '<->', '→', '->', '∨', '∧', '=', '≠', '>', '<', '≥', '>=', '≤', '<=', '+', '-', '*', '/', '%', '^', '×', ':']
+    terms = []
+    for _ in range(rng.randint(1, 4)):
+        roll = rng.random()
+        prefix = rng.choice(['', '', '', '-', '¬', '- ', '¬ '])
+        if roll < 0.35 and depth < 3:
+            terms.append(prefix + '(' + generateExpression(rng, depth + 1) + ')')
+        elif roll < 0.38:
+            terms.append(rng.choice(['(', ')']))
+        else:
+            terms.append(prefix + rng.choice(atoms))
+    expression = terms[0]
+    for term in terms[1:]:
+        expression += rng.choice([' ', '', '  ']) + rng.choice(operators) + rng.choice([' ', '', '  ']) + term
+    return expression
+
+# the program begins below
+if __name__ == '__main__':
+    rng = random.Random(0)
+    expressions = [generateExpression(rng) for _ in range(20000)]
+    print(f'{len(expressions)} expressions, {sum(map(len, expressions)) / len(expressions):.0f} characters on average')
+
+    start = time.perf_counter()
+    expected = [remove_redundant_parentheses(expression) for expression in expressions]
+    transliterationTime = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [removeRedundantTypeParentheses(expression) for expression in expressions]
+    tokenizedTime = time.perf_counter() - start
+    mismatches = [(expression, result, expectedResult) for expression, result, expectedResult in zip(expressions, results, expected)
+                  if result != expectedResult]
+    print(f'transliteration: {transliterationTime * 1e6 / len(expressions):.1f}us per expression')
+    print(f'single pass:     {tokenizedTime * 1e6 / len(expressions):.1f}us per expression '
+          f'({transliterationTime / tokenizedTime:.1f}x faster)')
+    if len(mismatches) > 0:
+        sys.exit(f'{len(mismatches)} results differ from the transliteration, eg. {mismatches[0]}')
+
+    if shutil.which('lake') is None:
+        print('lake was not found, skipping the comparison with lean')
+    else:
+        sample = expressions[:500]
+        start = time.perf_counter()
+        outputs = runLeanCommands([f'#eval remove_redundant_parentheses {json.dumps(expression, ensure_ascii=False)}' for expression in sample])
+        leanTime = time.perf_counter() - start
+        leanResults = [json.loads(output.strip()) for output in outputs]
+        print(f'lean (one batched run): {leanTime * 1e6 / len(sample):.1f}us per expression')
+        if leanResults != results[:len(sample)]:
+            sys.exit('results differ from lean')
@@ -0,0 +1,76 @@
+# this benchmark compares the single pass, cached term splitter in typeTerms.py with the character by character
+# splitter that pythonComponent used before it, on a few hundred thousand mathlib sized type signatures
+# like the real object list, the signatures repeat, so the cache is measured separately from the single pass itself
+import random
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from typeTerms import splitTypeTerms
+
+
+# this function splits an expression the way splitTermsCall used to, one character at a time
+def characterLoopSplit (expression : str, delim : str) -> list[str]:
+    num_open = 0
+    num_closed = 0
+    check = ' ' * len(delim)
+    current_terms = ''
+    split = []
+    for char in range(len(expression)):
+        if expression[char] in ['(', '[', '{']:
+            num_open += 1
+        elif expression[char] in [')', ']', '}']:
+            num_closed += 1
+        check = check[1:] + expression[char] if len(check) > 1 else expression[char]
+        if (check == delim and num_open == num_closed):
+            split.append(current_terms[:-(len(check)-1)] if len(check) > 1 else current_terms)
+            current_terms = ''
+        elif char == len(expression)-1:
+            current_terms += expression[char]
+            split.append(current_terms)
+        else:
+            current_terms += expression[char]
+    return split
+
+# this function generates a random type signature similar in size and shape to the ones found in mathlib
+def generateSignature (rng : random.Random, depth : int = 0) -> str:
+    atoms = ['α', 'β', 'ℕ', 'ℤ', 'Prop', 'Finset α', 'Set β', 'a ≤ b', 'x ∈ s', 'f x = g x', 'n + 1 < m', 'IsOpen U']
+    numArguments = rng.randint(1, 6 if depth == 0 else 3)
+    terms = []
+    for _ in range(numArguments):
+        roll = rng.random()
+        if roll < 0.2 and depth < 2:
+            terms.append('(' + generateSignature(rng, depth + 1) + ')')
+        elif roll < 0.35:
+            terms.append('{' + rng.choice(['a b : ℕ', 'α : Type u_1', 's : Set α']) + '}')
+        elif roll < 0.45:
+            terms.append('[' + rng.choice(['inst : Group G', 'DecidableEq α', 'TopologicalSpace X']) + ']')
+        else:
+            terms.append(rng.choice(atoms))
+    return ' → '.join(terms)
+
+# this function times a splitter over all of the signatures
+def measure (splitter, signatures : list[str]) -> float:
+    start = time.perf_counter()
+    for signature in signatures:
+        splitter(signature, '→')
+    return time.perf_counter() - start
+
+# the program begins below
+if __name__ == '__main__':
+    rng = random.Random(0)
+    distinctSignatures = [generateSignature(rng) for _ in range(50000)]
+    signatures = [rng.choice(distinctSignatures) for _ in range(300000)]
+    print(f'{len(signatures)} signatures ({len(set(signatures))} distinct), {sum(map(len, signatures)) / len(signatures):.0f} characters on average')
+
+    # check that both splitters agree before timing them
+    assert all(list(splitTypeTerms(signature, '→')) == characterLoopSplit(signature, '→') for signature in distinctSignatures)
+    splitTypeTerms.cache_clear()
+
+    loopTime = measure(characterLoopSplit, signatures)
+    singlePassTime = measure(splitTypeTerms.__wrapped__, signatures)
+    splitTypeTerms.cache_clear()
+    cachedTime = measure(splitTypeTerms, signatures)
+    print(f'character loop: {loopTime:.2f}s')
+    print(f'single pass:    {singlePassTime:.2f}s ({loopTime / singlePassTime:.1f}x faster)')
+    print(f'cached:         {cachedTime:.2f}s ({loopTime / cachedTime:.1f}x faster)')
@@ -0,0 +1,41 @@
+# this benchmark measures how long it takes to import pythonComponent, and checks that importing it doesn't run lean
+# each import is timed in a fresh python process, with runLeanString replaced by a stand in that counts the scripts it is passed
+# it exits with an error if lean was run or the median import takes longer than the limit, so it can guard against regressions
+# usage: python benchmarks/benchStartup.py [maximum median import time in seconds, 1.0 by default]
+import os
+import statistics
+import subprocess
+import sys
+
+# below is the script run in each fresh process, it prints the import time and the number of lean scripts that were run
+importScript = '''
+import sys, time
+sys.path.append('.')
+import leanInterface
+numScripts = 0
+def countScripts(leanScript):
+    global numScripts
+    numScripts += 1
+    return ''
+leanInterface.runLeanString = countScripts
+start = time.perf_counter()
+import pythonComponent
+print(time.perf_counter() - start, numScripts)
+'''
+
+# the program begins below
+if __name__ == '__main__':
+    maxSeconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    numScripts = 0
+    for _ in range(10):
+        output = subprocess.run([sys.executable, '-c', importScript], cwd=directory, stdout=subprocess.PIPE, text=True, check=True).stdout
+        times.append(float(output.split()[0]))
+        numScripts += int(output.split()[1])
+    print(f'import pythonComponent: median {statistics.median(times) * 1000:.1f}ms, max {max(times) * 1000:.1f}ms, '
+          f'{numScripts} lean scripts run over {len(times)} imports')
+    if numScripts > 0:
+        sys.exit('importing pythonComponent ran lean')
+    if statistics.median(times) > maxSeconds:
+        sys.exit(f'importing pythonComponent took longer than {maxSeconds}s')
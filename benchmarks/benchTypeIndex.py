@@ -0,0 +1,67 @@
+# this benchmark measures the latency of looking up types in the type index (see typeIndex.py), compared with scanning
+# every node of the graph, on a derivation graph built from generated mathlib sized type signatures
+# the queries are node types with their spacing and parentheses changed (which the index resolves exactly), and node types
+# with one constant changed (which are ranked against the nodes, and the scan ranks with the same features)
+# usage: python benchmarks/benchTypeIndex.py [number of objects, 100000 by default]
+import random
+import sys
+import time
+sys.path.append('../TheoremMap')
+sys.path.append('.')
+from benchFindPath import percentile
+from benchSplitTerms import generateSignature
+from pythonComponent import generateDerivationGraph
+from typeIndex import TypeIndex, typeIndexFeatures
+
+
+# this function changes the spacing and parentheses of a type without changing what it means
+def respace (rng : random.Random, text : str) -> str:
+    text = text.replace(' → ', rng.choice([' → ', '  → ', ' -> ']))
+    return f'({text})' if rng.random() < 0.5 else text + ' '
+
+# this function ranks every node against a type, the way the index would without its postings
+def scanClosestNodes (index : TypeIndex, nodes : list[str], nodeFeatures : list[set[str]], text : str, limit : int = 10) -> list[str]:
+    features = typeIndexFeatures(text, index.typeTable)
+    weights = {feature: index.featureWeight(index.features.get(feature, None)) for feature in features}
+    queryWeight = sum(weights.values())
+    scores = []
+    for nodeId, node in enumerate(nodes):
+        shared = sum(weights[feature] for feature in features & nodeFeatures[nodeId])
+        if shared > 0:
+            scores.append((shared / (queryWeight + index.nodeWeights[nodeId] - shared), -nodeId, node))
+    return [node for _, _, node in sorted(scores, reverse=True)[:limit]]
+
+# this function runs each lookup on the queries and returns the latency of each in milliseconds, along with the results
+def measure (lookup, queries : list[str]) -> tuple[list[float], list]:
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(lookup(query))
+        latencies.append(1000 * (time.perf_counter() - start))
+    return latencies, results
+
+# the program begins below
+if __name__ == '__main__':
+    numObjects = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(0)
+    G = generateDerivationGraph([[f'object{objectNum}', generateSignature(rng), 'Import'] for objectNum in range(numObjects)])
+    start = time.perf_counter()
+    index = TypeIndex(G)
+    print(f'{G}, type index built in {time.perf_counter() - start:.2f}s ({len(index.features)} features, {len(index.postings)} postings)')
+
+    nodes = list(G.nodes())
+    sample = rng.sample(nodes, 200)
+    respaced = [respace(rng, node) for node in sample]
+    changed = [node.replace(rng.choice(['α', 'β', 'ℕ', 'ℤ', 'x']), 'γ', 1) for node in sample]
+
+    latencies, results = measure(index.resolve, respaced)
+    print(f'resolve:             p50 {percentile(latencies, 0.5):8.3f}ms  p99 {percentile(latencies, 0.99):8.3f}ms  '
+          f'({sum(result == node for result, node in zip(results, sample))} of {len(sample)} resolved to the node)')
+    latencies, results = measure(lambda query: [node for node, _ in index.closestNodes(query)], changed)
+    print(f'closestNodes:        p50 {percentile(latencies, 0.5):8.3f}ms  p99 {percentile(latencies, 0.99):8.3f}ms')
+
+    nodeFeatures = [typeIndexFeatures(node, index.typeTable) for node in nodes]
+    scanLatencies, scanResults = measure(lambda query: scanClosestNodes(index, nodes, nodeFeatures, query), changed[:20])
+    print(f'scan of every node:  p50 {percentile(scanLatencies, 0.5):8.3f}ms  p99 {percentile(scanLatencies, 0.99):8.3f}ms')
+    agreeing = sum(result[0] == scanResult[0] for result, scanResult in zip(results, scanResults))
+    print(f'the index and the scan rank the same node first for {agreeing} of {len(scanResults)} queries')
@@ -0,0 +1,246 @@
+# this file implements a compact on-disk format for the derivation graph
+# unpickling a networkx graph for all of mathlib takes minutes and several GB of memory, so instead the graph is stored as:
+#   1. a table of the node types, sorted so that a node can be found by binary search
+#   2. CSR (compressed sparse row) adjacency arrays for the outgoing and incoming edges of every node
+#   3. tables of the distinct edge names and import paths, with each edge storing integer ids into them
+# the header also stores a hash of the contents, so that caches and indexes can tell which graph they were built for
+# without reading the whole file
+# the file is memory mapped when opened, so opening is almost instant and only the parts that are used are read from disk
+import hashlib
+import mmap
+import networkx as nx
+import struct
+from array import array
+from typing import Iterator
+
+
+# below is the magic string at the start of every compact graph file
+magic = b'TMCOMPACTGRAPH02'
+
+# below are the sections of the file, in the order their offsets are stored in the header
+sections = ['nodeOffsets', 'nodeText', 'outPointers', 'outTargets', 'outNames', 'outImports', 'inPointers', 'inSources',
+            'nameOffsets', 'nameText', 'importOffsets', 'importText']
+
+# below is the size of the content hash stored after the magic string
+hashSize = hashlib.sha256().digest_size
+
+# this function checks if a file is a compact graph file written in the current format
+def isCompactGraph (path : str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(magic)) == magic
+
+# this function stores a list of strings as an array of offsets (with one extra offset for the end) and a blob of utf-8 text
+def encodeStrings (strings : list[str]) -> tuple[array, bytes]:
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('q', [0])
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    return offsets, b''.join(encoded)
+
+# this function writes a networkx derivation graph to a compact graph file
+def writeCompactGraph (G : nx.DiGraph, path : str):
+    # nodes are ordered by their utf-8 encoding so that they can be binary searched
+    nodes = sorted(G.nodes(), key=lambda node: node.encode('utf-8'))
+    nodeIds = {node: nodeId for nodeId, node in enumerate(nodes)}
+    names, imports = {}, {} # the id of each distinct edge name and import path
+
+    outPointers, outTargets, outNames, outImports = array('q', [0]), array('q'), array('q'), array('q')
+    for node in nodes:
+        for target in sorted(nodeIds[target] for target in G.successors(node)):
+            data = G.get_edge_data(node, nodes[target])
+            outTargets.append(target)
+            # missing names and imports are stored as -1
+            name, importPath = data.get('objectName', None), data.get('importPath', None)
+            outNames.append(-1 if name is None else names.setdefault(name, len(names)))
+            outImports.append(-1 if importPath is None else imports.setdefault(importPath, len(imports)))
+        outPointers.append(len(outTargets))
+
+    inPointers, inSources = array('q', [0]), array('q')
+    for node in nodes:
+        inSources.extend(sorted(nodeIds[source] for source in G.predecessors(node)))
+        inPointers.append(len(inSources))
+
+    nodeOffsets, nodeText = encodeStrings(nodes)
+    nameOffsets, nameText = encodeStrings(list(names))
+    importOffsets, importText = encodeStrings(list(imports))
+    data = {'nodeOffsets': nodeOffsets.tobytes(), 'nodeText': nodeText, 'outPointers': outPointers.tobytes(),
+            'outTargets': outTargets.tobytes(), 'outNames': outNames.tobytes(), 'outImports': outImports.tobytes(),
+            'inPointers': inPointers.tobytes(), 'inSources': inSources.tobytes(), 'nameOffsets': nameOffsets.tobytes(),
+            'nameText': nameText, 'importOffsets': importOffsets.tobytes(), 'importText': importText}
+
+    # the header stores the content hash and the counts followed by the offset and length of each section,
+    # sections are aligned to 8 bytes
+    digest = hashlib.sha256()
+    for section in sections:
+        digest.update(struct.pack('<q', len(data[section])) + data[section])
+    headerSize = len(magic) + digest.digest_size + 8 * (3 + 2 * len(sections))
+    position = headerSize
+    layout = []
+    for section in sections:
+        layout += [position, len(data[section])]
+        position += len(data[section]) + (-len(data[section]) % 8)
+    with open(path, 'wb') as file:
+        file.write(magic + digest.digest() + struct.pack(f'<{3 + 2 * len(sections)}q', len(nodes), len(outTargets), len(names), *layout))
+        for section in sections:
+            file.write(data[section] + b'\0' * (-len(data[section]) % 8))
+
+# below is a class that gives read access to a compact graph file
+# it provides the parts of the networkx graph interface that the prover uses, with nodes referred to by their type
+# integer node ids (positions in the sorted node table) can be used directly for faster searches
+class CompactGraph:
+    def __init__(self, path : str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(magic)] != magic:
+            raise ValueError(f'{path} is not a compact graph file')
+        # the hash of the contents written by writeCompactGraph identifies the graph (see queryCache.py)
+        self.fingerprint = self.map[len(magic):len(magic)+hashSize].hex()
+        header = struct.unpack_from(f'<{3 + 2 * len(sections)}q', self.map, len(magic) + hashSize)
+        self.numNodes, self.numEdges, self.numNames = header[:3]
+        view = memoryview(self.map)
+        self.sections = {}
+        for sectionNum, section in enumerate(sections):
+            offset, length = header[3 + 2 * sectionNum], header[4 + 2 * sectionNum]
+            self.sections[section] = view[offset:offset+length]
+        # the integer arrays are read in place as 64 bit integers
+        for section in sections:
+            if not section.endswith('Text'):
+                self.sections[section] = self.sections[section].cast('q')
+
+    def close(self):
+        self.sections = {}
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self):
+        return f'CompactGraph with {self.numNodes} nodes and {self.numEdges} edges'
+
+    def __len__(self):
+        return self.numNodes
+
+    def number_of_nodes(self) -> int:
+        return self.numNodes
+
+    def number_of_edges(self) -> int:
+        return self.numEdges
+
+    # ---------- string tables ----------
+
+    def readString(self, table : str, stringId : int) -> str | None:
+        if stringId < 0:
+            return None
+        offsets = self.sections[table + 'Offsets']
+        return bytes(self.sections[table + 'Text'][offsets[stringId]:offsets[stringId+1]]).decode('utf-8')
+
+    # this function returns the type of a node id
+    def nodeText(self, nodeId : int) -> str:
+        return self.readString('node', nodeId)
+
+    # this function returns the id of a node type (by binary search over the sorted node table), or None if it isn't a node
+    def nodeId(self, node : str) -> int | None:
+        target = node.encode('utf-8')
+        offsets, text = self.sections['nodeOffsets'], self.sections['nodeText']
+        low, high = 0, self.numNodes
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(text[offsets[middle]:offsets[middle+1]]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.numNodes and bytes(text[offsets[low]:offsets[low+1]]) == target:
+            return low
+        return None
+
+    # ---------- id based access ----------
+
+    # this function returns the ids of the targets of the outgoing edges of a node id
+    def successorIds(self, nodeId : int) -> memoryview:
+        pointers = self.sections['outPointers']
+        return self.sections['outTargets'][pointers[nodeId]:pointers[nodeId+1]]
+
+    # this function returns the ids of the sources of the incoming edges of a node id
+    def predecessorIds(self, nodeId : int) -> memoryview:
+        pointers = self.sections['inPointers']
+        return self.sections['inSources'][pointers[nodeId]:pointers[nodeId+1]]
+
+    # this function returns the edge data of the edge between two node ids, or None if there is no such edge
+    def edgeDataIds(self, sourceId : int, targetId : int) -> dict | None:
+        pointers, targets = self.sections['outPointers'], self.sections['outTargets']
+        low, high = pointers[sourceId], pointers[sourceId+1]
+        # the targets of each node are sorted, so the edge can be binary searched
+        while low < high:
+            middle = (low + high) // 2
+            if targets[middle] < targetId:
+                low = middle + 1
+            else:
+                high = middle
+        if low < pointers[sourceId+1] and targets[low] == targetId:
+            return {'objectName': self.readString('name', self.sections['outNames'][low]),
+                    'importPath': self.readString('import', self.sections['outImports'][low])}
+        return None
+
+    # ---------- networkx style access ----------
+
+    def __contains__(self, node : str) -> bool:
+        return self.nodeId(node) is not None
+
+    def has_node(self, node : str) -> bool:
+        return node in self
+
+    def nodes(self) -> Iterator[str]:
+        return (self.nodeText(nodeId) for nodeId in range(self.numNodes))
+
+    def __iter__(self) -> Iterator[str]:
+        return self.nodes()
+
+    def requireNode(self, node : str) -> int:
+        nodeId = self.nodeId(node)
+        if nodeId is None:
+            raise nx.NodeNotFound(f'Node {node} is not in the graph.')
+        return nodeId
+
+    def successors(self, node : str) -> Iterator[str]:
+        return (self.nodeText(target) for target in self.successorIds(self.requireNode(node)))
+
+    def predecessors(self, node : str) -> Iterator[str]:
+        return (self.nodeText(source) for source in self.predecessorIds(self.requireNode(node)))
+
+    def has_edge(self, source : str, target : str) -> bool:
+        return self.get_edge_data(source, target) is not None
+
+    def get_edge_data(self, source : str, target : str) -> dict | None:
+        sourceId, targetId = self.nodeId(source), self.nodeId(target)
+        if sourceId is None or targetId is None:
+            return None
+        return self.edgeDataIds(sourceId, targetId)
+
+    # this function converts the graph back into a networkx graph
+    def toNetworkx(self) -> nx.DiGraph:
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodes())
+        for sourceId in range(self.numNodes):
+            for targetId in self.successorIds(sourceId):
+                G.add_edge(self.nodeText(sourceId), self.nodeText(targetId), **self.edgeDataIds(sourceId, targetId))
+        return G
+
+# this function produces a fingerprint identifying the contents of a derivation graph, used by the query cache and the
+# indexes to tell which graph they were built for
+# compact graphs are fingerprinted by the content hash in their header, and networkx graphs by their nodes (in order, since
+# the indexes refer to the nodes of a networkx graph by their position) and edges
+# a networkx graph can be changed in place without any way to tell (eg. an edge moved, keeping the size the same), so its
+# fingerprint is computed again on every call
+def graphFingerprint(G) -> str:
+    if isinstance(G, CompactGraph):
+        return G.fingerprint
+    digest = hashlib.sha256()
+    for node in G.nodes():
+        digest.update(f'{node}\0'.encode('utf-8'))
+        for target, data in sorted((target, sorted(data.items(), key=str)) for target, data in G.adj[node].items()):
+            digest.update(f'\1{target}\0{data}\n'.encode('utf-8'))
+    return digest.hexdigest()
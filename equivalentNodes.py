@@ -0,0 +1,108 @@
+# this file implements a pass that merges the nodes of the derivation graph whose types lean proves equal using 'rfl'
+# (eg. '¬p' and 'p → False'), which makes the graph smaller and lets searches use theorems stated either way
+# checking every pair of nodes with lean would take far too long, so the nodes are first grouped by a cheap key that equal
+# types share, and only the pairs within each group are checked, using a single lean run per group
+import json
+import networkx as nx
+import re
+from compactGraph import graphFingerprint
+from leanInterface import runLeanCommands
+
+
+# below are the tokens that are rewritten before building the key, so that notations for the same thing get the same key
+tokenAliases = {'¬': ('→', 'False'), 'Not': ('→', 'False'), '>': ('<',), '≥': ('≤',), 'And': ('∧',), 'Or': ('∨',),
+                'Iff': ('↔',), '->': ('→',), '<->': ('↔',), '/\\': ('∧',), '\\/': ('∨',)}
+
+# below is the pattern matching the tokens of a type, brackets are left out since they don't change which tokens a type uses
+tokenPattern = re.compile(r'[^\W\d][\w.\'!?]*|\d+|<->|->|/\\|\\/|[^\s\w()\[\]{}]')
+
+# this function produces the key used to group the nodes, which is the (sorted) multiset of the tokens of the type
+# types that are equal usually differ only in notation or the order things are written in, so they get the same key
+def equivalenceKey(text : str) -> tuple[str, ...]:
+    tokens = []
+    for token in tokenPattern.findall(text):
+        tokens += tokenAliases.get(token, (token,))
+    return tuple(sorted(tokens))
+
+# this function groups the nodes of a graph by their key, leaving out the nodes that are the only one with their key
+def groupCandidateNodes(nodes : list[str]) -> list[list[str]]:
+    groups = {}
+    for node in nodes:
+        groups.setdefault(equivalenceKey(node), []).append(node)
+    return [group for group in groups.values() if len(group) > 1]
+
+# this function returns the imports needed to state the types of the passed nodes, which are the imports of the objects
+# whose edges start or end at them
+def nodeImports(G : nx.DiGraph, nodes : list[str]) -> list[str]:
+    imports = set()
+    for node in nodes:
+        for edges in [G.in_edges(node, data='importPath'), G.out_edges(node, data='importPath')]:
+            imports.update(importPath for _, _, importPath in edges if importPath is not None)
+    return sorted(imports)
+
+# this function checks many pairs of props for equality using 'rfl' in a single lean run, returning a bool for each pair
+# the free variables in the props are bound automatically, and any error (including ones while importing) means not equal
+def checkPropsEqMany(pairs : list[tuple[str, str]], requiredImports : list[str] = []) -> list[bool]:
+    outputs = runLeanCommands([f'set_option autoImplicit true in\nexample : ({prop1}) = ({prop2}) := rfl' for prop1, prop2 in pairs],
+                              requiredImports)
+    return ['error' not in output for output in outputs]
+
+# this function finds the nodes of a graph with equal types, returning a map from each merged node to the node it is merged into
+# the node kept from each set of equal nodes is the one with the shortest type
+# the nodes of a group are checked maxGroupSize at a time, against each other and against one node of each set of equal nodes
+# found so far in the group, so equal nodes are found however large the group is while no lean run has to check too many pairs
+# the types are checked with the imports of the objects they come from, along with requiredImports
+def findEquivalentNodes(G : nx.DiGraph, maxGroupSize : int = 32, requiredImports : list[str] = []) -> dict[str, str]:
+    representatives = {}
+    maxPairs = max(maxGroupSize * (maxGroupSize - 1) // 2, 1)
+    for group in groupCandidateNodes(list(G.nodes())):
+        imports = sorted(set(requiredImports) | set(nodeImports(G, group)))
+        # equal nodes are joined with a union find, so that every set of equal nodes ends up with one representative
+        parents = {node: node for node in group}
+        def find(node : str) -> str:
+            while parents[node] != node:
+                parents[node] = parents[parents[node]]
+                node = parents[node]
+            return node
+        for start in range(0, len(group), maxGroupSize):
+            chunk = group[start:start+maxGroupSize]
+            roots = list(dict.fromkeys(find(node) for node in group[:start]))
+            pairs = [(chunk[i], chunk[j]) for i in range(len(chunk)) for j in range(i+1, len(chunk))]
+            pairs += [(root, node) for root in roots for node in chunk]
+            for pairStart in range(0, len(pairs), maxPairs):
+                checkedPairs = pairs[pairStart:pairStart+maxPairs]
+                for (node1, node2), isEqual in zip(checkedPairs, checkPropsEqMany(checkedPairs, imports)):
+                    if isEqual:
+                        root1, root2 = find(node1), find(node2)
+                        if root1 != root2:
+                            parents[max(root1, root2, key=lambda node: (len(node), node))] = min(root1, root2, key=lambda node: (len(node), node))
+        for node in group:
+            if find(node) != node:
+                representatives[node] = find(node)
+    return representatives
+
+# this function produces a copy of a graph with each set of equal nodes merged into one node
+# the edges of the merged nodes are moved to the node they are merged into (keeping the existing edge if there already is one),
+# and edges that would become self loops are dropped, since applying them doesn't get a search anywhere
+# the map from each merged node to the node it was merged into is also returned, so that queries can be mapped the same way
+def mergeEquivalentNodes(G : nx.DiGraph, maxGroupSize : int = 32, requiredImports : list[str] = []) -> tuple[nx.DiGraph, dict[str, str]]:
+    representatives = findEquivalentNodes(G, maxGroupSize, requiredImports)
+    merged = nx.DiGraph()
+    merged.add_nodes_from(representatives.get(node, node) for node in G.nodes())
+    for source, target, data in G.edges(data=True):
+        source, target = representatives.get(source, source), representatives.get(target, target)
+        if source != target and not merged.has_edge(source, target):
+            merged.add_edge(source, target, **data)
+    return merged, representatives
+
+# this function writes the map returned by mergeEquivalentNodes, along with the fingerprint of the merged graph
+def saveMergedNodes(representatives : dict[str, str], path : str, G):
+    with open(path, 'w') as file:
+        json.dump({'fingerprint': graphFingerprint(G), 'mergedNodes': representatives}, file, ensure_ascii=False)
+
+# this function reads a map written by saveMergedNodes for the passed merged graph, or returns None if it was written for a
+# different graph (eg. one generated again without merging)
+def loadMergedNodes(path : str, G) -> dict[str, str] | None:
+    with open(path) as file:
+        saved = json.load(file)
+    return saved['mergedNodes'] if saved.get('fingerprint', None) == graphFingerprint(G) else None
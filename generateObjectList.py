@@ -1,7 +1,18 @@
-# this file generates ObjectList.json
+# this file generates the object list (see objectList.jsonl)
+import hashlib
+import json
+import leanInterface
 from leanInterface import *
+from leanLexer import iterDeclarations
+import multiprocessing
 import os
+from pipelineMetrics import metrics
 import re
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Iterable, Iterator
 
 # below is a LeanDef that stores a list of all objects that will be considered when constructing the theorem map
 # the list is generated using the generateObjectList function, which takes a list of file paths containing lean files to consider
@@ -10,22 +21,11 @@ import re
 #   2. the object type as a string
 #   3. the object lean import path as a string
 
-# the following function is used by generateObjectList to extract all lean objects from a given .lean file
-def extractLeanObjects (filePath : str) -> list[str]:
-    objects = [] # will store a list of object defs
-    with open(filePath) as file:
-        text = file.read()
-        # remove comments
-        singleLinCommentPattern = re.escape('--') + r'(.*?)' + re.escape('\n')
-        multipleLineCommentPattern = re.escape('OPEN_COMMENT') + r'(.*?)' + re.escape('CLOSE_COMMENT')
-        stringPattern = re.escape('"') + r'(.*?)' + re.escape('"')
-        text = text.replace('/-', 'OPEN_COMMENT').replace('-/', 'CLOSE_COMMENT')
-        text = re.sub(singleLinCommentPattern, '', text)
-        text = text.replace('\n', ' ')
-        text = re.sub(multipleLineCommentPattern, '', text)
-        text = re.sub(stringPattern, '', text)
-        words = ['PAD'] * 3 + text.split(' ') + ['PAD'] * 3
+# below are the kinds of declarations that are added to the object list
+extractedKinds = {'def', 'abbrev', 'inductive', 'structure', 'class', 'theorem', 'lemma'}
 
+# this function finds the module a .lean file is imported as, or None for the files that aren't part of a module
+def fileImportPath (filePath : str) -> str | None:
     # deal with possible cases for file_path
     # 1. Lean toolchain path (ie. [home directory]/.elan/toolchains/leanprover--lean4---[version]/src/lean)
     #   - only lean files in sub-folders can be accessed
@@ -33,7 +33,7 @@ def extractLeanObjects (filePath : str) -> list[str]:
     if '.elan/toolchains/' in filePath:
         # ignore files not in sub-folders
         if filePath.split('/')[-3] == 'src' and filePath.split('/')[-2] == 'lean':
-            return ['']
+            return None
         importPath = filePath.split('/src/lean/')[-1].replace('/', '.').rstrip('lean').rstrip('.')
 
     # 2. lake-packages path (ie. ./lake-packages)
@@ -49,7 +49,7 @@ def extractLeanObjects (filePath : str) -> list[str]:
                 mainFiles.append(os.path.join(packageBasePath, file.rstrip('.lean')))
         # ignore lakefiles and other files not in the main package file structure
         if filePath.endswith('/lakefile.lean') or not any(mainFile in filePath for mainFile in mainFiles):
-            return ['']
+            return None
         else:
             importPath = '.'.join(filePath.split('lake-packages/')[1].split('/')[1:]).rstrip('lean').rstrip('.')
 
@@ -62,71 +62,394 @@ def extractLeanObjects (filePath : str) -> list[str]:
         raise ValueError(
             f'the provided file path, \'{filePath}\', could not be found in the toolchain code base, the lake-packages, or as part of the LeanBackend package'
             )
+    return importPath
 
+# the following function is used by generateObjectList to extract all lean objects from a given .lean file
+# each file is timed as the 'extract' stage, and the objects that could not be loaded are counted by reason
+@metrics.timed('extract')
+def extractLeanObjects (filePath : str) -> list[str]:
+    objects = [] # will store a list of object defs
+    with open(filePath) as file:
+        text = file.read()
+
+    importPath = fileImportPath(filePath)
+    if importPath is None:
+        return ['']
     objects.append(importPath)
     
-    # iterate through the file, keeping track of namespaces 
-    # once an object is encountered (def, theorem, or instance), get the type by wrapping it in a LeanDef or LeanTheorem object
-    namespaces = []
-    for wordNum, word in enumerate(words):
-        if word == 'namespace':
-            namespaces += words[wordNum+1].split('.')
-        elif word == 'end' and len(namespaces) > 0 and words[wordNum+1] == namespaces[-1]:
-            namespaces.pop()
-        # deal with defs, theorems, and type classes (don't worry about type classes for now)
-        elif ((word == 'def' or word == 'inductive') and words[wordNum-1] != 'private' and words[wordNum-2] != 'private' and 
-                not any(words[wordNum+1].startswith(edge_case) for edge_case in ['_root_', '[', '(', '{', '$', '"', '«'])):
-            try:
-                print(f'fount def {words[wordNum+1]}')
-                # for each object name, include the full reference (eg [Namespace].[Object Name])
-                rootObj = words[wordNum+1].split(':')[0]
-                objectName = '.'.join(namespaces) + f'.{rootObj}' if len(namespaces) > 0 else rootObj
-                # get the type, removing redundant parentheses
-                objectType = LeanDef(objectName, requiredImports=[importPath]).type
-                objects.append(f'{objectName} HAS_TYPE {objectType}')
-            except KeyboardInterrupt:
-                quit()
-            except:
-                print(f'could not load def {words[wordNum+1]}')
-        elif (word == 'theorem' and words[wordNum-1] != 'private' and words[wordNum-2] != 'private' and 
-                not any(words[wordNum+1].startswith(edge_case) for edge_case in ['_root_', '[', '(', '{', '$', '"', '«'])):
-            try:
-                print(f'fount theorem {words[wordNum+1]}')
-                # for each object name, include the full reference (eg [Namespace].[Object Name])
-                rootObj = words[wordNum+1].split(':')[0]
-                objectName = '.'.join(namespaces) + f'.{rootObj}' if len(namespaces) > 0 else rootObj
-                # get the type, removing redundant parentheses
-                objectType = LeanTheorem(objectName, requiredImports=[importPath]).prop
-                objects.append(f'{objectName} HAS_TYPE {objectType}')
-            except KeyboardInterrupt:
-                quit()
-            except:
-                print(f'could not load theorem {words[wordNum+1]}')
+    # scan the file for declarations, the lexer keeps track of namespaces and skips comments and strings
+    # once an object is encountered (def, theorem, etc.), record its full name so its type can be looked up
+    foundObjects = [] # will store the kind, the name it was declared with, and the full name of each object
+    for declaration in iterDeclarations(text):
+        if declaration.kind in extractedKinds and not 'private' in declaration.modifiers:
+            print(f'fount {declaration.kind} {declaration.name}')
+            foundObjects.append((declaration.kind, declaration.name, declaration.fullName))
+
+    # get the types of all objects in the file with a single lean run
+    # if the run fails, or the file's import can't be loaded at all, the whole file has failed (possibly only for now, eg. if
+    # lean crashed or the module isn't built yet), so the error is raised rather than returning the file without its objects
+    try:
+        objectTypes = LeanObject.checkMany([objectName for _, _, objectName in foundObjects], requiredImports=[importPath])
+    except KeyboardInterrupt:
+        quit()
+    except Exception as error:
+        metrics.increment(f'extract.failures.checkMany.{type(error).__name__}')
+        raise
+    if len(objectTypes) > 0 and all(isinstance(objectType, ImportError) for objectType in objectTypes.values()):
+        metrics.increment('extract.failures.checkMany.ImportError')
+        raise next(iter(objectTypes.values()))
+    for kind, word, objectName in foundObjects:
+        objectType = objectTypes.get(objectName, None)
+        if objectType is None or isinstance(objectType, Exception):
+            print(f'could not load {kind} {word}')
+            reason = 'missing' if objectType is None else type(objectType).__name__
+            metrics.increment(f'extract.failures.{reason}')
+            metrics.log('objectFailed', file=filePath, kind=kind, name=objectName, reason=reason)
+        else:
+            objects.append(f'{objectName} HAS_TYPE {objectType}')
+    metrics.increment('extract.files')
+    metrics.increment('extract.objects', len(objects) - 1)
     return objects
 
-# this function produces the object list from the passed target files
-def generateObjectList (filePaths : list[str]) -> list[list[str]]:
-    objects = [] # will store a list of object defs
+# this function lists all of the .lean files in the passed target files and folders
+def collectLeanFiles (filePaths : list[str]) -> list[str]:
+    fileList = [] # will store all .lean files
     for path in filePaths:
-        numFiles = 0
         if os.path.isfile(path): # deal with single file
-            newObjects = extractLeanObjects(path)
-            importPath = newObjects[0]
-            for obj in newObjects[1:]:
-                objectName, objectType = obj.split(' HAS_TYPE ')
-                objects.append([objectName, objectType, importPath])
+            fileList.append(path)
         else: # deal with all .lean files in directory
-            fileList = [] # will store all .lean files in this directory
             for root, dirs, files in os.walk(path):
                 for file in files:
                     if file.endswith('.lean'):
-                        numFiles += 1
                         fileList.append(os.path.join(root, file))
-            for fileNum, filePath in enumerate(fileList):
-                print(f'looking at file number {fileNum} out of {numFiles}')
-                newObjects = extractLeanObjects(filePath)
-                importPath = newObjects[0]
-                for obj in newObjects[1:]:
-                    objectName, objectType = obj.split(' HAS_TYPE ')
-                    objects.append([objectName, objectType, importPath])
-    return objects
\ No newline at end of file
+    return fileList
+
+# this function produces the object list entries ([name, type, import path]) for a single .lean file
+def extractFileObjects (filePath : str) -> list[list[str]]:
+    newObjects = extractLeanObjects(filePath)
+    importPath = newObjects[0]
+    objects = []
+    for obj in newObjects[1:]:
+        objectName, objectType = obj.split(' HAS_TYPE ')
+        objects.append([objectName, objectType, importPath])
+    return objects
+
+# this function produces the object list from the passed target files
+def generateObjectList (filePaths : list[str]) -> list[list[str]]:
+    objects = [] # will store a list of object defs
+    fileList = collectLeanFiles(filePaths)
+    for fileNum, filePath in enumerate(fileList):
+        print(f'looking at file number {fileNum} out of {len(fileList)}')
+        objects += extractFileObjects(filePath)
+    return objects
+
+# ---------- parallel extraction ----------
+# files are spread across a pool of worker processes, each of which writes lean scripts to its own scratch file
+# the objects found in each file are appended to a checkpoint as soon as the file is finished,
+# so an interrupted run picks up from the last finished file rather than starting over
+
+# this function reads the finished files from a checkpoint, returning a map from each file path to the position of its
+# entry in the checkpoint and the import path of its objects (None if it has none)
+# the objects themselves aren't kept, they are read back from the checkpoint when they are needed (see iterCheckpointObjects)
+def readCheckpoint (checkpointPath : str) -> dict[str, tuple[int, str | None]]:
+    finished = {}
+    if os.path.exists(checkpointPath):
+        position = 0
+        with open(checkpointPath, 'rb') as checkpoint:
+            for line in checkpoint:
+                # the last line is cut off if the run was killed mid write
+                if not line.endswith(b'\n'):
+                    break
+                entry = json.loads(line)
+                finished[entry['file']] = (position, entry['objects'][0][2] if len(entry['objects']) > 0 else None)
+                position += len(line)
+        # the cut off line is dropped before anything is appended after it
+        if position < os.path.getsize(checkpointPath):
+            os.truncate(checkpointPath, position)
+    return finished
+
+# this function streams the objects of the passed files (in the order they are passed) from a checkpoint, using the
+# positions returned by readCheckpoint or extractFilesParallel, files that aren't in the checkpoint are skipped
+def iterCheckpointObjects (checkpointPath : str, finished : dict[str, tuple[int, str | None]], fileList : list[str]) -> Iterator[list[str]]:
+    if not any(filePath in finished for filePath in fileList):
+        return
+    with open(checkpointPath, 'rb') as checkpoint:
+        for filePath in fileList:
+            if filePath in finished:
+                checkpoint.seek(finished[filePath][0])
+                yield from json.loads(checkpoint.readline())['objects']
+
+# this function sets up each worker process of the extraction pool
+def initExtractionWorker (scratchDirectory : str, sessionCommand : list[str] | None, sessionTimeout : float | None):
+    leanInterface.setScratchFile(os.path.join(scratchDirectory, f'{os.getpid()}.lean'))
+    # the metrics copied from the parent process are cleared, so that only the ones recorded here are sent back
+    metrics.reset()
+    # a lean session inherited from the parent process can't be shared, so each worker starts its own
+    leanInterface.leanSession = None
+    if sessionCommand is not None:
+        startLeanSession(1, sessionCommand, sessionTimeout)
+
+# this function extracts a single file inside of a worker process
+# the metrics recorded while extracting the file are sent back with its objects, to be merged into the parent's metrics
+# the objects are None if the file failed, so that it isn't recorded as finished and is extracted again by the next run
+def extractFileObjectsWorker (filePath : str) -> tuple[str, list[list[str]] | None, dict]:
+    try:
+        objects = extractFileObjects(filePath)
+    except Exception as error:
+        print(f'could not extract {filePath}: {error}')
+        metrics.increment('extract.failedFiles')
+        metrics.log('fileFailed', file=filePath, reason=type(error).__name__, message=str(error))
+        objects = None
+    metrics.dumpProfiles()
+    return filePath, objects, metrics.collect()
+
+# this function extracts the passed .lean files using numWorkers processes
+# finished files are recorded in the checkpoint file as soon as they are extracted, and files already recorded there are
+# not extracted again
+# so that the objects don't have to be held in memory, the map returned is the same as readCheckpoint's, with the position
+# of each file's entry in the checkpoint (see iterCheckpointObjects to read the objects back)
+# files that failed are left out of both the checkpoint and the returned map
+# the workers are forked, so this must be called before any background threads are started (see preloadLeanObjects)
+def extractFilesParallel (fileList : list[str], numWorkers : int = os.cpu_count(), 
+                          checkpointPath : str = './objectList.checkpoint') -> dict[str, tuple[int, str | None]]:
+    finished = readCheckpoint(checkpointPath)
+    remaining = [filePath for filePath in fileList if not filePath in finished]
+    print(f'{len(fileList) - len(remaining)} of {len(fileList)} files found in checkpoint, extracting the remaining {len(remaining)}')
+    if len(remaining) == 0:
+        return finished
+
+    scratchDirectory = tempfile.mkdtemp(prefix='tmp_extraction_', dir='.')
+    sessionCommand = leanInterface.leanSession.command if leanInterface.leanSession is not None else None
+    sessionTimeout = leanInterface.leanSession.timeout if leanInterface.leanSession is not None else None
+    try:
+        with multiprocessing.Pool(numWorkers, initExtractionWorker, (scratchDirectory, sessionCommand, sessionTimeout)) as pool, \
+                open(checkpointPath, 'ab') as checkpoint:
+            start = time.perf_counter()
+            for fileNum, (filePath, objects, workerMetrics) in enumerate(pool.imap_unordered(extractFileObjectsWorker, remaining)):
+                metrics.merge(workerMetrics)
+                if objects is None:
+                    print(f'failed file number {fileNum + 1} out of {len(remaining)}, it will be extracted again by the next run')
+                    continue
+                print(f'finished file number {fileNum + 1} out of {len(remaining)}')
+                finished[filePath] = (checkpoint.tell(), objects[0][2] if len(objects) > 0 else None)
+                checkpoint.write((json.dumps({'file': filePath, 'objects': objects}) + '\n').encode('utf-8'))
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                metrics.log('fileExtracted', file=filePath, objects=len(objects), finished=fileNum + 1, remaining=len(remaining) - fileNum - 1,
+                            filesPerSecond=(fileNum + 1) / (time.perf_counter() - start))
+    finally:
+        shutil.rmtree(scratchDirectory, ignore_errors=True)
+    return finished
+
+# this function streams the object list of the passed target files, extracted using numWorkers processes
+def iterObjectListParallel (filePaths : list[str], numWorkers : int = os.cpu_count(), 
+                            checkpointPath : str = './objectList.checkpoint') -> Iterator[list[str]]:
+    fileList = collectLeanFiles(filePaths)
+    finished = extractFilesParallel(fileList, numWorkers, checkpointPath)
+    # the objects are in the same order as the sequential extraction would give, leaving out the files that failed
+    yield from iterCheckpointObjects(checkpointPath, finished, fileList)
+
+# this function produces the object list from the passed target files using numWorkers processes
+def generateObjectListParallel (filePaths : list[str], numWorkers : int = os.cpu_count(), 
+                                checkpointPath : str = './objectList.checkpoint') -> list[list[str]]:
+    return list(iterObjectListParallel(filePaths, numWorkers, checkpointPath))
+
+# ---------- incremental extraction ----------
+# a manifest stored next to the object list records the lean version and a content hash for every extracted file
+# when mathlib (or another package) is bumped, only the files that were added, changed, or deleted since the manifest
+# was written are extracted again, along with the files that import them (directly or not), since the types in a module
+# can change with the modules it imports, and their objects are merged into the existing object list
+# a new toolchain can change any type (eg. through the elaborator or the pretty printer), so then every file is extracted again
+# files are identified by their path relative to the target folder they were found in, so that moving to a new
+# toolchain folder doesn't make every toolchain file look new
+
+# below is the pattern matching the import commands in the header of a lean file
+importPattern = re.compile(r'^import[ \t]+([^\n]*)', re.MULTILINE)
+
+# this function hashes the contents of a file, and returns the modules it imports along with the hash
+def scanLeanFile (filePath : str) -> tuple[str, list[str]]:
+    with open(filePath, 'rb') as file:
+        data = file.read()
+    imports = [module for line in importPattern.findall(data.decode('utf-8', errors='replace')) for module in line.split('--')[0].split()]
+    return hashlib.sha256(data).hexdigest(), imports
+
+# this function finds the module of a file like fileImportPath, returning None for files it can't place rather than raising
+def fileModule (filePath : str) -> str | None:
+    try:
+        return fileImportPath(filePath)
+    except ValueError:
+        return None
+
+# this function lists the .lean files in the passed target files and folders, keyed by their path relative to the target
+def collectLeanFilesByKey (filePaths : list[str]) -> dict[str, str]:
+    files = {}
+    for path in filePaths:
+        root = os.path.normpath(path)
+        for filePath in collectLeanFiles([path]):
+            if os.path.isfile(path):
+                files[os.path.basename(root)] = filePath
+            else:
+                files[os.path.join(os.path.basename(root), os.path.relpath(filePath, root))] = filePath
+    return files
+
+# this function reads the manifest, an empty manifest is returned if it doesn't exist
+def readManifest (manifestPath : str) -> dict:
+    if not os.path.exists(manifestPath):
+        return {'version': None, 'files': {}}
+    with open(manifestPath) as manifest:
+        return json.load(manifest)
+
+def writeManifest (manifest : dict, manifestPath : str):
+    with open(manifestPath, 'w') as file:
+        json.dump(manifest, file, indent=1)
+
+# this function brings the object list up to date with the passed target files
+# the updated object list (as an iterator, which can only be read once), the updated manifest, and whether anything changed
+# are returned, starting from an empty object list and manifest produces the full object list
+def updateObjectList (filePaths : list[str], objects : Iterable[list[str]], manifest : dict, numWorkers : int = os.cpu_count(),
+                      checkpointPath : str = './objectList.checkpoint') -> tuple[Iterator[list[str]], dict, bool]:
+    files = collectLeanFilesByKey(filePaths)
+    hashes, imports = {}, {}
+    for key, filePath in files.items():
+        hashes[key], imports[key] = scanLeanFile(filePath)
+    modules = {key: fileModule(filePath) for key, filePath in files.items()}
+    oldFiles = manifest['files']
+    version = getLeanVersion()
+
+    # if the toolchain has changed every file is extracted again and all of the existing objects are dropped
+    toolchainChanged = (manifest['version'] or {}).get('toolchain', None) != version['toolchain']
+    if toolchainChanged and len(oldFiles) > 0:
+        print('the lean toolchain has changed since the object list was generated, so every file will be extracted again')
+    changedKeys = [key for key in files if toolchainChanged or not key in oldFiles or oldFiles[key]['hash'] != hashes[key]] # changed or added
+    deletedKeys = [key for key in oldFiles if not key in files]
+
+    # the files importing a changed, added, or deleted module (directly or through other modules) are extracted again too
+    importers = {}
+    for key in files:
+        for module in imports[key]:
+            importers.setdefault(module, []).append(key)
+    dependentKeys = set(changedKeys)
+    pending = [modules[key] for key in changedKeys] + [oldFiles[key].get('module', oldFiles[key]['importPath']) for key in deletedKeys]
+    while len(pending) > 0:
+        for key in importers.get(pending.pop(), []):
+            if not key in dependentKeys:
+                dependentKeys.add(key)
+                pending.append(modules[key])
+    newKeys = [key for key in files if key in dependentKeys] # changed, added, or importing one of those
+    staleKeys = [key for key in oldFiles if not key in files or key in dependentKeys] # changed, deleted, or importing one of those
+    print(f'{len(changedKeys)} changed or added, {len(deletedKeys)} deleted, and {len(newKeys) - len(changedKeys)} dependent files '
+          f'out of {len(files)}')
+
+    # extract the files that changed or were added
+    # files that failed are left out of the manifest, so that the next run sees them as added and extracts them again
+    extracted = extractFilesParallel([files[key] for key in newKeys], numWorkers, checkpointPath)
+    extractedKeys = [key for key in newKeys if files[key] in extracted]
+    if len(extractedKeys) < len(newKeys):
+        print(f'{len(newKeys) - len(extractedKeys)} files failed and will be extracted again by the next run')
+    newFiles = {key: oldFiles[key] for key in oldFiles if not key in staleKeys}
+    for key in extractedKeys:
+        newFiles[key] = {'hash': hashes[key], 'importPath': extracted[files[key]][1], 'module': modules[key]}
+
+    # the objects of files that changed or were deleted are dropped, and the newly extracted objects are added after the rest
+    # this is done lazily, so the existing object list can be streamed straight from its file into the new one, and the
+    # new objects are streamed from the checkpoint, which has to be kept until the objects have been read
+    staleImports = {oldFiles[key]['importPath'] for key in staleKeys if oldFiles[key]['importPath'] is not None}
+    def iterUpdatedObjects() -> Iterator[list[str]]:
+        if not toolchainChanged:
+            for obj in objects:
+                if not obj[2] in staleImports:
+                    yield obj
+        yield from iterCheckpointObjects(checkpointPath, extracted, [files[key] for key in extractedKeys])
+
+    return iterUpdatedObjects(), {'version': version, 'files': newFiles}, len(staleKeys) + len(newKeys) > 0
+
+
+# ---------- environment export ----------
+# rather than scanning .lean files and asking lean for the type of each declaration, the exportEnv program (see Export.lean)
+# imports the built modules once and streams every constant in the environment with its type, module, and kind
+# this also finds declarations that never appear by name in the source (eg. constructors and generated definitions)
+
+# below is the default command used to run the export, the module names are passed after it
+defaultExportCommand = ['lake', 'exe', 'exportEnv']
+
+# below are the kinds of exported constants that are added to the object list
+exportedKinds = {'def', 'theorem', 'inductive', 'constructor', 'axiom', 'opaque'}
+
+# this function streams the records written by the export as they are produced
+def iterExportedConstants (modules : list[str], command : list[str] = defaultExportCommand) -> Iterator[dict]:
+    process = subprocess.Popen(command + modules, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+    for line in process.stdout:
+        yield json.loads(line)
+    if process.wait() != 0:
+        raise RuntimeError(f'exporting the modules {modules} failed with exit code {process.returncode}')
+
+# this function streams the object list entries from the environment of the passed modules
+def iterObjectListFromExport (modules : list[str], command : list[str] = defaultExportCommand) -> Iterator[list[str]]:
+    for record in iterExportedConstants(modules, command):
+        if record['kind'] in exportedKinds:
+            yield [record['name'], record['type'], record['module']]
+
+# this function produces the object list from the environment of the passed modules
+def generateObjectListFromExport (modules : list[str], command : list[str] = defaultExportCommand) -> list[list[str]]:
+    return list(iterObjectListFromExport(modules, command))
+
+
+# ---------- object list storage ----------
+# the object list is stored with one entry per line (as a json list of the name, type, and import path), rather than as
+# a single json document, so it can be written while the entries are produced and read back one entry at a time
+# without ever holding the whole list in memory
+# the older objectList.json format (a json object with the whole list under 'objectList') can still be read
+
+# below is a class that writes an object list one entry at a time
+# the entries are written to a temporary file that replaces the object list when the writer is closed, so the object
+# list is never left half written, and the previous object list can still be read while the new one is being written
+class ObjectListWriter:
+    def __init__(self, path : str):
+        self.path = path
+        self.tmpPath = path + '.tmp'
+        self.file = open(self.tmpPath, 'w', encoding='utf-8')
+        self.count = 0 # the number of entries written so far
+
+    def append(self, obj : list[str]):
+        self.file.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def extend(self, objects : Iterable[list[str]]):
+        for obj in objects:
+            self.append(obj)
+
+    # this function finishes the object list, replacing the file at path with it
+    def close(self):
+        self.file.close()
+        os.replace(self.tmpPath, self.path)
+
+    # this function throws away the entries written so far, leaving the file at path as it was
+    def discard(self):
+        self.file.close()
+        os.remove(self.tmpPath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.close()
+        else:
+            self.discard()
+
+# this function writes the passed entries to an object list file, returning the number of entries written
+def writeObjectList (objects : Iterable[list[str]], path : str) -> int:
+    with ObjectListWriter(path) as writer:
+        writer.extend(objects)
+    return writer.count
+
+# this function streams the entries of an object list file
+# files in the older objectList.json format have to be loaded whole, but their entries are still returned one at a time
+def iterObjectList (path : str) -> Iterator[list[str]]:
+    with open(path, encoding='utf-8') as file:
+        if path.endswith('.json'):
+            yield from json.load(file)['objectList']
+            return
+        for line in file:
+            if line.strip() != '':
+                yield json.loads(line)
@@ -0,0 +1,153 @@
+# this file builds the derivation graph (see generateDerivationGraph and populateGraphWithAndJoinedArgs in pythonComponent.py)
+# using many processes, which matters for large object lists such as all of mathlib, where parsing the types takes most of the time
+# the object list is split into chunks that workers turn into lists of nodes and edges (the map step), which are then added
+# to a single graph in the order of the object list (the reduce step), so the graph is the same as the one built on one core
+# the reduce step runs on one core, so the workers drop the repeated nodes and edges of their chunk to leave it less to do
+# the and-joined edges are generated the same way, with the nodes whose type is an implication split across the workers
+import itertools
+import multiprocessing
+import networkx as nx
+import os
+from andJoinedEdges import andJoinedName
+from collections import deque
+from pipelineMetrics import metrics
+from typeTerms import stripLeadingBinders, TypeTable
+from typing import Callable, Iterable, Iterator
+
+
+# below is the type table used by a worker process, types are parsed independently in each worker, which is fine since
+# the nodes are keyed by the canonical text of each term, not by the ids of the table
+workerTypeTable = None
+
+# this function produces the entries of the derivation graph for each object in the list, in order
+# each entry is a (source, target, objectName, importPath) edge, or a (node, None, None, None) entry for types without an input
+def derivationGraphEntries (objects : Iterable[list[str]], typeTable : TypeTable) -> list[tuple[str, str | None, str | None, str | None]]:
+    entries = []
+    for objectName, objectType, objectImportPath in objects:
+        term = typeTable.parse(stripLeadingBinders(objectType.replace('\n', ' ')))
+        # generate the binary split of the object type
+        if term.op != '→': # all non input types are nodes
+            entries.append((term.key, None, None, None))
+        else:
+            # the binary split is [firstArgument], [secondArgument → ... nthArgument → output]
+            firstArgument, rest = term.children
+            entries.append((firstArgument.key, rest.key, objectName, objectImportPath))
+    return entries
+
+# this function produces the and-joined edges of a single node from the edges into it, in order
+# (see populateGraphWithAndJoinedArgs for how they are derived)
+def andJoinedGraphEdges (node : str, inEdges : list[tuple[str, str, str]], typeTable : TypeTable) -> list[tuple[str, str, str, str]]:
+    edges = []
+    nodeTerm = typeTable.parse(node)
+    if nodeTerm.op == '→':
+        arguments, objectOutputType = typeTable.arrowSpine(nodeTerm)
+        for source, objectName, objectImportPath in inEdges:
+            objectArguments = [typeTable.parse(source)] + arguments
+            for i in range(1, len(objectArguments)):
+                newFuncInput = typeTable.joinAll('∧', objectArguments[:i+1]).key
+                newFuncOutput = typeTable.joinAll('→', objectArguments[i+1:] + [objectOutputType]).key
+                edges.append((newFuncInput, newFuncOutput, andJoinedName(objectName, newFuncInput, i), objectImportPath))
+    return edges
+
+# this function drops the repeated entries of a chunk without changing the graph they give when added in order
+# each edge is kept where it first appears (so the nodes are added in the same order) with the data of its last entry
+# (since adding an edge again replaces its data), and a node entry is dropped if the node is already in an earlier entry
+def dedupeGraphEntries (entries : list[tuple[str, str | None, str | None, str | None]]) -> list[tuple[str, str | None, str | None, str | None]]:
+    deduped = []
+    edgePositions = {}
+    nodes = set()
+    for entry in entries:
+        source, target = entry[0], entry[1]
+        if target is None:
+            if not source in nodes:
+                nodes.add(source)
+                deduped.append(entry)
+        elif (source, target) in edgePositions:
+            deduped[edgePositions[(source, target)]] = entry
+        else:
+            edgePositions[(source, target)] = len(deduped)
+            nodes.update((source, target))
+            deduped.append(entry)
+    return deduped
+
+# this function adds entries (see derivationGraphEntries) to a graph, adding any new nodes
+def addGraphEntries (G : nx.DiGraph, entries : list[tuple[str, str | None, str | None, str | None]]):
+    for source, target, objectName, objectImportPath in entries:
+        if target is None:
+            G.add_node(source)
+        else:
+            G.add_edge(source, target, objectName=objectName, importPath=objectImportPath)
+
+
+# ---------- worker processes ----------
+
+def initGraphWorker ():
+    global workerTypeTable
+    workerTypeTable = TypeTable()
+
+def derivationGraphEntriesWorker (objects : list[list[str]]) -> list[tuple]:
+    return dedupeGraphEntries(derivationGraphEntries(objects, workerTypeTable))
+
+def andJoinedGraphEdgesWorker (tasks : list[tuple[str, list[tuple[str, str, str]]]]) -> list[tuple[str, str, str, str]]:
+    return dedupeGraphEntries([edge for node, inEdges in tasks for edge in andJoinedGraphEdges(node, inEdges, workerTypeTable)])
+
+# this function splits an iterable into lists of chunkSize items, without reading ahead of the chunk being made
+def iterChunks (items : Iterable, chunkSize : int) -> Iterator[list]:
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, chunkSize))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+# this function maps a worker function over chunks using numWorkers processes, yielding the results in order
+# unlike Pool.imap, only a few chunks are sent ahead of the results being read, so a streamed object list isn't read
+# into memory all at once, and with a single worker the chunks are mapped in this process instead
+# the workers are spawned rather than forked, since the graph is built after the lean session and the preloading have
+# started threads, and forking a process with other threads running can leave locks held in the child
+def mapChunks (function : Callable, chunks : Iterable, numWorkers : int) -> Iterator:
+    if numWorkers <= 1:
+        initGraphWorker()
+        yield from map(function, chunks)
+        return
+    with multiprocessing.get_context('spawn').Pool(numWorkers, initGraphWorker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(function, (chunk,)))
+            if len(pending) >= 2 * numWorkers:
+                yield pending.popleft().get()
+        while len(pending) > 0:
+            yield pending.popleft().get()
+
+
+# ---------- parallel builds ----------
+
+# this function produces the same derivation graph as generateDerivationGraph using numWorkers processes
+# the object list can be any iterable of entries, and is read chunkSize objects at a time
+@metrics.timed('graph.build')
+def generateDerivationGraphParallel (objects : Iterable[list[str]], numWorkers : int = os.cpu_count(), chunkSize : int = 4096) -> nx.DiGraph:
+    G = nx.DiGraph()
+    # the objects are counted as they are sent to the workers, since the entries that come back have been deduplicated
+    def countChunks(chunks : Iterator[list]) -> Iterator[list]:
+        for chunk in chunks:
+            metrics.increment('graph.objects', len(chunk))
+            yield chunk
+    for entries in mapChunks(derivationGraphEntriesWorker, countChunks(iterChunks(objects, chunkSize)), numWorkers):
+        with metrics.stage('graph.reduce'):
+            addGraphEntries(G, entries)
+    metrics.log('graphBuilt', nodes=G.number_of_nodes(), edges=G.number_of_edges(), numWorkers=numWorkers)
+    return G
+
+# this function produces the same graph as populateGraphWithAndJoinedArgs using numWorkers processes
+# each node whose type may be an implication is a task (sent to the workers chunkSize at a time), along with the edges into it
+@metrics.timed('graph.andJoined')
+def populateGraphWithAndJoinedArgsParallel (G : nx.DiGraph, numWorkers : int = os.cpu_count(), chunkSize : int = 1024) -> nx.DiGraph:
+    G2 = G.copy()
+    tasks = ((node, [(source, data.get('objectName', None), data.get('importPath', None)) for source, _, data in G.in_edges(node, data=True)])
+             for node in G.nodes() if '→' in node)
+    for edges in mapChunks(andJoinedGraphEdgesWorker, iterChunks(tasks, chunkSize), numWorkers):
+        with metrics.stage('graph.reduce'):
+            addGraphEntries(G2, edges)
+    metrics.increment('graph.andJoinedEdges', G2.number_of_edges() - G.number_of_edges())
+    metrics.log('andJoinedEdgesAdded', nodes=G2.number_of_nodes(), edges=G2.number_of_edges(), numWorkers=numWorkers)
+    return G2
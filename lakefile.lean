@@ -14,5 +14,16 @@ lean_exe leanBackend {
   root := `Main
 }
 
+-- long lived lean process used by the python lean session (see leanInterface.py)
+lean_exe leanRepl {
+  root := `Repl
+  supportInterpreter := true
+}
+
+-- streams every constant in the environment as json (see generateObjectListFromExport in generateObjectList.py)
+lean_exe exportEnv {
+  root := `Export
+}
+
 require mathlib from git
   "https://github.com/leanprover-community/mathlib4"
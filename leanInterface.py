@@ -1,5 +1,16 @@
 # this file contains tools for interfacing python and lean4
+import hashlib
+import json
+import os
+import queue
+import re
+import select
+import signal
+import sqlite3
 import subprocess
+import threading
+import time
+from pipelineMetrics import metrics
 from typing import Callable
 
 
@@ -7,89 +18,467 @@ from typing import Callable
 def runCommand (command : str) -> str:
     return subprocess.run(command, stdout=subprocess.PIPE, shell=True).stdout.decode('utf-8')
 
+# ---------- lean session ----------
+# starting a lean process re-imports LeanBackend (and mathlib) every time, which makes each query take seconds
+# a lean session instead keeps a pool of warm worker processes (see Repl.lean) that load each set of imports once,
+# and take scripts over stdin, replying over stdout
+
+# below is the line used to mark the end of a script sent to a worker, and the end of the worker's reply
+endOfQueryMarker = '-- END_OF_QUERY'
+
+# below is the default command used to start a worker, any executable that speaks the same protocol can be used instead
+defaultWorkerCommand = ['lake', 'exe', 'leanRepl']
+
+# below is the default number of seconds a worker can take to answer a query, which is enough to import mathlib
+defaultQueryTimeout = 600
+
+# below is a class that wraps a single long lived lean worker process
+# a query that takes longer than the timeout (None for no limit) raises TimeoutError, and the worker is killed since it's
+# still busy with the query, the pool then starts a new worker in its place
+class LeanWorker:
+    def __init__(self, command : list[str] = defaultWorkerCommand, timeout : float = defaultQueryTimeout):
+        self.command = command
+        self.timeout = timeout
+        # the worker gets its own process group, so that killing it also kills the process 'lake exe' starts
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        bufsize=0, start_new_session=True)
+        self.buffer = b'' # the output read from the worker that hasn't been returned yet
+
+    # sends a script to the worker and returns everything lean printed while elaborating it
+    # the output is read straight from the pipe (rather than through a buffered file) so that select can wait on it
+    def query(self, leanScript : str) -> str:
+        try:
+            self.process.stdin.write((leanScript + '\n' + endOfQueryMarker + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            raise RuntimeError(f'lean worker {" ".join(self.command)} exited before answering the query')
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        marker = (endOfQueryMarker + '\n').encode('utf-8')
+        lineStart = 0 # the start of the first line of the buffer that hasn't been checked for the marker
+        while True:
+            lineEnd = self.buffer.find(b'\n', lineStart)
+            if lineEnd >= 0:
+                if self.buffer[lineStart:lineEnd+1] == marker:
+                    output, self.buffer = self.buffer[:lineStart], self.buffer[lineEnd+1:]
+                    return output.decode('utf-8')
+                lineStart = lineEnd + 1
+                continue
+            if deadline is not None:
+                ready, _, _ = select.select([self.process.stdout], [], [], max(deadline - time.monotonic(), 0))
+                if len(ready) == 0:
+                    self.kill()
+                    raise TimeoutError(f'lean worker {" ".join(self.command)} took longer than {self.timeout}s to answer the query')
+            chunk = os.read(self.process.stdout.fileno(), 65536)
+            if len(chunk) == 0:
+                raise RuntimeError(f'lean worker {" ".join(self.command)} exited before answering the query')
+            self.buffer += chunk
+
+    def kill(self):
+        if self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.kill()
+
+# below is a class that hands out queries to a pool of lean workers, starting new workers only when all others are busy
+class LeanWorkerPool:
+    def __init__(self, numWorkers : int = 1, command : list[str] = defaultWorkerCommand, timeout : float = defaultQueryTimeout):
+        self.numWorkers = numWorkers
+        self.command = command
+        self.timeout = timeout # the number of seconds each query can take, see LeanWorker
+        self.workers = [] # every running worker
+        # the workers not currently answering a query, along with a None for each worker that failed and hasn't been
+        # replaced yet, so that a query waiting for a worker starts the replacement rather than waiting forever
+        self.idleWorkers = queue.Queue()
+        self.numSlots = 0 # the number of running workers plus the number of Nones in idleWorkers
+        self.lock = threading.Lock()
+
+    # this function starts a worker in a slot that has already been counted in numSlots
+    def startWorker(self) -> LeanWorker:
+        worker = LeanWorker(self.command, self.timeout)
+        with self.lock:
+            self.workers.append(worker)
+        return worker
+
+    def acquireWorker(self) -> LeanWorker:
+        try:
+            worker = self.idleWorkers.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                canStart = self.numSlots < self.numWorkers
+                if canStart:
+                    self.numSlots += 1
+            if canStart:
+                try:
+                    return self.startWorker()
+                except:
+                    with self.lock:
+                        self.numSlots -= 1
+                    raise
+            worker = self.idleWorkers.get()
+        if worker is None:
+            # the slot of a failed worker is handed back if its replacement can't be started either, so that the other
+            # queries waiting for a worker try again rather than hang
+            try:
+                return self.startWorker()
+            except:
+                self.idleWorkers.put(None)
+                raise
+        return worker
+
+    # this function hands a worker back to the pool after a query
+    # a worker that failed mid query is in an unknown state, so rather than reuse it, it is closed and its slot is handed
+    # to the next query, which starts a new worker
+    def releaseWorker(self, worker : LeanWorker, failed : bool = False):
+        if failed:
+            with self.lock:
+                self.workers.remove(worker)
+            worker.close()
+            worker = None
+        self.idleWorkers.put(worker)
+
+    def query(self, leanScript : str) -> str:
+        worker = self.acquireWorker()
+        try:
+            output = worker.query(leanScript)
+        except:
+            self.releaseWorker(worker, failed=True)
+            raise
+        self.releaseWorker(worker)
+        return output
+
+    def close(self):
+        with self.lock:
+            for worker in self.workers:
+                worker.close()
+            self.workers = []
+            self.idleWorkers = queue.Queue()
+            self.numSlots = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# below is the active lean session, when it is None every script is run in a fresh lean process
+leanSession = None
+
+# starts a lean session, all following calls to runLeanString are answered by the session's workers
+def startLeanSession (numWorkers : int = 1, command : list[str] = defaultWorkerCommand,
+                      timeout : float = defaultQueryTimeout) -> LeanWorkerPool:
+    global leanSession
+    stopLeanSession()
+    leanSession = LeanWorkerPool(numWorkers, command, timeout)
+    return leanSession
+
+# stops the active lean session (if any), closing all of its workers
+def stopLeanSession ():
+    global leanSession
+    if leanSession is not None:
+        leanSession.close()
+        leanSession = None
+
+# below is a function that reads the lean toolchain and the revision of each lake package
+# anything derived from lean's output is only valid for the version it was produced with
+def getLeanVersion (toolchainPath : str = './lean-toolchain', lakeManifestPath : str = './lake-manifest.json') -> dict:
+    version = {'toolchain': None, 'packages': {}}
+    if os.path.exists(toolchainPath):
+        with open(toolchainPath) as toolchain:
+            version['toolchain'] = toolchain.read().strip()
+    if os.path.exists(lakeManifestPath):
+        with open(lakeManifestPath) as lakeManifest:
+            for package in json.load(lakeManifest)['packages']:
+                source = package.get('git', package.get('path', {}))
+                version['packages'][source.get('name', '')] = source.get('rev', None)
+    return version
+
+# ---------- lean query cache ----------
+# the same scripts are sent to lean again and again (across runs, re-extractions, and every time a LeanDef is created),
+# so the output of each script can be stored on disk in an sqlite database and returned from there the next time
+# outputs are keyed on the script along with a fingerprint of the lean version and the LeanBackend sources,
+# so bumping the toolchain or a package revision (or editing LeanBackend) invalidates them automatically
+
+# below is a function that hashes the lean files in the passed files and folders, whose contents scripts depend on
+def hashLeanSources (paths : list[str] = ['./LeanBackend.lean', './LeanBackend']) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(os.path.join(root, name) for root, _, names in os.walk(path) 
+                                                           for name in names if name.endswith('.lean'))
+        for file in files:
+            with open(file, 'rb') as source:
+                digest.update(file.encode('utf-8') + b'\0' + hashlib.sha256(source.read()).digest())
+    return digest.hexdigest()
+
+# below is a class that stores the output of lean scripts in an sqlite database
+class LeanQueryCache:
+    def __init__(self, path : str = './leanCache.sqlite', version : dict = None):
+        self.path = path
+        version = version if version is not None else {**getLeanVersion(), 'sources': hashLeanSources()}
+        self.version = hashlib.sha256(json.dumps(version, sort_keys=True).encode('utf-8')).hexdigest()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        self.connect()
+
+    # this function opens the database, it is called again after a fork, since an sqlite connection can't be shared between
+    # processes
+    # outputs stored for other versions are kept, since other checkouts (eg. on another toolchain) may share the database,
+    # and are left out when reading instead
+    def connect(self):
+        self.pid = os.getpid()
+        self.connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS outputs (key TEXT PRIMARY KEY, version TEXT, output TEXT)')
+
+    def key(self, leanScript : str) -> str:
+        return hashlib.sha256((self.version + '\0' + leanScript).encode('utf-8')).hexdigest()
+
+    # this function returns the stored output of a script, or None if it hasn't been stored
+    def get(self, leanScript : str) -> str | None:
+        with self.lock:
+            if self.pid != os.getpid():
+                self.connect()
+            row = self.connection.execute('SELECT output FROM outputs WHERE key = ? AND version = ?',
+                                          (self.key(leanScript), self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, leanScript : str, output : str):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.connect()
+            self.connection.execute('INSERT OR REPLACE INTO outputs VALUES (?, ?, ?)', (self.key(leanScript), self.version, output))
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+# below is the active lean query cache, when it is None every script is sent to lean
+leanCache = None
+
+# starts caching the output of every script run by runLeanString in the passed database
+def enableLeanCache (path : str = './leanCache.sqlite', version : dict = None) -> LeanQueryCache:
+    global leanCache
+    disableLeanCache()
+    leanCache = LeanQueryCache(path, version)
+    return leanCache
+
+# stops caching the output of scripts, closing the database
+def disableLeanCache ():
+    global leanCache
+    if leanCache is not None:
+        leanCache.close()
+        leanCache = None
+
+# below is the file that scripts are written to before being passed to lean
+# processes that run lean at the same time must each use their own scratch file
+scratchFile = './tmp.lean'
+
+# below is the lock held while the scratch file is written and run, since threads (see preloadLeanObjects) can run lean at the same time
+scratchLock = threading.Lock()
+
+# changes the scratch file used by this process
+def setScratchFile (path : str):
+    global scratchFile
+    scratchFile = path
+
 # below is a function to run a lean 4 script stored in a string and get the output as a string
+# the runs are timed as the 'lean.session' or 'lean.process' stage (see pipelineMetrics.py), depending on how lean is run
 def runLeanString (leanScript : str) -> str:
-    with open('./tmp.lean', 'w') as l:
-        l.write(leanScript)
-    command = 'lake env lean ./tmp.lean'
-    return runCommand(command)
+    if leanCache is not None:
+        output = leanCache.get(leanScript)
+        if output is not None:
+            metrics.increment('lean.cacheHits')
+            return output
+    if leanSession is not None:
+        with metrics.stage('lean.session'):
+            output = leanSession.query(leanScript)
+        succeeded = True # a worker that fails raises an error instead
+    else:
+        with metrics.stage('lean.process'):
+            with scratchLock:
+                with open(scratchFile, 'w') as l:
+                    l.write(leanScript)
+                command = f'lake env lean {scratchFile}'
+                result = subprocess.run(command, stdout=subprocess.PIPE, shell=True)
+        output = result.stdout.decode('utf-8')
+        # lean exits with 1 when the script has errors, any other failure means lean couldn't be run at all
+        succeeded = result.returncode in [0, 1]
+        if not succeeded:
+            metrics.increment(f'lean.process.failures.exitCode{result.returncode}')
+    if leanCache is not None and succeeded and isCacheableOutput(leanScript, output):
+        leanCache.put(leanScript, output)
+    return output
+
+# below is the pattern matching the line number of each error lean reports (or an error reported without a position)
+errorPattern = re.compile(r':(\d+):\d+: error|^error', re.MULTILINE)
+
+# this function checks if the output of a script can be cached, which isn't the case if lean failed in the header (or
+# reported an error without a position, eg. an uncaught exception in the worker)
+# an import can fail without the version changing (eg. a module that wasn't built yet, or lean running out of memory), so a
+# cached failure would be returned even after it was fixed, while errors in the commands (eg. an unknown identifier) can only
+# change with the version
+def isCacheableOutput (leanScript : str, output : str) -> bool:
+    headerLines = max((lineNum + 1 for lineNum, line in enumerate(leanScript.split('\n')) if line.strip().startswith('import ')), default=0)
+    for match in errorPattern.finditer(output):
+        if match.group(1) is None or int(match.group(1)) <= max(headerLines, 1):
+            return False
+    return True
+
+# below is the string printed between the commands of a batched script, it is used to split up lean's output
+commandSeparator = 'COMMAND_OUTPUT_SEPARATOR'
+
+# below is a function to run many lean 4 commands that share the same imports in a single script
+# the output of each command is returned separately, with any output produced while importing prepended to each of them
+def runLeanCommands (commands : list[str], requiredImports : list[str] = []) -> list[str]:
+    if len(commands) == 0:
+        return []
+    separatedCommands = ''.join(f'''
+        #print "{commandSeparator}"
+        {command}''' for command in commands)
+    output = runLeanString(f'''
+        import LeanBackend
+        {' '.join(f'import {package}' for package in requiredImports)}
+        {separatedCommands}
+    ''')
+    sections = output.split(commandSeparator + '\n')
+    headerOutput = sections[0]
+    # if lean gave up before reaching the commands (eg. an import could not be found) each command only gets the header output
+    commandOutputs = sections[1:] + [''] * (len(commands) - len(sections[1:]))
+    return [headerOutput + commandOutput for commandOutput in commandOutputs]
+
+# below is a function that reads the type of an object from the output of '#check @[name]'
+# lean errors are raised as the corresponding python errors
+def parseCheckOutput (name : str, check : str) -> str:
+    # if the variable can not be found by lean then raise an error
+    if f'error: unknown identifier \'{name}\'' in check or 'unknown namespace' in check or 'unknown constant' in check:
+        raise NameError(f'unknown lean identifier {name}')
+    # if the required package could not be found by lean then raise an error
+    elif 'unknown package' in check:
+        raise ImportError(f'{check}: lean can\'t find the package you provided')
+    else:
+        return check.replace(f'{name} : ', '').strip('\n')
 
 # below is a class used to represent general lean 4 objects using dependent type theory
 class LeanObject:
-    def __init__(self, name : str, lean_type : str = None, value : str | int | float | bool | list = 'sorry', requiredImports : list[str] = []):
+    # below are the attributes of an object that are resolved using lean
+    resolvedAttributes = ['type', 'value']
+
+    # a lazy object doesn't run lean until its type or value is first used (or resolve is called)
+    def __init__(self, name : str, lean_type : str = None, value : str | int | float | bool | list = 'sorry', requiredImports : list[str] = [],
+                 lazy : bool = False):
         self.name = name
         self.requiredImports = requiredImports
+        self.pending = (lean_type, value) # the type and value passed in, until they have been resolved
+        self.resolveLock = threading.Lock()
+        if not lazy:
+            self.resolve()
 
-        # if a type is not provided, try to infer it using lean
-        if lean_type == None:
-            check = runLeanString(f'''
-                import LeanBackend
-                {' '.join(f'import {package}' for package in self.requiredImports)}
-                #check @{name}
-            ''')
-            # if the variable can not be found by lean then raise an error
-            if f'error: unknown identifier \'{name}\'' in check or 'unknown namespace' in check or 'unknown constant' in check:
-                raise NameError(f'unknown lean identifier {name}')
-            # if the required package could not be found by lean then raise an error
-            elif 'unknown package' in check:
-                raise ImportError(f'{check}: lean can\'t find the package you provided')
-            else:
-                lean_type = check.replace(f'{name} : ', '').strip('\n')
-        self.type = lean_type
+    # this function infers the type and value of the object using lean, if they weren't provided
+    def resolve(self):
+        with self.resolveLock:
+            if self.pending is None:
+                return
+            lean_type, value = self.pending
+            name = self.name
 
-        # if a value is not provided, try to infer it using lean
-        if value == 'sorry':
-            try:
-                if self.type == 'Nat' or self.type == 'Int':
-                    self.value = int(runLeanString(f'''
-                        import LeanBackend
-                        {' '.join(f'import {package}' for package in self.requiredImports)}
-                        #eval {name}
-                    '''))
-                elif self.type == 'Float':
-                    self.value = float(runLeanString(f'''
-                        import LeanBackend
-                        {' '.join(f'import {package}' for package in self.requiredImports)}
-                        #eval {name}
-                    '''))
-                elif self.type == 'Bool':
-                    self.value = True if runLeanString(f'''
-                        import LeanBackend
-                        {' '.join(f'import {package}' for package in self.requiredImports)}
-                        #eval {name}
-                    ''') == 'true' else False
-                elif self.type.startswith('Array ') or self.type.startswith('List ') and not '→' in self.type:
-                    self.value = runLeanString(f'''
-                        import LeanBackend
-                        {' '.join(f'import {package}' for package in self.requiredImports)}
-                        #eval {name}
-                    ''').replace(' ', '').replace('[', '').replace(']', '').replace('#[', '').split(',')
-                else:
+            # if a type is not provided, try to infer it using lean
+            if lean_type == None:
+                check = runLeanString(f'''
+                    import LeanBackend
+                    {' '.join(f'import {package}' for package in self.requiredImports)}
+                    #check @{name}
+                ''')
+                lean_type = parseCheckOutput(name, check)
+            self.type = lean_type
+
+            # if a value is not provided, try to infer it using lean
+            if value == 'sorry':
+                try:
+                    if self.type == 'Nat' or self.type == 'Int':
+                        self.value = int(runLeanString(f'''
+                            import LeanBackend
+                            {' '.join(f'import {package}' for package in self.requiredImports)}
+                            #eval {name}
+                        '''))
+                    elif self.type == 'Float':
+                        self.value = float(runLeanString(f'''
+                            import LeanBackend
+                            {' '.join(f'import {package}' for package in self.requiredImports)}
+                            #eval {name}
+                        '''))
+                    elif self.type == 'Bool':
+                        self.value = True if runLeanString(f'''
+                            import LeanBackend
+                            {' '.join(f'import {package}' for package in self.requiredImports)}
+                            #eval {name}
+                        ''') == 'true' else False
+                    elif self.type.startswith('Array ') or self.type.startswith('List ') and not '→' in self.type:
+                        self.value = runLeanString(f'''
+                            import LeanBackend
+                            {' '.join(f'import {package}' for package in self.requiredImports)}
+                            #eval {name}
+                        ''').replace(' ', '').replace('[', '').replace(']', '').replace('#[', '').split(',')
+                    else:
+                        value = runLeanString(f'''
+                            import LeanBackend
+                            {' '.join(f'import {package}' for package in self.requiredImports)}
+                            #print {name}
+                        ''')
+                        value = ':='.join(value.split(':=')[1:])
+
+                        self.value = value
+                        if 'failed to be synthesized' in self.value:
+                            raise TypeError(f'The value of {self.name} could not be synthesized')
+                except:
                     value = runLeanString(f'''
                         import LeanBackend
                         {' '.join(f'import {package}' for package in self.requiredImports)}
                         #print {name}
                     ''')
                     value = ':='.join(value.split(':=')[1:])
-
+                
                     self.value = value
                     if 'failed to be synthesized' in self.value:
                         raise TypeError(f'The value of {self.name} could not be synthesized')
-            except:
-                value = runLeanString(f'''
-                    import LeanBackend
-                    {' '.join(f'import {package}' for package in self.requiredImports)}
-                    #print {name}
-                ''')
-                value = ':='.join(value.split(':=')[1:])
-                
+
+
+            else:
                 self.value = value
-                if 'failed to be synthesized' in self.value:
-                    raise TypeError(f'The value of {self.name} could not be synthesized')
 
+            self.pending = None
 
-        else:
-            self.value = value
+    # this function is only called for attributes that haven't been set, so it resolves the object the first time its
+    # type or value is used
+    def __getattr__(self, attribute : str):
+        if attribute in type(self).resolvedAttributes and self.__dict__.get('pending', None) is not None:
+            self.resolve()
+            return getattr(self, attribute)
+        raise AttributeError(f'{type(self).__name__} object has no attribute {attribute}')
+
+    # the lock can't be pickled, so it is left out and a new one is made when the object is unpickled
+    def __getstate__(self) -> dict:
+        return {attribute: value for attribute, value in self.__dict__.items() if attribute != 'resolveLock'}
+
+    def __setstate__(self, state : dict):
+        self.__dict__.update(state)
+        self.resolveLock = threading.Lock()
     
     def functionality(self, *args) -> tuple[str, str]:
         outputType = runLeanString(f'''
@@ -144,6 +533,19 @@ class LeanObject:
             # return the output type and value
             return outputType, outputValue
         
+    # infers the types of many objects that share the same imports using a single lean run
+    # the result maps each name to its type, or to the error that creating that object on its own would have raised
+    @staticmethod
+    def checkMany (names : list[str], requiredImports : list[str] = []) -> dict[str, str | Exception]:
+        checks = runLeanCommands([f'#check @{name}' for name in names], requiredImports)
+        types = {}
+        for name, check in zip(names, checks):
+            try:
+                types[name] = parseCheckOutput(name, check)
+            except (NameError, ImportError) as error:
+                types[name] = error
+        return types
+
     def overrideFunctionality (self, func: Callable) -> tuple[str, str]:
         # this function can be used to override __call__ functionality by passing an alternative function
         # this allows for a function to be implemented in python rather than lean
@@ -154,8 +556,14 @@ class LeanObject:
 
 # below is a class used to store lean 4 theorems, which are just objects where the type is a proposition, and the existence of the object represents that it has been proven
 class LeanTheorem (LeanObject):
-    def __init__(self, name : str, lean_prop : str = None, proof : str | int | float | bool | list = 'sorry', requiredImports : list[str] = []):
-        super().__init__(name, lean_prop, proof, requiredImports)
+    resolvedAttributes = ['type', 'value', 'prop', 'proof']
+
+    def __init__(self, name : str, lean_prop : str = None, proof : str | int | float | bool | list = 'sorry', requiredImports : list[str] = [],
+                 lazy : bool = False):
+        super().__init__(name, lean_prop, proof, requiredImports, lazy)
+
+    def resolve(self):
+        super().resolve()
         self.prop = self.type
         self.proof = self.value
 
@@ -164,12 +572,26 @@ class LeanTheorem (LeanObject):
     
 # below is a class used to store lean 4 definitions, which here are just objects that are not theorems
 class LeanDef (LeanObject):
-    def __init__(self, name : str, lean_type : str = None, value : str | int | float | bool | list = 'sorry', requiredImports : list[str] = []):
-        super().__init__(name, lean_type, value, requiredImports)
+    def __init__(self, name : str, lean_type : str = None, value : str | int | float | bool | list = 'sorry', requiredImports : list[str] = [],
+                 lazy : bool = False):
+        super().__init__(name, lean_type, value, requiredImports, lazy)
 
     def __str__(self):
         return self.name + ' : ' + self.type + ' := ' + str(self.value)
     
-# this function cleans up by removing 'tmp.lean'
+# this function resolves lazy objects in a background thread, so that they are ready by the time they are used
+# an object that fails to resolve is left unresolved, and raises the error when it is used
+def preloadLeanObjects (objects : list[LeanObject]) -> threading.Thread:
+    def preload():
+        for object in objects:
+            try:
+                object.resolve()
+            except Exception:
+                pass
+    thread = threading.Thread(target=preload, daemon=True)
+    thread.start()
+    return thread
+
+# this function cleans up by removing the scratch file ('tmp.lean' by default)
 def cleanup():
-    runCommand('rm ./tmp.lean')
\ No newline at end of file
+    runCommand(f'rm {scratchFile}')
\ No newline at end of file
@@ -0,0 +1,117 @@
+# this file implements a streaming tokenizer for lean 4 source code, used to discover the declarations in a file
+# the text is scanned once from start to end, skipping (nested) comments, strings, and attributes,
+# and declarations are yielded as soon as they are found along with their fully qualified names
+import re
+from typing import Iterator, NamedTuple
+
+
+# below are the commands that introduce a named declaration
+declarationKeywords = {'def', 'theorem', 'lemma', 'abbrev', 'inductive', 'structure', 'class', 'instance', 'axiom', 'opaque'}
+
+# below are the keywords that can come before a declaration keyword and change its meaning
+modifierKeywords = {'private', 'protected', 'noncomputable', 'partial', 'unsafe', 'nonrec'}
+
+# below are the commands that open and close scopes
+scopeKeywords = {'namespace', 'section', 'mutual', 'end'}
+
+# below is a class used to store a single token
+class Token(NamedTuple):
+    kind : str # one of 'keyword' or 'attribute'
+    text : str
+    name : str | None # the identifier following a keyword, if there is one
+    line : int
+
+# below is a class used to store a declaration found in a lean file
+class LeanDeclaration(NamedTuple):
+    kind : str # the declaration keyword (eg. 'def' or 'theorem')
+    name : str # the name as it was written in the file
+    fullName : str # the name including the namespaces it was declared in
+    modifiers : tuple[str, ...] # the modifiers and attributes written before the declaration keyword
+    line : int
+
+# below is the pattern matching the parts of a lean file the tokenizer has to look at
+# everything it doesn't match (proof terms, binders, etc.) is skipped over by the regular expression engine
+# block comments and attributes can nest, so only their opening is matched here and the rest is scanned by skipNested
+identifier = r'(?:[^\W\dλΠΣ]|«[^»]*»)(?:[^\WλΠΣ]|[\'!?]|«[^»]*»)*(?:\.(?:[^\W\dλΠΣ]|«[^»]*»)(?:[^\WλΠΣ]|[\'!?]|«[^»]*»)*)*'
+keywords = '|'.join(sorted(declarationKeywords | modifierKeywords | scopeKeywords, key=len, reverse=True))
+# the attributes written in parentheses between a keyword and the name (eg. 'instance (priority := 100) instFoo') are skipped
+parenthesized = r'\((?:[^()]|\([^()]*\))*\)'
+# the leading lookahead lets the regular expression engine reject most positions after looking at a single character
+firstCharacters = re.escape(''.join(sorted({keyword[0] for keyword in keywords.split('|')})))
+tokenPattern = re.compile(rf"""
+    (?=[-/@"'{firstCharacters}])
+  (?:
+    (?P<lineComment>--[^\n]*)
+  | (?P<blockComment>/-)
+  | (?P<attribute>@\[)
+  | (?P<string>"(?:[^"\\]|\\.)*"?)
+  | (?<![\w'!?])(?P<char>'(?:[^'\\\n]|\\[^\n]+?)')
+  | (?<![\w'!?.«])(?P<deriving>deriving[ \t\r\n]+instance)(?![\w'!?.»])
+  | (?<![\w'!?.«])(?P<keyword>{keywords})(?![\w'!?.»])(?:[ \t\r\n]+(?:{parenthesized}[ \t\r\n]*)?(?P<name>(?!(?:{keywords})(?![\w'!?.»])){identifier}))?
+  )
+""", re.VERBOSE | re.DOTALL)
+
+# below is the pattern matching the brackets inside of a comment or attribute that change its nesting depth
+blockCommentPattern = re.compile(r'/-|-/')
+attributePattern = re.compile(r'\[|\]')
+
+# this function finds the end of a nested block, starting just after its opening
+def skipNested (text : str, position : int, pattern : re.Pattern, opening : str) -> int:
+    depth = 1
+    for match in pattern.finditer(text, position):
+        depth += 1 if match.group() == opening else -1
+        if depth == 0:
+            return match.end()
+    return len(text)
+
+# this function yields the command keywords (with the name following them) and attributes of a lean file
+# comments, strings, and character literals are skipped, so keywords inside of them are never reported
+def tokenize (text : str) -> Iterator[Token]:
+    position = 0
+    line = 1
+    search = tokenPattern.search
+    while True:
+        match = search(text, position)
+        if match is None:
+            return
+        kind = match.lastgroup if match.lastgroup != 'name' else 'keyword'
+        end = match.end()
+        if kind == 'blockComment':
+            end = skipNested(text, end, blockCommentPattern, '/-')
+        elif kind == 'attribute':
+            end = skipNested(text, end, attributePattern, '[')
+        line += text.count('\n', position, match.start())
+        if kind == 'keyword':
+            yield Token(kind, match.group('keyword'), match.group('name'), line)
+        # 'deriving instance BEq for Foo' generates instances rather than declaring one, so it is reported without a name
+        elif kind == 'deriving':
+            yield Token('keyword', 'deriving', None, line)
+        elif kind == 'attribute':
+            yield Token(kind, text[match.start():end], None, line)
+        line += text.count('\n', match.start(), end)
+        position = end
+
+# this function yields the declarations of a lean file in the order they appear
+# namespaces, sections, and mutual blocks are tracked so that each declaration gets its fully qualified name
+def iterDeclarations (text : str) -> Iterator[LeanDeclaration]:
+    scopes = [] # stack of the open scopes, each is the list of namespace components it added
+    modifiers = [] # modifiers and attributes seen since the last command
+    for token in tokenize(text):
+        if token.kind == 'attribute' or token.text in modifierKeywords:
+            modifiers.append(token.text)
+            continue
+        if token.text == 'namespace':
+            scopes.append(token.name.split('.') if token.name is not None else [])
+        elif token.text == 'section' or token.text == 'mutual':
+            scopes.append([])
+        elif token.text == 'end':
+            if len(scopes) > 0:
+                scopes.pop()
+        # anonymous declarations (eg. 'instance : ...') can't be referred to by name
+        elif token.name is not None:
+            if token.name.startswith('_root_.'):
+                fullName = token.name[len('_root_.'):]
+            else:
+                fullName = '.'.join([component for scope in scopes for component in scope] + [token.name])
+            yield LeanDeclaration(token.text, token.name, fullName, tuple(modifiers), token.line)
+        modifiers = []
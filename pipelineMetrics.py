@@ -0,0 +1,187 @@
+# this file records where the time goes in the extraction and graph pipeline
+# each stage (eg. a lean run, extracting a file, building the graph, or a search) is timed, and counters record things like
+# the number of objects extracted and why extractions failed
+# the metrics can be read as a snapshot, written as structured (json lines) logs, and each stage can also be run under cProfile
+# the pipeline records into the shared metrics object below, worker processes send theirs back to be merged (see merge)
+import collections
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+
+# below is a class that keeps the timings of a single stage
+class StageTimer:
+    def __init__(self):
+        self.count = 0
+        self.totalSeconds = 0.0
+        self.maxSeconds = 0.0
+        self.recentSeconds = collections.deque(maxlen=1024) # the latest timings, used for the percentiles
+        self.firstStart = None # the wall clock time the stage first started and last finished, used for the rate
+        self.lastEnd = None
+
+    def record(self, seconds : float, end : float):
+        self.count += 1
+        self.totalSeconds += seconds
+        self.maxSeconds = max(self.maxSeconds, seconds)
+        self.recentSeconds.append(seconds)
+        self.firstStart = end - seconds if self.firstStart is None else min(self.firstStart, end - seconds)
+        self.lastEnd = end if self.lastEnd is None else max(self.lastEnd, end)
+
+    def summary(self) -> dict:
+        recent = sorted(self.recentSeconds)
+        elapsed = self.lastEnd - self.firstStart if self.count > 0 else 0.0
+        return {'count': self.count, 'totalSeconds': self.totalSeconds, 'meanSeconds': self.totalSeconds / max(self.count, 1),
+                'maxSeconds': self.maxSeconds,
+                'p50Seconds': recent[len(recent) // 2] if len(recent) > 0 else 0.0,
+                'p99Seconds': recent[min(int(len(recent) * 0.99), len(recent) - 1)] if len(recent) > 0 else 0.0,
+                'perSecond': self.count / elapsed if elapsed > 0 else 0.0}
+
+# below is a class that records the timers and counters of the pipeline
+class PipelineMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timers = {} # maps each stage to its StageTimer
+        self.counters = collections.Counter()
+        self.startTime = time.time()
+        self.logFile = None
+        self.profiledStages = set() # the stages run under cProfile, or {'*'} for all of them
+        self.profileDirectory = None
+        self.profiles = {} # maps each profiled stage to its cProfile.Profile
+        self.profiling = threading.local() # only one profile can run at a time in a thread, so nested stages aren't profiled
+
+    def increment(self, name : str, amount : int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def record(self, name : str, seconds : float):
+        end = time.time()
+        with self.lock:
+            self.timers.setdefault(name, StageTimer()).record(seconds, end)
+
+    # this function times the code run inside of it as the passed stage
+    # an error raised inside of it is counted as a failure of the stage, under the name of the error
+    @contextlib.contextmanager
+    def stage(self, name : str):
+        profile = self.startProfile(name)
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            self.increment(f'{name}.failures.{type(error).__name__}')
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start)
+            if profile is not None:
+                profile.disable()
+                self.profiling.active = False
+
+    # this function is a decorator that times every call of a function as the passed stage
+    def timed(self, name : str):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # this function returns the metrics recorded so far
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'uptimeSeconds': time.time() - self.startTime, 'counters': dict(sorted(self.counters.items())),
+                    'stages': {name: timer.summary() for name, timer in sorted(self.timers.items())}}
+
+    # this function returns the raw metrics recorded so far and clears them, so a worker process can send them to be merged
+    def collect(self) -> dict:
+        with self.lock:
+            collected = {'counters': dict(self.counters), 'timers': self.timers}
+            self.counters = collections.Counter()
+            self.timers = {}
+        return collected
+
+    # this function adds the metrics collected in another process (see collect) to these ones
+    def merge(self, collected : dict):
+        with self.lock:
+            self.counters.update(collected['counters'])
+            for name, other in collected['timers'].items():
+                timer = self.timers.setdefault(name, StageTimer())
+                timer.count += other.count
+                timer.totalSeconds += other.totalSeconds
+                timer.maxSeconds = max(timer.maxSeconds, other.maxSeconds)
+                timer.recentSeconds.extend(other.recentSeconds)
+                if other.count > 0:
+                    timer.firstStart = other.firstStart if timer.firstStart is None else min(timer.firstStart, other.firstStart)
+                    timer.lastEnd = other.lastEnd if timer.lastEnd is None else max(timer.lastEnd, other.lastEnd)
+
+    def reset(self):
+        with self.lock:
+            self.timers = {}
+            self.counters = collections.Counter()
+            self.startTime = time.time()
+
+    # ---------- structured logs ----------
+
+    # this function starts appending log events to the passed file, one json object per line
+    def enableLog(self, path : str = './pipelineMetrics.jsonl'):
+        self.disableLog()
+        self.logFile = open(path, 'a', encoding='utf-8')
+
+    def disableLog(self):
+        if self.logFile is not None:
+            self.logFile.close()
+            self.logFile = None
+
+    # this function writes a log event with the passed fields, if logging is enabled
+    def log(self, event : str, **fields):
+        if self.logFile is None:
+            return
+        line = json.dumps({'time': time.time(), 'pid': os.getpid(), 'event': event, **fields}, ensure_ascii=False, default=str)
+        with self.lock:
+            self.logFile.write(line + '\n')
+            self.logFile.flush()
+
+    # ---------- profiling ----------
+
+    # this function runs the passed stages (or all stages with '*') under cProfile, see dumpProfiles
+    def enableProfiling(self, stages : list[str] = ['*'], directory : str = './profiles'):
+        self.profiledStages = set(stages)
+        self.profileDirectory = directory
+
+    def disableProfiling(self):
+        self.profiledStages = set()
+        self.profiles = {}
+
+    def startProfile(self, name : str) -> cProfile.Profile | None:
+        if len(self.profiledStages) == 0 or not ('*' in self.profiledStages or name in self.profiledStages):
+            return None
+        if getattr(self.profiling, 'active', False):
+            return None
+        with self.lock:
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError: # another profiler is already running (eg. 'python -m cProfile')
+            return None
+        self.profiling.active = True
+        return profile
+
+    # this function writes the profile of each stage to '[stage].[pid].prof' in the profile directory
+    # the files can be read with pstats (eg. 'python -m pstats profiles/extract.1234.prof')
+    def dumpProfiles(self) -> list[str]:
+        if self.profileDirectory is None:
+            return []
+        os.makedirs(self.profileDirectory, exist_ok=True)
+        paths = []
+        with self.lock:
+            profiles = list(self.profiles.items())
+        for name, profile in profiles:
+            paths.append(os.path.join(self.profileDirectory, f'{name}.{os.getpid()}.prof'))
+            profile.dump_stats(paths[-1])
+        return paths
+
+# below is the metrics object shared by the whole pipeline
+metrics = PipelineMetrics()
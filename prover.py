@@ -1,22 +1,552 @@
 # this is a simple theorem prover that uses the theorem map
+import functools
+import heapq
+import multiprocessing
 import networkx as nx
+import re
+import time
+from collections import deque
+from andJoinedEdges import AndJoinedEdge, AndJoinedEdges
+from compactGraph import CompactGraph
+from pipelineMetrics import metrics
+from reachabilityIndex import ReachabilityIndex
+from typeIndex import TypeIndex
+from typeTerms import TypeTable, TypeTerm
+from typing import NamedTuple
 
 # the theorem prover works by finding a path between nodes in the derivation graph (if possible)
 # if a path is discovered, the theorems corresponding to each edge along the way can be applied
 # they will by definition map from the desired premises to the desired conclusion
 
+# below are the search methods findPath can use
+# 'bidirectional' searches forwards from the input and backwards from the output at the same time, meeting in the middle
+# 'astar' searches forwards, trying the nodes most similar to the output first (see similarityHeuristic)
+# 'bfs' is a plain breadth first search forwards from the input
+searchMethods = ['bidirectional', 'astar', 'bfs']
+
+# below is the error raised when a search gives up because it reached its node or time limit
+# it is a kind of NetworkXNoPath, since no path was found within the limits
+class SearchLimitReached(nx.NetworkXNoPath):
+    pass
+
 # produces a list of edge names that correspond to path from input node to output node
-def findPath(G : nx.DiGraph, inputType : str, outputType : str) -> list[str]:
+# if andJoinedEdges is passed, G shouldn't contain the and-joined theorems, and they are generated as they are reached instead
+# maxNodes limits the number of nodes that are expanded and timeout limits the number of seconds the search takes,
+# SearchLimitReached is raised if either is reached before a path is found
+# by default the search is bidirectional, unless the and-joined edges are generated on demand, since they can't be followed backwards
+# if a reachability index of G is passed, its labels reject almost all queries without a path before searching,
+# and the search skips every node they rule out (the index isn't used with on-demand and-joined edges)
+# if a type index of G is passed, types that aren't nodes of G are mapped to the node with the same normalized type
+# (eg. differing only in spacing or redundant parentheses), and NodeNotFound names the closest nodes if there is no such node
+# if the nodes of G were merged (see mergeEquivalentNodes), the map from each merged node to the node it was merged into can
+# be passed as mergedNodes, so that the types of merged nodes are searched for as the nodes they were merged into
+# each search is timed as the 'search' stage, with searches that don't find a path counted by the error they raise
+@metrics.timed('search')
+def findPath(G : nx.DiGraph, inputType : str, outputType : str, andJoinedEdges : AndJoinedEdges = None, method : str = None,
+             maxNodes : int = None, timeout : float = None, heuristicWeight : float = 1.0, 
+             reachabilityIndex : ReachabilityIndex = None, typeIndex : TypeIndex = None,
+             mergedNodes : dict[str, str] = None) -> list[str]:
+    if mergedNodes is not None:
+        inputType, outputType = mergedNodes.get(inputType, inputType), mergedNodes.get(outputType, outputType)
+    if typeIndex is not None:
+        inputType = resolveNode(typeIndex, inputType, andJoinedEdges is None)
+        outputType = resolveNode(typeIndex, outputType, andJoinedEdges is None)
+    space = SearchSpace(G, andJoinedEdges, reachabilityIndex)
+    source, target = space.endpoints(inputType, outputType)
+    if space.index is not None and not space.index.mayReach(space.sourceId, space.targetId):
+        raise nx.NetworkXNoPath(f'Node {outputType} not reachable from {inputType}')
+    limits = SearchLimits(maxNodes, timeout)
+
+    method = method if method is not None else ('astar' if andJoinedEdges is not None else 'bidirectional')
+    if method == 'bidirectional':
+        if andJoinedEdges is not None:
+            raise ValueError('a bidirectional search can\'t follow and-joined edges that are generated on demand')
+        path, virtualEdges = bidirectionalSearch(space, source, target, limits)
+    elif method == 'astar':
+        path, virtualEdges = astarSearch(space, source, target, limits, heuristicWeight)
+    elif method == 'bfs':
+        path, virtualEdges = breadthFirstSearch(space, source, target, limits)
+    else:
+        raise ValueError(f'unknown search method {method}, expected one of {searchMethods}')
+    return pathTheorems(space, path, virtualEdges)
+
+# finds the node of a type using a type index, raising NodeNotFound with the closest nodes if required and there isn't one
+# (the and-joined edges can reach types that aren't nodes, so those are left as they are)
+def resolveNode(typeIndex : TypeIndex, text : str, required : bool) -> str:
+    node = typeIndex.resolve(text)
+    if node is not None:
+        return node
+    if required:
+        closest = [node for node, _ in typeIndex.closestNodes(text, limit=3)]
+        raise nx.NodeNotFound(f'{text} is not in G, the closest nodes are {closest}')
+    return text
+
+# produces the imports and names of the theorems (edges) along a path, in the order they must be applied
+def pathTheorems(space : 'SearchSpace', path : list, virtualEdges : list[AndJoinedEdge | None]) -> tuple[list[str], list[str]]:
     imports = [] # will store list of imports for the required theorems
     theorems = [] # will store list of theorems in the order they must be applied
-    path = nx.astar_path(G, inputType, outputType)
 
     # get the names of all theorems (edges) along the path
     prevNode = path[0]
-    for node in path[1:]:
-        edge = G.get_edge_data(prevNode, node)
+    for node, virtualEdge in zip(path[1:], virtualEdges):
+        edge = space.edgeData(prevNode, node, virtualEdge)
         theorems.append(edge['objectName'])
         imports.append(edge['importPath'])
         prevNode = node
 
-    return imports, theorems
\ No newline at end of file
+    return imports, theorems
+
+
+# ---------- search spaces ----------
+
+# below is a class that gives the searches a common view of the different kinds of graph
+# networkx graphs are searched by node type, compact graphs by node id, and the and-joined edges (if any) are added to the
+# successors of each node, with the virtual edge used to reach each successor (or None for the edges of the graph)
+# with a reachability index, the successors that can't reach the target and the predecessors the source can't reach are skipped
+class SearchSpace:
+    def __init__(self, G, andJoinedEdges : AndJoinedEdges = None, index : ReachabilityIndex = None):
+        self.G = G
+        self.andJoinedEdges = andJoinedEdges
+        # the and-joined edges are generated from node types, so the compact graph is searched by type as well in that case
+        self.useIds = isinstance(G, CompactGraph) and andJoinedEdges is None
+        self.index = index if andJoinedEdges is None else None
+        # the index refers to nodes by id, which are the search nodes themselves for a compact graph
+        self.indexId = (lambda node: node) if self.useIds or index is None else index.nodeIds.get
+
+    # this function finds the source and target nodes of a search, raising NodeNotFound the same way networkx does
+    def endpoints(self, inputType : str, outputType : str) -> tuple:
+        if self.andJoinedEdges is not None:
+            # the nodes of G are keyed by the canonical text of their types, and the input and output don't have to be
+            # nodes of G, as long as they can be reached using and-joined edges
+            source = self.andJoinedEdges.typeTable.parse(inputType).key
+            target = self.andJoinedEdges.typeTable.parse(outputType).key
+            if not source in self.G and len(self.andJoinedEdges.successors(source)) == 0:
+                raise nx.NodeNotFound(f'Source {inputType} is not in G')
+            if not target in self.G and not self.andJoinedEdges.isOutput(target):
+                raise nx.NodeNotFound(f'Target {outputType} is not in G')
+            return source, target
+        if self.useIds:
+            source, target = self.G.nodeId(inputType), self.G.nodeId(outputType)
+        else:
+            source = inputType if inputType in self.G else None
+            target = outputType if outputType in self.G else None
+        if source is None or target is None:
+            raise nx.NodeNotFound(f'Either source {inputType} or target {outputType} is not in G')
+        if self.index is not None:
+            self.sourceId, self.targetId = self.indexId(source), self.indexId(target)
+        return source, target
+
+    def text(self, node) -> str:
+        return self.G.nodeText(node) if self.useIds else node
+
+    def successors(self, node) -> list[tuple]:
+        if self.useIds:
+            successors = [(successor, None) for successor in self.G.successorIds(node)]
+        else:
+            successors = [(successor, None) for successor in self.G.successors(node)] if node in self.G else []
+        if self.andJoinedEdges is not None:
+            successors += self.andJoinedEdges.successors(node)
+        if self.index is not None:
+            successors = [(successor, virtualEdge) for successor, virtualEdge in successors 
+                          if self.index.mayReach(self.indexId(successor), self.targetId)]
+        return successors
+
+    def predecessors(self, node) -> list:
+        if self.useIds:
+            predecessors = list(self.G.predecessorIds(node))
+        else:
+            predecessors = list(self.G.predecessors(node)) if node in self.G else []
+        if self.index is not None:
+            predecessors = [predecessor for predecessor in predecessors 
+                            if self.index.mayReach(self.sourceId, self.indexId(predecessor))]
+        return predecessors
+
+    def edgeData(self, source, target, virtualEdge : AndJoinedEdge | None) -> dict:
+        if virtualEdge is not None:
+            return virtualEdge.data()
+        if self.useIds:
+            return self.G.edgeDataIds(source, target)
+        return self.G.get_edge_data(source, target)
+
+# below is a class that keeps track of the node and time limits of a search
+class SearchLimits:
+    def __init__(self, maxNodes : int = None, timeout : float = None):
+        self.maxNodes = maxNodes
+        self.deadline = time.perf_counter() + timeout if timeout is not None else None
+        self.numExpanded = 0
+
+    # this function is called each time a node is expanded
+    def expand(self):
+        self.numExpanded += 1
+        if self.maxNodes is not None and self.numExpanded > self.maxNodes:
+            raise SearchLimitReached(f'no path found within the limit of {self.maxNodes} nodes')
+        # checking the clock is slow compared to expanding a node, so it is only done every 64 nodes
+        if self.deadline is not None and self.numExpanded % 64 == 1 and time.perf_counter() > self.deadline:
+            raise SearchLimitReached(f'no path found before the search timed out')
+
+# this function follows the parents of each node back from the target to produce the path and the virtual edges along it
+def tracePath(parents : dict, target) -> tuple[list, list[AndJoinedEdge | None]]:
+    path, virtualEdges = [target], []
+    while parents[path[-1]] is not None:
+        node, virtualEdge = parents[path[-1]]
+        path.append(node)
+        virtualEdges.append(virtualEdge)
+    return list(reversed(path)), list(reversed(virtualEdges))
+
+
+# ---------- searches ----------
+# all of the searches return a path with the fewest edges, as a list of nodes and the virtual edge used for each step
+
+def breadthFirstSearch(space : SearchSpace, source, target, limits : SearchLimits) -> tuple[list, list]:
+    parents = {source: None} # maps each visited node to the node it was reached from, and the virtual edge used
+    queue = deque([source])
+    while len(queue) > 0 and not target in parents:
+        node = queue.popleft()
+        limits.expand()
+        for successor, virtualEdge in space.successors(node):
+            if not successor in parents:
+                parents[successor] = (node, virtualEdge)
+                queue.append(successor)
+    if not target in parents:
+        raise nx.NetworkXNoPath(f'Node {space.text(target)} not reachable from {space.text(source)}')
+    return tracePath(parents, target)
+
+# the two searches take turns expanding a whole level, always picking the side with the smaller frontier,
+# and stop as soon as they meet (the same way networkx's bidirectional_shortest_path does)
+# a query without an answer stops as soon as either side runs out of nodes, which is usually long before the whole
+# reachable set of the input has been visited
+def bidirectionalSearch(space : SearchSpace, source, target, limits : SearchLimits) -> tuple[list, list]:
+    if source == target:
+        return [source], []
+    forwardParents, backwardParents = {source: None}, {target: None}
+    forwardFrontier, backwardFrontier = [source], [target]
+    while len(forwardFrontier) > 0 and len(backwardFrontier) > 0:
+        nextFrontier = []
+        if len(forwardFrontier) <= len(backwardFrontier):
+            for node in forwardFrontier:
+                limits.expand()
+                for successor, _ in space.successors(node):
+                    if not successor in forwardParents:
+                        forwardParents[successor] = (node, None)
+                        nextFrontier.append(successor)
+                    if successor in backwardParents:
+                        return joinPaths(forwardParents, backwardParents, successor)
+            forwardFrontier = nextFrontier
+        else:
+            for node in backwardFrontier:
+                limits.expand()
+                for predecessor in space.predecessors(node):
+                    if not predecessor in backwardParents:
+                        backwardParents[predecessor] = (node, None)
+                        nextFrontier.append(predecessor)
+                    if predecessor in forwardParents:
+                        return joinPaths(forwardParents, backwardParents, predecessor)
+            backwardFrontier = nextFrontier
+    raise nx.NetworkXNoPath(f'Node {space.text(target)} not reachable from {space.text(source)}')
+
+# this function joins the path from the source to the meeting node with the path from the meeting node to the target
+def joinPaths(forwardParents : dict, backwardParents : dict, meeting) -> tuple[list, list]:
+    path, virtualEdges = tracePath(forwardParents, meeting)
+    node = meeting
+    while backwardParents[node] is not None:
+        node = backwardParents[node][0]
+        path.append(node)
+        virtualEdges.append(None)
+    return path, virtualEdges
+
+# below is a function that gives the features of a type compared by the heuristic: its identifiers and connectives
+@functools.lru_cache(maxsize=2**16)
+def typeFeatures(text : str) -> frozenset:
+    return frozenset(re.findall(r'[^\W\d][\w.\']*|[→∧∨↔¬∀∃=≤<]', text))
+
+# below is a function that estimates the number of edges between a node and the output
+# every edge costs 1, so the only bound the types give is that any node other than the output is at least one edge away
+# within that bound, nodes that share more identifiers and connectives with the output are estimated to be closer,
+# which makes the search try them first among the nodes the same number of edges from the input
+# (the estimate never overestimates and never drops by more than 1 along an edge, so A* still finds a shortest path)
+def similarityHeuristic(node : str, target : str) -> float:
+    if node == target:
+        return 0.0
+    nodeFeatures, targetFeatures = typeFeatures(node), typeFeatures(target)
+    if len(nodeFeatures) == 0 and len(targetFeatures) == 0:
+        return 1.0
+    similarity = len(nodeFeatures & targetFeatures) / len(nodeFeatures | targetFeatures)
+    return 1.0 - 0.5 * similarity
+
+# a heuristicWeight above 1 makes the search greedier, usually expanding fewer nodes, but the path may no longer be the shortest
+def astarSearch(space : SearchSpace, source, target, limits : SearchLimits, heuristicWeight : float = 1.0) -> tuple[list, list]:
+    targetText = space.text(target)
+    heuristic = lambda node: heuristicWeight * similarityHeuristic(space.text(node), targetText)
+    parents = {source: None}
+    distances = {source: 0}
+    # the queue holds (estimated path length, insertion count, node), the count breaks ties in insertion order
+    queue = [(heuristic(source), 0, source)]
+    count = 1
+    expanded = set()
+    while len(queue) > 0:
+        _, _, node = heapq.heappop(queue)
+        if node == target:
+            return tracePath(parents, target)
+        if node in expanded:
+            continue
+        expanded.add(node)
+        limits.expand()
+        for successor, virtualEdge in space.successors(node):
+            distance = distances[node] + 1
+            if distance < distances.get(successor, float('inf')):
+                distances[successor] = distance
+                parents[successor] = (node, virtualEdge)
+                heapq.heappush(queue, (distance + heuristic(successor), count, successor))
+                count += 1
+    raise nx.NetworkXNoPath(f'Node {targetText} not reachable from {space.text(source)}')
+
+
+# ---------- batch queries ----------
+# when many queries share an input (eg. all of the goals of a file that share premises), a single breadth first search from
+# each distinct input answers all of its queries at once, instead of searching from the same input again for each one
+
+# produces the (imports, theorems) of a shortest path for each (inputType, outputType) query, in the same order as the queries
+# queries without a path (including ones whose types aren't nodes, or whose search reached the limits) give None instead
+# the limits apply to the search from each distinct input, and with numWorkers > 1 the inputs are split across processes
+# the whole batch is timed as the 'search.batch' stage
+@metrics.timed('search.batch')
+def findPaths(G : nx.DiGraph, queries : list[tuple[str, str]], andJoinedEdges : AndJoinedEdges = None, maxNodes : int = None,
+              timeout : float = None, reachabilityIndex : ReachabilityIndex = None, numWorkers : int = 1) -> list[tuple | None]:
+    results = [None] * len(queries)
+    # group the queries by input, skipping the ones the reachability index rules out
+    groups = {}
+    for queryNum, (inputType, outputType) in enumerate(queries):
+        if reachabilityIndex is not None and andJoinedEdges is None:
+            sourceId, targetId = reachabilityIndex.nodeId(inputType), reachabilityIndex.nodeId(outputType)
+            if sourceId is None or targetId is None or not reachabilityIndex.mayReach(sourceId, targetId):
+                continue
+        groups.setdefault(inputType, []).append((queryNum, outputType))
+
+    if numWorkers > 1 and len(groups) > 1:
+        # compact graphs are memory mapped, so each worker opens the file again rather than being sent the graph
+        graph = ('compact', G.path) if isinstance(G, CompactGraph) else ('networkx', G)
+        with multiprocessing.Pool(numWorkers, initBatchWorker, (graph, andJoinedEdges is not None)) as pool:
+            groupResults = pool.starmap(searchGroupWorker, [(inputType, goals, maxNodes, timeout) for inputType, goals in groups.items()])
+    else:
+        space = SearchSpace(G, andJoinedEdges)
+        groupResults = [searchGroup(space, inputType, goals, SearchLimits(maxNodes, timeout)) for inputType, goals in groups.items()]
+
+    for groupResult in groupResults:
+        for queryNum, result in groupResult:
+            results[queryNum] = result
+    return results
+
+# produces the results of all of the queries with the same input, using one breadth first search that stops once every
+# output has been reached
+def searchGroup(space : SearchSpace, inputType : str, goals : list[tuple[int, str]], limits : SearchLimits) -> list[tuple[int, tuple | None]]:
+    results = []
+    targets = {} # maps each output node still to be reached to the queries with that output
+    source = None
+    for queryNum, outputType in goals:
+        try:
+            source, target = space.endpoints(inputType, outputType)
+            targets.setdefault(target, []).append(queryNum)
+        except nx.NodeNotFound:
+            results.append((queryNum, None))
+    if len(targets) == 0:
+        return results
+
+    parents = {source: None}
+    queue = deque([source])
+    remaining = set(targets) - {source}
+    try:
+        while len(queue) > 0 and len(remaining) > 0:
+            node = queue.popleft()
+            limits.expand()
+            for successor, virtualEdge in space.successors(node):
+                if not successor in parents:
+                    parents[successor] = (node, virtualEdge)
+                    queue.append(successor)
+                    remaining.discard(successor)
+    except SearchLimitReached:
+        pass
+
+    for target, queryNums in targets.items():
+        result = pathTheorems(space, *tracePath(parents, target)) if target in parents else None
+        results += [(queryNum, result) for queryNum in queryNums]
+    return results
+
+# below is the search space used by each worker process of findPaths
+batchSpace = None
+
+# this function is run once in each worker process, opening the graph the queries are searched in
+def initBatchWorker(graph : tuple, lazyAndJoined : bool):
+    global batchSpace
+    kind, G = graph
+    G = CompactGraph(G) if kind == 'compact' else G
+    batchSpace = SearchSpace(G, AndJoinedEdges(G) if lazyAndJoined else None)
+
+def searchGroupWorker(inputType : str, goals : list[tuple[int, str]], maxNodes : int, timeout : float) -> list[tuple[int, tuple | None]]:
+    return searchGroup(batchSpace, inputType, goals, SearchLimits(maxNodes, timeout))
+
+
+# ---------- proof search ----------
+# findPath searches from a single input, but a goal often follows from several hypotheses together, using theorems that
+# take more than one argument, findProof searches from all of the hypotheses at once, deriving new types with these steps:
+#   'theorem': a type reached from a derived type by an edge of G (a theorem applied to it)
+#   'apply': the output of a derived implication, once its input is derived (eg. q from p → q and p), which is how theorems
+#            with several arguments are used without and-joined edges
+#   'and.intro': a conjunction, once both of its sides are derived (only the conjunctions in G or in the goal)
+#   'and.left' and 'and.right': the sides of a derived conjunction
+# every step costs 1 plus the cost of its premises, and types are derived cheapest first (Knuth's generalization of dijkstra's
+# algorithm), so each type is derived once, by its cheapest proof
+
+# below is a class used to store a single step of a proof
+class ProofStep(NamedTuple):
+    conclusion : str # the type derived by the step
+    rule : str # 'theorem', 'apply', 'and.intro', 'and.left', or 'and.right'
+    premises : tuple[str, ...] # the types the step is derived from (for 'apply', the implication and then its input)
+    objectName : str | None = None # the theorem applied by a 'theorem' step
+    importPath : str | None = None
+
+# below is a class that finds the conjunctions of the derivation graph from their sides, used for the 'and.intro' steps
+# it can be built once for a graph and passed to each findProof, rather than finding the conjunctions of G for every search
+class ConjunctionIndex:
+    def __init__(self, G, typeTable : TypeTable = None):
+        self.typeTable = TypeTable() if typeTable is None else typeTable
+        self.parents = {} # maps the text of each side of a conjunction to the conjunctions it is a side of
+        self.pairs = {} # maps the texts of the (left, right) sides of each conjunction to the conjunction
+        self.parsed = {} # maps the text of each type searched so far to its term, since parsing is slow compared to a search step
+        for node in G.nodes():
+            if '∧' in node:
+                self.add(self.typeTable.parse(node))
+
+    # this function adds a conjunction and the conjunctions inside of it (eg. 'q ∧ r' in 'p ∧ q ∧ r') to the index
+    def add(self, term : TypeTerm):
+        while term.op == '∧':
+            self.pairs[(term.children[0].key, term.children[1].key)] = term
+            for child in term.children:
+                parents = self.parents.setdefault(child.key, [])
+                if not term in parents:
+                    parents.append(term)
+            term = term.children[1]
+
+    # this function returns the conjunctions that a type is a side of, whose other side is one of the passed types
+    # types that are a side of many conjunctions (eg. 'α') are paired with each of the other types instead
+    def containing(self, node : str, others : dict) -> list[TypeTerm]:
+        parents = self.parents.get(node, [])
+        if len(parents) <= 2 * len(others):
+            return [parent for parent in parents if parent.children[0].key in others and parent.children[1].key in others]
+        conjunctions = []
+        for other in others:
+            for pair in [(node, other), (other, node)]:
+                if pair in self.pairs and not self.pairs[pair] in conjunctions:
+                    conjunctions.append(self.pairs[pair])
+        return conjunctions
+
+    def term(self, node : str) -> TypeTerm:
+        term = self.parsed.get(node, None)
+        if term is None:
+            term = self.parsed[node] = self.typeTable.parse(node)
+        return term
+
+# produces the (imports, steps) of a proof of outputType from the passed hypotheses, the steps form a DAG and are in the order
+# they must be applied, where each premise is either a hypothesis or the conclusion of an earlier step
+# the types don't have to be nodes of G, and are matched to the nodes by their normalized type (and the type index, if passed)
+# raises NetworkXNoPath if there is no proof, or SearchLimitReached if maxNodes types are derived or the timeout passes first
+# each search is timed as the 'search.proof' stage
+@metrics.timed('search.proof')
+def findProof(G : nx.DiGraph, inputTypes : list[str], outputType : str, maxNodes : int = None, timeout : float = None,
+              conjunctionIndex : ConjunctionIndex = None, typeIndex : TypeIndex = None) -> tuple[list[str], list[ProofStep]]:
+    conjunctionIndex = ConjunctionIndex(G) if conjunctionIndex is None else conjunctionIndex
+    typeTable = conjunctionIndex.typeTable
+    resolve = lambda text: conjunctionIndex.term(resolveNode(typeIndex, text, False) if typeIndex is not None else text)
+    hypotheses = [resolve(inputType).key for inputType in inputTypes]
+    goal = resolve(outputType)
+    # the conjunctions in the goal can be introduced even if they aren't in G
+    goalConjunctions = ConjunctionIndex(nx.DiGraph(), typeTable)
+    goalConjunctions.add(goal)
+    limits = SearchLimits(maxNodes, timeout)
+
+    derived = {} # maps each derived type to its cost, rule, and premises (with no rule for hypotheses)
+    queued = {} # maps each type in the queue to the lowest cost it was queued with
+    implications = {} # maps the input of each derived implication to the implications
+    # the queue holds (cost, insertion count, type, rule, premises), the count breaks ties in insertion order
+    # the theorems applied to a derived type all give their outputs at the same cost, so they are queued as a single entry
+    # (with no type) that derives all of them at once, since hub types (eg. '{α : Type u_1}') lead to thousands of types
+    queue = []
+    count = 0
+
+    def push(cost : int, node : str | None, rule : str | None, premises : tuple):
+        nonlocal count
+        if node is not None:
+            if node in derived or cost >= queued.get(node, float('inf')):
+                return
+            queued[node] = cost
+        heapq.heappush(queue, (cost, count, node, rule, premises))
+        count += 1
+
+    # this function records a derived type, and queues the steps it is a premise of
+    def derive(node : str, cost : int, rule : str | None, premises : tuple):
+        derived[node] = (cost, rule, premises)
+        limits.expand()
+        if node in G:
+            push(cost + 1, None, 'theorem', (node,))
+        # only types with a connective are parsed, every other type is an atom
+        term = conjunctionIndex.term(node) if '∧' in node or '→' in node else None
+        if term is None or term.op is None:
+            pass
+        elif term.op == '∧':
+            push(cost + 1, term.children[0].key, 'and.left', (node,))
+            push(cost + 1, term.children[1].key, 'and.right', (node,))
+        elif term.op == '→':
+            implicationInput, implicationOutput = term.children
+            implications.setdefault(implicationInput.key, []).append(term)
+            if implicationInput.key in derived:
+                push(cost + derived[implicationInput.key][0] + 1, implicationOutput.key, 'apply', (node, implicationInput.key))
+        for implication in implications.get(node, []):
+            if implication.key != node:
+                push(cost + derived[implication.key][0] + 1, implication.children[1].key, 'apply', (implication.key, node))
+        for conjunction in conjunctionIndex.containing(node, derived) + goalConjunctions.containing(node, derived):
+            left, right = conjunction.children
+            push(derived[left.key][0] + derived[right.key][0] + 1, conjunction.key, 'and.intro', (left.key, right.key))
+
+    for hypothesis in hypotheses:
+        push(0, hypothesis, None, ())
+    while len(queue) > 0:
+        cost, _, node, rule, premises = heapq.heappop(queue)
+        if node is None:
+            # the theorems applied to a type, the goal is looked for first so the search can stop without deriving the rest
+            source = premises[0]
+            if not goal.key in derived and G.has_edge(source, goal.key):
+                derive(goal.key, cost, rule, premises)
+                return proofSteps(G, derived, goal.key)
+            for successor in G.successors(source):
+                if not successor in derived:
+                    derive(successor, cost, rule, premises)
+        elif not node in derived:
+            derive(node, cost, rule, premises)
+            if node == goal.key:
+                return proofSteps(G, derived, goal.key)
+    raise nx.NetworkXNoPath(f'Node {outputType} not derivable from {inputTypes}')
+
+# produces the imports and steps of the proof of a derived type, with every step after the steps deriving its premises
+def proofSteps(G : nx.DiGraph, derived : dict, conclusion : str) -> tuple[list[str], list[ProofStep]]:
+    steps = []
+    visited = set()
+    stack = [(conclusion, False)]
+    while len(stack) > 0:
+        node, premisesAdded = stack.pop()
+        _, rule, premises = derived[node]
+        if premisesAdded:
+            if rule == 'theorem':
+                data = G.get_edge_data(premises[0], node)
+                steps.append(ProofStep(node, rule, premises, data.get('objectName', None), data.get('importPath', None)))
+            else:
+                steps.append(ProofStep(node, rule, premises))
+            continue
+        if node in visited or rule is None:
+            continue
+        visited.add(node)
+        stack.append((node, True))
+        stack.extend((premise, False) for premise in reversed(premises))
+    imports = []
+    for step in steps:
+        if step.importPath is not None and not step.importPath in imports:
+            imports.append(step.importPath)
+    return imports, steps
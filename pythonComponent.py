@@ -3,45 +3,39 @@
 import generateObjectList
 import json
 from leanInterface import *
-import pickle
 import networkx as nx
 import os
+from pipelineMetrics import metrics
+import sys
+from compactGraph import CompactGraph, isCompactGraph, writeCompactGraph
+from equivalentNodes import loadMergedNodes, mergeEquivalentNodes, saveMergedNodes
+from graphBuild import addGraphEntries, andJoinedGraphEdges, derivationGraphEntries, iterChunks
+from graphBuild import generateDerivationGraphParallel, populateGraphWithAndJoinedArgsParallel
+from reachabilityIndex import ReachabilityIndex
+from typeIndex import TypeIndex
+from typeTerms import removeRedundantTypeParentheses, splitTypeTerms, TypeTable
+from typing import Iterable
     
 
 # ---------- lean interfacing functions ----------
+# the lean objects are lazy, so importing this file doesn't run lean, they are resolved when first used (or preloaded in main)
 
 # below is the python wrapped split_terms function
-splitTerms = LeanDef('split_terms')
+splitTerms = LeanDef('split_terms', lazy=True)
 def splitTermsCall (inpt : LeanTheorem | LeanDef, delim : LeanTheorem | LeanDef) -> tuple[str, list]:
-    num_open = 0 # keep track of num of open and closed parentheses
-    num_closed = 0
-    expression = inpt.value
-    delim = delim.value.strip().strip('"')
-    check = ' ' * len(delim) # check all sequences of characters within the expression with the same length as delim
-    current_terms = '' # store each term before reaching an instance of delim
-    split = [] # list of split terms
-    for char in range(len(expression)):
-        if expression[char] in ['(', '[', '{']:
-            num_open += 1
-        elif expression[char] in [')', ']', '}']:
-            num_closed += 1
-        check = check[1:] + expression[char] if len(check) > 1 else expression[char]
-        if (check == delim and num_open == num_closed):
-            split.append(current_terms[:-(len(check)-1)] if len(check) > 1 else current_terms)
-            current_terms = ''
-        elif char == len(expression)-1:
-            current_terms += expression[char]
-            split.append(current_terms)
-        else:
-            current_terms += expression[char]
-    return ('List String', split)
+    # the splitting itself is done by the cached single pass splitter in typeTerms.py
+    return ('List String', list(splitTypeTerms(inpt.value, delim.value.strip().strip('"'))))
 splitTerms.overrideFunctionality(splitTermsCall)
 
 # below is the python wrapped remove_redundant_parentheses function
-removeRedundantParentheses = LeanDef('remove_redundant_parentheses')
+removeRedundantParentheses = LeanDef('remove_redundant_parentheses', lazy=True)
+def removeRedundantParenthesesCall (inpt : LeanTheorem | LeanDef) -> tuple[str, str]:
+    # the parentheses are removed by the python version in typeTerms.py, which gives the same results as lean
+    return ('String', removeRedundantTypeParentheses(inpt.value))
+removeRedundantParentheses.overrideFunctionality(removeRedundantParenthesesCall)
 
 # below is the python wrapped lean string storing the implies character
-impStr = LeanDef('imp_str')
+impStr = LeanDef('imp_str', lazy=True)
 
 # below is a LeanDef that that takes two lean4 propositions and returns a bool
 # the bool is true if lean can prove they are equal using 'rfl' and false otherwise
@@ -65,34 +59,26 @@ def checkPropsEqCall (prop1 : LeanTheorem | LeanDef, prop2 : LeanTheorem | LeanD
 checkPropsEq.overrideFunctionality(checkPropsEqCall)
 
 # this function produces a derivation graph for a given object list
-def generateDerivationGraph(objectList : LeanDef) -> nx.DiGraph:
+# types are parsed into interned terms (see typeTerms.py), and nodes are keyed by the canonical text of their term,
+# so types that only differ in spacing or redundant parentheses share a single node
+# the object list can be a LeanDef or any iterable of entries, such as a generator streaming them from the object list file
+# building the graph is timed as the 'graph.build' stage
+@metrics.timed('graph.build')
+def generateDerivationGraph(objectList : LeanDef | Iterable[list[str]], typeTable : TypeTable = None) -> nx.DiGraph:
+    typeTable = TypeTable() if typeTable is None else typeTable
     G = nx.DiGraph()
-    seenTypes = set()
-    for object in objectList.value:
-        objectName, objectType, objectImportPath = object
-        terms = splitTerms(LeanDef('object', 'String', objectType.replace('\n', ' ')), impStr)[1]
-        # generate the binary split of the object terms and add them to the map
-        if len(terms) == 1: # add all non input types as nodes
-            if not terms[0].strip() in seenTypes: # new type
-                seenTypes.add(terms[0].strip())
-            G.add_node(terms[0].strip())
-        else:
-            # the binary split is [firstArgument], [secondArgument, ... nthArgument, output]
-            possibleSplit = [terms[0]], terms[1:]
-            possibleSplit = ' → '.join(i.strip() for i in possibleSplit[0]), ' → '.join(i.strip() for i in possibleSplit[1])
-            # add a node for each side of the split
-            for i in range(2):
-                if not possibleSplit[i] in seenTypes: # new type
-                    seenTypes.add(possibleSplit[i])
-                    G.add_node(possibleSplit[i])
-            # add a directional edge between the nodes
-            G.add_edge(possibleSplit[0], possibleSplit[1], objectName=objectName, importPath=objectImportPath)
+    # the objects are split into nodes and edges a chunk at a time (see graphBuild.py, which does the same using many processes)
+    for chunk in iterChunks(objectList.value if isinstance(objectList, LeanObject) else objectList, 4096):
+        addGraphEntries(G, derivationGraphEntries(chunk, typeTable))
+        metrics.increment('graph.objects', len(chunk))
 
+    metrics.log('graphBuilt', nodes=G.number_of_nodes(), edges=G.number_of_edges())
     return G
 
 # this function consumes a derivation graph and adds new theorems
 # by using some simple logic on multi-argument theorems/functions
-def populateGraphWithAndJoinedArgs(G : nx.DiGraph) -> nx.DiGraph:
+@metrics.timed('graph.andJoined')
+def populateGraphWithAndJoinedArgs(G : nx.DiGraph, typeTable : TypeTable = None) -> nx.DiGraph:
     # this process works as follows:
     # 1. for any function F on the graph with multiple arguments, the binary split will make it an edge that maps to a node of the form:
     #    '(arg2 → arg3 ... → argN → output)' where 'argM' is the type of the Mth argument, and 'output' is the output type of the function
@@ -101,72 +87,155 @@ def populateGraphWithAndJoinedArgs(G : nx.DiGraph) -> nx.DiGraph:
     #    '(arg1 ∧ arg2 ∧ ... ∧ argM) → (argM+1 → argM+2 → ... → argN → output)' can be derived using a lambda of the following form:
     #    '(fun (args : arg1 ∧ arg2 ∧ ... ∧ argM) => F (args.left) (args.right.left) (args.right.right.left) ...)'
     # 4. each of these possible theorems are added to the graph with the same imports as F, and with the name being the above lambda
+    # the new types are built as interned terms, so arguments that are connectives themselves get parentheses where needed
+    # (AndJoinedEdges in andJoinedEdges.py generates the same edges on demand during a search instead)
 
+    typeTable = TypeTable() if typeTable is None else typeTable
     # create a copy of G to be modified
     G2 = G.copy()
-    seenTypes = set()
 
     for node in G.nodes():
-        if '→' in node:
-            for source, _, data in G.in_edges(node, data=True):
-                objectName = data.get('objectName', None)
-                objectImportPath = data.get('importPath', None)
-                terms = list(map(str.strip, splitTerms(LeanDef('object', 'String', node), impStr)[1]))
-                objectArguments = [source] + terms[:-1]
-                objectOutputType = terms[-1]
-
-                for i in range(1, len(objectArguments)):
-                    newFuncInput = " ∧ ".join(objectArguments[:i+1])
-                    if (i+1 < len(objectArguments)):
-                        newFuncOutput = ' → '.join(objectArguments[i+1:]) + ' → ' + objectOutputType
-                    else:
-                        newFuncOutput = objectOutputType
-                    newFuncName = f'''(fun (args : {newFuncInput}) =>
-                        {objectName} ({") (".join(["args" + j*".right" + (".left" if j < i else "") for j in range(i+1)])}))'''
-
-                    # add the new function input and output if they are not nodes in the graph already
-                    for i in [newFuncInput, newFuncOutput]:
-                        if not i in G.nodes() and not i in seenTypes:
-                            seenTypes.add(i)
-                            G2.add_node(i)
-
-                    # add a directional edge between the nodes
-                    G2.add_edge(newFuncInput, newFuncOutput, objectName=newFuncName, importPath=objectImportPath)
+        inEdges = [(source, data.get('objectName', None), data.get('importPath', None)) for source, _, data in G.in_edges(node, data=True)]
+        for newFuncInput, newFuncOutput, newFuncName, objectImportPath in andJoinedGraphEdges(node, inEdges, typeTable):
+            # add a directional edge between the nodes (adding the new function input and output if they are not nodes already)
+            G2.add_edge(newFuncInput, newFuncOutput, objectName=newFuncName, importPath=objectImportPath)
 
+    metrics.increment('graph.andJoinedEdges', G2.number_of_edges() - G.number_of_edges())
+    metrics.log('andJoinedEdgesAdded', nodes=G2.number_of_nodes(), edges=G2.number_of_edges())
     return G2
 
 # the program begins below
 if __name__ == '__main__':
+    # with '--metrics' the timers and counters of each stage are logged to pipelineMetrics.jsonl (see pipelineMetrics.py),
+    # and with '--profile' each stage is also run under cProfile, with the profiles written to ./profiles
+    if '--metrics' in sys.argv:
+        metrics.enableLog('./pipelineMetrics.jsonl')
+    if '--profile' in sys.argv:
+        metrics.enableProfiling(['*'], './profiles')
+
+    # keep a warm lean process around so that each query doesn't have to re-import LeanBackend
+    startLeanSession()
+    # answer repeated scripts from the on-disk cache, which is invalidated when the toolchain or packages change
+    enableLeanCache()
     ver = LeanDef('version')
 
-    # generate the object list if the objectList.json file does not exist
-    if not os.path.exists('./objectList.json'):
-        print('generating objectList.json, this process could take a while...')
-        # get the lean toolchain folder because we want to analyze the lean code base itself
-        with open('./lean-toolchain') as t:
-            home_directory = os.path.expanduser('~')
-            toolchain = os.path.join(home_directory, '.elan/toolchains/', f'leanprover--lean4---{t.read().split(":")[1]}'.strip("\n"), 'src/lean/')
-        # consider all lean files in the target folders
-        objectList = LeanDef('object_list', 'List (List String)', generateObjectList([toolchain, './lake-packages/', './LeanBackend/'])) 
-        with open('objectList.json', 'w') as createBackup:
-            createBackup.write('{\n\t\"objectList\": ' + json.dumps(objectList.value) + '\n}')
-    # otherwise load it if it exists
+    # get the lean toolchain folder because we want to analyze the lean code base itself
+    with open('./lean-toolchain') as t:
+        home_directory = os.path.expanduser('~')
+        toolchain = os.path.join(home_directory, '.elan/toolchains/', f'leanprover--lean4---{t.read().split(":")[1]}'.strip("\n"), 'src/lean/')
+    # consider all lean files in the target folders
+    targetFiles = [toolchain, './lake-packages/', './LeanBackend/']
+
+    # the object list is stored in objectList.jsonl, which is written as the entries are produced and streamed from
+    # when the graph is built (see generateObjectList.py), an object list in the older objectList.json format is converted
+    objectListPath = './objectList.jsonl'
+    if not os.path.exists(objectListPath) and os.path.exists('./objectList.json'):
+        print('converting objectList.json to objectList.jsonl...')
+        generateObjectList.writeObjectList(generateObjectList.iterObjectList('./objectList.json'), objectListPath)
+
+    # with '--export' the object list is read from the environment of the built modules in a single lean run
+    objectListChanged = False
+    if '--export' in sys.argv:
+        print('exporting the lean environment to objectList.jsonl, this process could take a while...')
+        generateObjectList.writeObjectList(generateObjectList.iterObjectListFromExport(['LeanBackend', 'Mathlib']), objectListPath)
+        # the manifest only describes file by file extraction, so it no longer matches the object list
+        if os.path.exists('./objectList.manifest.json'):
+            os.remove('./objectList.manifest.json')
+        objectListChanged = True
+    # an object list without a manifest can't be updated, so use it as is
+    elif os.path.exists(objectListPath) and not os.path.exists('./objectList.manifest.json'):
+        print('found existing object list without a manifest, continuing...')
+    # otherwise generate the object list, or bring it up to date by only extracting the files that changed
+    # the files are split across all cores, and progress is checkpointed so an interrupted run can be resumed
     else:
-        print('found existing object list, continuing...')
-        with open('objectList.json', 'r') as fetchBackup:
-            objectList = LeanDef('object_list', 'List (List String)', json.load(fetchBackup)['objectList'])
-
-    # generate the derivation graph if the derivationGraph.pickle file does not exist
-    if not os.path.exists('derivationGraph.pickle'):
-        print('generating derivationGraph.pickle, this process could take a while...')
-        G = populateGraphWithAndJoinedArgs(generateDerivationGraph(objectList))
-        pickle.dump(G, open('derivationGraph.pickle', 'wb'))
-    # otherwise load it if it exists
+        print('updating objectList.jsonl, this process could take a while...')
+        objects = generateObjectList.iterObjectList(objectListPath) if os.path.exists(objectListPath) else []
+        objects, manifest, objectListChanged = generateObjectList.updateObjectList(
+            targetFiles, objects, generateObjectList.readManifest('./objectList.manifest.json'), checkpointPath='./objectList.checkpoint')
+        if objectListChanged or not os.path.exists(objectListPath):
+            generateObjectList.writeObjectList(objects, objectListPath)
+        generateObjectList.writeManifest(manifest, './objectList.manifest.json')
+        if os.path.exists('./objectList.checkpoint'):
+            os.remove('./objectList.checkpoint')
+
+    # the objects used to build the graph are resolved in the background while the graph file is checked and loaded
+    # this is only started after the extraction, since the extraction pool is forked, and forking while the preloading
+    # thread holds a lock (eg. the scratch file's or a lean worker's) would leave it held forever in the child
+    preloadLeanObjects([splitTerms, removeRedundantParentheses, impStr])
+
+    # with '--lazy-and-joined' the and-joined edges are not added to the graph, and are generated during searches instead
+    # (by passing AndJoinedEdges(G) to findPath), the graph without them is stored in a separate file
+    lazyAndJoined = '--lazy-and-joined' in sys.argv
+    graphPath = 'derivationGraph.base.compact' if lazyAndJoined else 'derivationGraph.compact'
+
+    # generate the derivation graph if its file does not exist (or was written in an older format) or the object list changed
+    # the graph is stored in the compact format, which is memory mapped rather than unpickled when it is loaded
+    graphGenerated = not os.path.exists(graphPath) or not isCompactGraph(graphPath) or objectListChanged
+    if graphGenerated:
+        print(f'generating {graphPath}, this process could take a while...')
+        # the types are parsed on all cores (see graphBuild.py), giving the same graph as generateDerivationGraph and
+        # populateGraphWithAndJoinedArgs
+        G = generateDerivationGraphParallel(generateObjectList.iterObjectList(objectListPath))
+        if not lazyAndJoined:
+            G = populateGraphWithAndJoinedArgsParallel(G)
+        # with '--merge-equivalent' nodes that lean proves equal are merged, and the map from each merged node to the node it
+        # was merged into is saved so that queries can be mapped the same way
+        representatives = None
+        if '--merge-equivalent' in sys.argv:
+            print('merging equivalent nodes, this process could take a while...')
+            G, representatives = mergeEquivalentNodes(G)
+        writeCompactGraph(G, graphPath)
+        if representatives is not None:
+            saveMergedNodes(representatives, graphPath + '.merged.json', CompactGraph(graphPath))
     else:
         print('found existing derivation graph, continuing...')
-        G = pickle.load(open('derivationGraph.pickle', 'rb'))
+    G = CompactGraph(graphPath)
+
+    # load the map of merged nodes (passed to findPath, QueryCache.findPath, and the type index so that queries for the type of
+    # a merged node find the node it was merged into), a map written for an older graph is left out
+    mergedNodesPath = graphPath + '.merged.json'
+    mergedNodes = loadMergedNodes(mergedNodesPath, G) if os.path.exists(mergedNodesPath) else None
+    if mergedNodes is not None:
+        print(f'found {len(mergedNodes)} merged nodes')
+
+    # load the reachability index of the graph (passed to findPath to reject queries without a path), rebuilding it if the
+    # graph was regenerated, the index isn't used with on-demand and-joined edges
+    if not lazyAndJoined:
+        indexPath = graphPath + '.reach'
+        reachabilityIndex = None
+        if os.path.exists(indexPath) and not graphGenerated:
+            reachabilityIndex = ReachabilityIndex.load(indexPath, G)
+        if reachabilityIndex is None:
+            print(f'generating {indexPath}...')
+            reachabilityIndex = ReachabilityIndex(G)
+            reachabilityIndex.save(indexPath)
+
+    # load the type index of the graph (passed to findPath to find the nodes of types that aren't written exactly as they
+    # are in the graph, and to suggest the closest nodes), rebuilding it if the graph was regenerated
+    typeIndexPath = graphPath + '.types'
+    typeIndex = None
+    if os.path.exists(typeIndexPath) and not graphGenerated:
+        typeIndex = TypeIndex.load(typeIndexPath, G, mergedNodes)
+    if typeIndex is None:
+        print(f'generating {typeIndexPath}...')
+        typeIndex = TypeIndex(G, mergedNodes)
+        typeIndex.save(typeIndexPath)
 
     print(G)
 
-    # clean up by removing the tmp.lean file
+    # record the metrics of the whole run
+    if '--metrics' in sys.argv:
+        snapshot = metrics.snapshot()
+        metrics.log('snapshot', **snapshot)
+        for stage, timer in snapshot['stages'].items():
+            print(f'{stage}: {timer["count"]} runs, {timer["totalSeconds"]:.1f}s total, p50 {timer["p50Seconds"] * 1000:.1f}ms, '
+                  f'p99 {timer["p99Seconds"] * 1000:.1f}ms, {timer["perSecond"]:.1f} per second')
+        for counter, count in snapshot['counters'].items():
+            print(f'{counter}: {count}')
+    metrics.dumpProfiles()
+    metrics.disableLog()
+
+    # clean up by stopping the lean session, closing the cache, and removing the tmp.lean file
+    stopLeanSession()
+    disableLeanCache()
     cleanup()
@@ -0,0 +1,89 @@
+# this file implements a cache of prover results, since the same queries come up again and again across users and sessions
+# the cache is bounded, evicting the least recently used result, and results can also expire after a fixed time
+# results where no path exists are cached as well, and every result is tagged with a fingerprint of the derivation graph,
+# so rebuilding the graph invalidates the cache without having to clear it by hand
+import networkx as nx
+import time
+from collections import OrderedDict
+from compactGraph import graphFingerprint
+from prover import findPath, SearchLimitReached
+from typeTerms import TypeTable
+
+
+# below is a class that caches the results of findPath
+class QueryCache:
+    def __init__(self, maxSize : int = 65536, ttl : float = None):
+        self.maxSize = maxSize
+        self.ttl = ttl # the number of seconds a result is kept for, or None to keep results until they are evicted
+        self.results = OrderedDict() # maps each query to its result and the time it was added, from least to most recently used
+        self.fingerprint = None # the fingerprint of the graph the cached results were found in
+        self.typeTable = TypeTable() # used to find the node key of the types in each query
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    # this function returns the counters of the cache, to help size it
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {'size': len(self.results), 'maxSize': self.maxSize, 'hits': self.hits, 'misses': self.misses,
+                'hitRate': self.hits / total if total > 0 else 0.0, 'evictions': self.evictions,
+                'expirations': self.expirations, 'invalidations': self.invalidations}
+
+    def clear(self):
+        self.results.clear()
+        self.typeTable = TypeTable()
+
+    # this function is a cached version of findPath, which takes the same arguments and returns or raises the same results
+    # the types are turned into the key of their node (see TypeTable.parse) before they are looked up and searched for,
+    # and the results are cached separately for each set of search options that can change them
+    # searches that reach their limits aren't cached, since a search with larger limits might still find a path
+    def findPath(self, G, inputType : str, outputType : str, **searchOptions) -> tuple[list[str], list[str]]:
+        fingerprint = graphFingerprint(G)
+        if fingerprint != self.fingerprint:
+            if len(self.results) > 0:
+                self.invalidations += 1
+            self.clear()
+            self.fingerprint = fingerprint
+        inputType, outputType = self.typeTable.parse(inputType).key, self.typeTable.parse(outputType).key
+        # the types of merged nodes are looked up as the nodes they were merged into, so both share the same results
+        mergedNodes = searchOptions.get('mergedNodes', None)
+        if mergedNodes is not None:
+            inputType, outputType = mergedNodes.get(inputType, inputType), mergedNodes.get(outputType, outputType)
+        # generating the and-joined edges on demand can find paths the graph alone doesn't have, and the type index can
+        # find nodes for types that aren't keys of the graph, the reachability index only rules out queries so it isn't
+        # part of the key
+        key = (inputType, outputType, searchOptions.get('andJoinedEdges', None) is not None,
+               searchOptions.get('typeIndex', None) is not None, searchOptions.get('method', None),
+               searchOptions.get('heuristicWeight', 1.0), searchOptions.get('maxNodes', None), searchOptions.get('timeout', None))
+
+        entry = self.results.get(key, None)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self.results[key]
+            self.expirations += 1
+            entry = None
+        if entry is not None:
+            self.hits += 1
+            self.results.move_to_end(key)
+            result = entry[0]
+        else:
+            self.misses += 1
+            try:
+                result = findPath(G, inputType, outputType, **searchOptions)
+            except SearchLimitReached:
+                raise
+            except (nx.NodeNotFound, nx.NetworkXNoPath) as error:
+                result = error
+            self.results[key] = (result, time.monotonic())
+            if len(self.results) > self.maxSize:
+                self.results.popitem(last=False)
+                self.evictions += 1
+
+        if isinstance(result, Exception):
+            raise type(result)(*result.args)
+        # copies are returned so that callers can't change the cached result
+        return list(result[0]), list(result[1])
@@ -0,0 +1,217 @@
+# this file implements an index that answers whether one node of the derivation graph can reach another
+# most prover queries have no answer, and without an index finding that out takes a search of everything the input reaches
+# the index is built as follows:
+#   1. the strongly connected components of the graph are found, since every node in a component reaches every other one
+#   2. the components form a DAG (the condensation), and each component is labelled with a few intervals,
+#      one for each of a few randomized depth first traversals of the DAG (GRAIL labels)
+#      if a component reaches another, each interval of the second is contained in the matching interval of the first,
+#      so a pair whose intervals aren't contained can be rejected straight away
+#   3. pairs that pass the interval check are confirmed with a depth first search of the DAG that skips every component
+#      whose intervals rule it out, which only visits a small part of the DAG
+import networkx as nx
+import random
+import struct
+from array import array
+from compactGraph import CompactGraph, graphFingerprint, hashSize
+
+
+# below is the magic string at the start of every reachability index file
+magic = b'TMREACHINDEX0002'
+
+# below is a class that stores the reachability index of a derivation graph
+# the index refers to nodes by id, which are the node ids of a compact graph, or positions in G.nodes() for a networkx graph
+class ReachabilityIndex:
+    def __init__(self, G, numLabels : int = 3, seed : int = 0):
+        self.G = G
+        self.nodeIds = None if isinstance(G, CompactGraph) else {node: nodeId for nodeId, node in enumerate(G.nodes())}
+        if self.nodeIds is None:
+            successors = lambda nodeId: G.successorIds(nodeId)
+        else:
+            nodes = list(G.nodes())
+            successors = lambda nodeId: [self.nodeIds[successor] for successor in G.successors(nodes[nodeId])]
+        self.numNodes = G.number_of_nodes()
+        self.numEdges = G.number_of_edges()
+        self.fingerprint = graphFingerprint(G)
+        self.component = findComponents(self.numNodes, successors)
+        self.numComponents = max(self.component, default=-1) + 1
+        self.dagPointers, self.dagTargets = condense(self.numNodes, self.numComponents, self.component, successors)
+        self.numLabels = numLabels
+        self.low, self.high = labelComponents(self.numComponents, self.dagPointers, self.dagTargets, numLabels, random.Random(seed))
+
+    # this function returns the id of a node type, or None if it isn't a node of the graph
+    def nodeId(self, node : str) -> int | None:
+        return self.G.nodeId(node) if self.nodeIds is None else self.nodeIds.get(node, None)
+
+    # this function checks the labels of two components, if it returns False the first component can't reach the second
+    # (components are numbered in reverse topological order, so a component can only reach components with lower numbers)
+    def mayReachComponent(self, source : int, target : int) -> bool:
+        if source <= target:
+            return source == target
+        for labelNum in range(self.numLabels):
+            offset = labelNum * self.numComponents
+            if self.low[offset + target] < self.low[offset + source] or self.high[offset + target] > self.high[offset + source]:
+                return False
+        return True
+
+    # this function checks if one node id may reach another, a quick check with no false negatives used to prune searches
+    def mayReach(self, sourceId : int, targetId : int) -> bool:
+        return self.mayReachComponent(self.component[sourceId], self.component[targetId])
+
+    # this function decides exactly if one node id can reach another
+    def reachesId(self, sourceId : int, targetId : int) -> bool:
+        source, target = self.component[sourceId], self.component[targetId]
+        if source == target:
+            return True
+        if not self.mayReachComponent(source, target):
+            return False
+        # search the DAG, only following components whose labels allow them to reach the target
+        visited = {source}
+        stack = [source]
+        while len(stack) > 0:
+            component = stack.pop()
+            for successor in self.dagTargets[self.dagPointers[component]:self.dagPointers[component+1]]:
+                if successor == target:
+                    return True
+                if not successor in visited and self.mayReachComponent(successor, target):
+                    visited.add(successor)
+                    stack.append(successor)
+        return False
+
+    # this function decides exactly if one node type can reach another, raising NodeNotFound if either isn't a node
+    def reaches(self, source : str, target : str) -> bool:
+        sourceId, targetId = self.nodeId(source), self.nodeId(target)
+        if sourceId is None or targetId is None:
+            raise nx.NodeNotFound(f'Either source {source} or target {target} is not in G')
+        return self.reachesId(sourceId, targetId)
+
+    # this function writes the index to a file, so it doesn't have to be rebuilt each time the graph is loaded
+    def save(self, path : str):
+        with open(path, 'wb') as file:
+            file.write(magic + bytes.fromhex(self.fingerprint) + struct.pack('<5q', self.numNodes, self.numEdges, self.numComponents, self.numLabels, len(self.dagTargets)))
+            for values in [self.component, self.dagPointers, self.dagTargets, self.low, self.high]:
+                values.tofile(file)
+
+    # this function reads an index written by save for the passed graph, or returns None if it was written for a different graph
+    # (one with a different fingerprint) or by an older version
+    @staticmethod
+    def load(path : str, G) -> 'ReachabilityIndex | None':
+        index = ReachabilityIndex.__new__(ReachabilityIndex)
+        index.G = G
+        index.nodeIds = None if isinstance(G, CompactGraph) else {node: nodeId for nodeId, node in enumerate(G.nodes())}
+        with open(path, 'rb') as file:
+            fileMagic = file.read(len(magic))
+            if fileMagic[:-4] != magic[:-4]:
+                raise ValueError(f'{path} is not a reachability index file')
+            if fileMagic != magic:
+                return None
+            index.fingerprint = file.read(hashSize).hex()
+            if index.fingerprint != graphFingerprint(G):
+                return None
+            index.numNodes, index.numEdges, index.numComponents, index.numLabels, numDagEdges = struct.unpack('<5q', file.read(40))
+            index.component, index.dagPointers, index.dagTargets, index.low, index.high = [array('q') for _ in range(5)]
+            index.component.fromfile(file, index.numNodes)
+            index.dagPointers.fromfile(file, index.numComponents + 1)
+            index.dagTargets.fromfile(file, numDagEdges)
+            index.low.fromfile(file, index.numLabels * index.numComponents)
+            index.high.fromfile(file, index.numLabels * index.numComponents)
+        return index
+
+# this function finds the strongly connected components of a graph using an iterative version of tarjan's algorithm
+# the components are numbered in the order they are completed, which is a reverse topological order of the condensation
+def findComponents(numNodes : int, successors) -> array:
+    component = array('q', [-1]) * numNodes
+    order = array('q', [-1]) * numNodes # the order each node was first visited in
+    lowLink = array('q', [0]) * numNodes
+    onStack = bytearray(numNodes)
+    stack = []
+    numVisited = numComponents = 0
+    for root in range(numNodes):
+        if order[root] != -1:
+            continue
+        order[root] = lowLink[root] = numVisited
+        numVisited += 1
+        stack.append(root)
+        onStack[root] = 1
+        work = [(root, iter(successors(root)))] # the nodes being visited, with the successors left to visit
+        while len(work) > 0:
+            node, remaining = work[-1]
+            for successor in remaining:
+                if order[successor] == -1:
+                    order[successor] = lowLink[successor] = numVisited
+                    numVisited += 1
+                    stack.append(successor)
+                    onStack[successor] = 1
+                    work.append((successor, iter(successors(successor))))
+                    break
+                elif onStack[successor]:
+                    lowLink[node] = min(lowLink[node], order[successor])
+            else:
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    lowLink[parent] = min(lowLink[parent], lowLink[node])
+                # a node that can't reach any node visited before it is the root of a component
+                if lowLink[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        onStack[member] = 0
+                        component[member] = numComponents
+                        if member == node:
+                            break
+                    numComponents += 1
+    return component
+
+# this function builds the DAG of the components, as CSR arrays of the (distinct) edges between them
+def condense(numNodes : int, numComponents : int, component : array, successors) -> tuple[array, array]:
+    edges = [set() for _ in range(numComponents)]
+    for node in range(numNodes):
+        for successor in successors(node):
+            if component[successor] != component[node]:
+                edges[component[node]].add(component[successor])
+    pointers, targets = array('q', [0]), array('q')
+    for componentEdges in edges:
+        targets.extend(sorted(componentEdges))
+        pointers.append(len(targets))
+    return pointers, targets
+
+# this function gives each component an interval [low, high] for each of a number of randomized traversals of the DAG
+# high is the position of the component in the post order of the traversal, and low is the lowest high it reaches
+def labelComponents(numComponents : int, pointers : array, targets : array, numLabels : int,
+                    rng : random.Random) -> tuple[array, array]:
+    low, high = array('q', [0]) * (numLabels * numComponents), array('q', [0]) * (numLabels * numComponents)
+    hasParent = bytearray(numComponents)
+    for target in targets:
+        hasParent[target] = 1
+    roots = [component for component in range(numComponents) if not hasParent[component]]
+    for labelNum in range(numLabels):
+        offset = labelNum * numComponents
+        visited = bytearray(numComponents)
+        position = 0
+        rng.shuffle(roots)
+        # this function gives the children of a component in a random order
+        def shuffledChildren(component : int) -> list[int]:
+            children = list(targets[pointers[component]:pointers[component+1]])
+            rng.shuffle(children)
+            return children
+        for root in roots:
+            visited[root] = 1
+            low[offset + root] = numComponents
+            work = [(root, iter(shuffledChildren(root)))]
+            while len(work) > 0:
+                component, remaining = work[-1]
+                for child in remaining:
+                    if not visited[child]:
+                        visited[child] = 1
+                        low[offset + child] = numComponents
+                        work.append((child, iter(shuffledChildren(child))))
+                        break
+                    low[offset + component] = min(low[offset + component], low[offset + child])
+                else:
+                    work.pop()
+                    high[offset + component] = position
+                    low[offset + component] = min(low[offset + component], position)
+                    position += 1
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low[offset + parent] = min(low[offset + parent], low[offset + component])
+    return low, high
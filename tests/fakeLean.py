@@ -0,0 +1,64 @@
+# this is a stand in for the lean worker (see Repl.lean) that is used to test the lean session without lean installed
+# it speaks the same protocol: scripts are read from stdin until the end of query marker, and the reply is written
+# to stdout followed by the same marker
+# only the '#check @', '#eval', and '#print' commands for the constants below are supported, along with
+# 'example : (A) = (B) := rfl', which succeeds if A and B are the same or one of the pairs of equal props below
+# with '--stdin' it answers a single script read from stdin instead, the same way 'lean --stdin' does
+# ('#eval fake_sleep' sleeps for a few seconds, to test timeouts)
+import os
+import sys
+import time
+
+endOfQueryMarker = '-- END_OF_QUERY'
+
+unknownPackages = ['NotAPackage']
+constants = {
+    'fake_nat' : ('Nat', '3'),
+    'fake_string' : ('String', '"fake"'),
+    'fake_theorem' : ('∀ (p q : Prop), p → q → p ∧ q', 'fun p q hp hq => ⟨hp, hq⟩'),
+    'worker_pid' : ('Nat', str(os.getpid())),
+}
+
+equalProps = [('¬p', 'p → False'), ('a > b', 'b < a')]
+
+# this function produces the reply lean would give for a single script
+def answer(script : str) -> str:
+    output = ''
+    for lineNum, line in enumerate(script.split('\n')):
+        line = line.strip()
+        if line.startswith('import '):
+            package = line.split(' ')[1]
+            if package in unknownPackages:
+                return f'<query>:1:0: error: unknown package \'{package}\'\n'
+        elif line.startswith('example : (') and line.endswith(') := rfl'):
+            prop1, prop2 = line[len('example : ('):-len(') := rfl')].split(') = (')
+            if prop1 != prop2 and not (prop1, prop2) in equalProps and not (prop2, prop1) in equalProps:
+                output += f'<query>:{lineNum+1}:0: error: type mismatch\n'
+        elif line.startswith('#check @') or line.startswith('#eval ') or line.startswith('#print '):
+            command, name = line.split(' ')[0], line.split(' ')[1].lstrip('@')
+            if name == 'fake_sleep':
+                time.sleep(5)
+            elif name.startswith('"'):
+                output += line.split(' ', 1)[1].strip('"') + '\n'
+            elif name not in constants:
+                output += f'<query>:{lineNum+1}:{len(command)+1}: error: unknown identifier \'{name}\'\n'
+            elif command == '#check':
+                output += f'{name} : {constants[name][0]}\n'
+            elif command == '#eval':
+                output += constants[name][1] + '\n'
+            else:
+                output += f'def {name} : {constants[name][0]} :=\n{constants[name][1]}\n'
+    return output
+
+if __name__ == '__main__':
+    if '--stdin' in sys.argv:
+        sys.stdout.write(answer(sys.stdin.read()))
+        sys.exit(0)
+    script = ''
+    for line in sys.stdin:
+        if line.rstrip('\n') == endOfQueryMarker:
+            sys.stdout.write(answer(script) + endOfQueryMarker + '\n')
+            sys.stdout.flush()
+            script = ''
+        else:
+            script += line
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+sys.path.append('../TheoremMap')
+from asyncLeanInterface import AsyncLean
+
+# the fake lean worker is placed on PATH as 'lean', so that the interface runs it the same way it would run lean
+fakeLeanPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeLean.py')
+
+
+class TestingAsyncLean(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, 'lean'), 'w') as fakeLean:
+            fakeLean.write(f'#!/bin/sh\nexec "{sys.executable}" "{fakeLeanPath}" "$@"\n')
+        os.chmod(os.path.join(self.directory.name, 'lean'), stat.S_IRWXU)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = self.directory.name + os.pathsep + self.path
+
+    def tearDown(self):
+        os.environ['PATH'] = self.path
+        self.directory.cleanup()
+
+    def testQueries(self):
+        # test the check, eval, and print commands, including the errors check raises
+        async def queries():
+            lean = AsyncLean(['lean', '--stdin'])
+            self.assertEqual(await lean.check('fake_theorem'), '∀ (p q : Prop), p → q → p ∧ q')
+            self.assertEqual(await lean.eval('fake_nat'), '3')
+            self.assertIn('def fake_string : String', await lean.print('fake_string'))
+            with self.assertRaises(NameError):
+                await lean.check('not_a_constant')
+            with self.assertRaises(ImportError):
+                await lean.check('fake_nat', ['NotAPackage'])
+        asyncio.run(queries())
+
+    def testConcurrency(self):
+        # test that concurrent queries get their own answers, with no more than the limit running at once
+        async def queries():
+            lean = AsyncLean(['lean', '--stdin'], maxConcurrency=2)
+            results = await asyncio.gather(*[lean.eval(name) for name in ['fake_nat', 'fake_string'] * 4])
+            self.assertEqual(results, ['3', '"fake"'] * 4)
+            self.assertEqual(lean.peakConcurrency, 2)
+        asyncio.run(queries())
+
+    def testTimeoutAndCancel(self):
+        # test that a query that takes too long or is cancelled kills its lean process
+        async def queries():
+            lean = AsyncLean(['lean', '--stdin'], timeout=0.5)
+            start = time.perf_counter()
+            with self.assertRaises(TimeoutError):
+                await lean.eval('fake_sleep')
+            self.assertLess(time.perf_counter() - start, 4)
+            task = asyncio.create_task(lean.eval('fake_sleep', timeout=10))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(lean.processes, set())
+        asyncio.run(queries())
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
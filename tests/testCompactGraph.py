@@ -0,0 +1,56 @@
+import networkx as nx
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from compactGraph import CompactGraph, writeCompactGraph
+from prover import findPath
+
+
+class TestingCompactGraph(unittest.TestCase):
+    def setUp(self):
+        self.G = nx.DiGraph()
+        self.G.add_node('p')
+        self.G.add_node('q')
+        self.G.add_edge('p', 'q', objectName='a', importPath='import1')
+        self.G.add_node('q → p ∧ q')
+        self.G.add_edge('p', 'q → p ∧ q', objectName='b', importPath='import2')
+        self.G.add_edge('p ∧ q', 'j', objectName='(fun (args : p ∧ q) => c (a1.left) (a1.right))', importPath='import3')
+        self.G.add_edge('q', 'k', objectName='d', importPath=None)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'derivationGraph.compact')
+        writeCompactGraph(self.G, self.path)
+        self.compactG = CompactGraph(self.path)
+
+    def tearDown(self):
+        self.compactG.close()
+        self.directory.cleanup()
+
+    def testRoundTrip(self):
+        # test that the graph read back from the file is the same as the graph that was written
+        self.assertEqual(self.compactG.number_of_nodes(), 6)
+        self.assertEqual(self.compactG.number_of_edges(), 4)
+        self.assertTrue(nx.utils.misc.graphs_equal(self.compactG.toNetworkx(), self.G))
+        self.assertEqual(sorted(self.compactG.predecessors('q')), ['p'])
+        self.assertEqual(self.compactG.get_edge_data('q', 'k'), {'objectName': 'd', 'importPath': None})
+        self.assertIsNone(self.compactG.get_edge_data('q', 'p'))
+        self.assertFalse('r' in self.compactG)
+
+    def testEmpty(self):
+        # test writing and reading a graph with no nodes
+        writeCompactGraph(nx.DiGraph(), self.path + '.empty')
+        with CompactGraph(self.path + '.empty') as emptyG:
+            self.assertEqual(emptyG.number_of_nodes(), 0)
+            self.assertRaises(nx.NodeNotFound, findPath, emptyG, 'p', 'q')
+
+    def testFindPath(self):
+        # test that the prover gives the same results on the compact graph as on the networkx graph
+        for inputType, outputType in [('p', 'q'), ('p', 'q → p ∧ q'), ('p ∧ q', 'j'), ('p', 'k')]:
+            self.assertEqual(findPath(self.compactG, inputType, outputType), findPath(self.G, inputType, outputType))
+        self.assertRaises(nx.NetworkXNoPath, findPath, self.compactG, 'j', 'p ∧ q')
+        self.assertRaises(nx.NodeNotFound, findPath, self.compactG, 'p', 'r')
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
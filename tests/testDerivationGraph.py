@@ -3,6 +3,7 @@ import sys
 import unittest
 sys.path.append('../TheoremMap')
 from leanInterface import *
+from graphBuild import dedupeGraphEntries, generateDerivationGraphParallel, populateGraphWithAndJoinedArgsParallel
 from pythonComponent import generateDerivationGraph, populateGraphWithAndJoinedArgs
 
 
@@ -27,6 +28,37 @@ class TestingGenerateDerivationGraph(unittest.TestCase):
                               ['b', 'p → q → p ∧ q', 'import2']])
         self.assertTrue(nx.utils.misc.graphs_equal(generateDerivationGraph(emptyInput), G))
 
+    def testEquivalentTypes(self):
+        # test that types only differing in spacing or redundant parentheses share a node
+        G = nx.DiGraph()
+        G.add_edge('p', 'q → r', objectName='a', importPath='import1')
+        G.add_edge('p ∧ q', 'r', objectName='b', importPath='import2')
+        objectList = LeanDef('object_list', 'List (List String)', 
+                             [['a', 'p → (q →  r)', 'import1'],
+                              ['b', '(p ∧ q) → r', 'import2']])
+        self.assertTrue(nx.utils.misc.graphs_equal(generateDerivationGraph(objectList), G))
+
+    def testBinders(self):
+        # test that the leading binders of theorem types are stripped, so that their arguments still become edges
+        G = nx.DiGraph()
+        G.add_edge('n < m', 'n ≤ m', objectName='Nat.le_of_lt', importPath='import1')
+        G.add_node('a ∧ b ↔ b ∧ a')
+        G.add_edge('Nat', 'Nat', objectName='f', importPath='import3')
+        G.add_edge('x ∈ s', 'p x → q x', objectName='g', importPath='import4')
+        objects = [['Nat.le_of_lt', '∀ {n m : ℕ}, n < m → n ≤ m', 'import1'],
+                   ['and_comm', '∀ {a b : Prop}, a ∧ b ↔ b ∧ a', 'import2'],
+                   ['f', 'Nat → Nat', 'import3'],
+                   ['g', '∀ {s : Set α}, ∀ x ∈ s, p x → q x', 'import4']]
+        self.assertTrue(nx.utils.misc.graphs_equal(generateDerivationGraph(objects), G))
+        self.assertTrue(nx.utils.misc.graphs_equal(generateDerivationGraphParallel(iter(objects), numWorkers=1), G))
+
+    def testGenerator(self):
+        # test that the object list can be streamed from a generator rather than held in a LeanDef
+        G = nx.DiGraph()
+        G.add_edge('p', 'q', objectName='a', importPath='import1')
+        objects = (object for object in [['a', 'p → q', 'import1']])
+        self.assertTrue(nx.utils.misc.graphs_equal(generateDerivationGraph(objects), G))
+
 class TestingPopulateGraphWithAndJoinedArgs(unittest.TestCase):
     def testEmpty(self):
         # test the case where objectList is empty
@@ -55,6 +87,26 @@ class TestingPopulateGraphWithAndJoinedArgs(unittest.TestCase):
                    importPath='import1')
         self.assertTrue(nx.utils.misc.graphs_equal(populateGraphWithAndJoinedArgs(G), G2))
 
+class TestingParallelBuild(unittest.TestCase):
+    def testSameGraph(self):
+        # test that the graphs built using many processes are the same as the ones built on one core, including which
+        # object an edge keeps when several objects give the same edge
+        objects = [['a', 'p → q → p ∧ q', 'import1'], ['b', 'p', 'import2'], ['c', '(p) → r', 'import3'], ['d', 'p → (q → (p ∧ q))', 'import4'],
+                   ['e', 'r → s → t → u', 'import5'], ['f', 'q → (r ∨ s) → t', 'import6']]
+        G = generateDerivationGraph(objects)
+        parallelG = generateDerivationGraphParallel(iter(objects), numWorkers=2, chunkSize=1)
+        self.assertTrue(nx.utils.misc.graphs_equal(parallelG, G))
+        self.assertEqual(list(parallelG.nodes()), list(G.nodes()))
+        self.assertEqual(parallelG.edges['p', 'q → p ∧ q']['objectName'], 'd')
+        self.assertTrue(nx.utils.misc.graphs_equal(populateGraphWithAndJoinedArgsParallel(G, numWorkers=2, chunkSize=1), 
+                                                   populateGraphWithAndJoinedArgs(G)))
+        # the repeated entries of a chunk are dropped in the workers, without changing the graph
+        parallelG = generateDerivationGraphParallel(iter(objects), numWorkers=2, chunkSize=4)
+        self.assertEqual(list(parallelG.nodes()), list(G.nodes()))
+        self.assertEqual(parallelG.edges['p', 'q → p ∧ q']['objectName'], 'd')
+        self.assertEqual(dedupeGraphEntries([('p', 'q', 'a', 'import1'), ('q', None, None, None), ('p', 'q', 'b', 'import2'), ('r', None, None, None)]),
+                         [('p', 'q', 'b', 'import2'), ('r', None, None, None)])
+
 # the program begins below
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
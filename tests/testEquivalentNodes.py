@@ -0,0 +1,90 @@
+import networkx as nx
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from leanInterface import *
+from equivalentNodes import equivalenceKey, groupCandidateNodes, loadMergedNodes, mergeEquivalentNodes, nodeImports, saveMergedNodes
+from prover import findPath
+from queryCache import QueryCache
+from typeIndex import TypeIndex
+
+# lean is replaced by the fake lean worker, which knows a few pairs of equal props
+fakeLeanCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeLean.py')]
+
+
+class TestingEquivalentNodes(unittest.TestCase):
+    def setUp(self):
+        startLeanSession(1, fakeLeanCommand)
+
+    def tearDown(self):
+        stopLeanSession()
+
+    def testGroups(self):
+        # test that only nodes that could be equal are grouped together
+        self.assertEqual(equivalenceKey('¬p'), equivalenceKey('p → False'))
+        self.assertEqual(equivalenceKey('a > b'), equivalenceKey('(b < a)'))
+        self.assertNotEqual(equivalenceKey('p → q'), equivalenceKey('p ∧ q'))
+        self.assertEqual(groupCandidateNodes(['¬p', 'q', 'p → False', 'a > b', 'b < a', 'q → p']), 
+                         [['¬p', 'p → False'], ['a > b', 'b < a']])
+
+    def testMerge(self):
+        # test that equal nodes are merged, moving their edges to the node that is kept
+        G = nx.DiGraph()
+        G.add_edge('p → False', 'q', objectName='a', importPath='import1')
+        G.add_edge('q', '¬p', objectName='b', importPath='import2')
+        G.add_edge('¬p', 'r', objectName='c', importPath='import3')
+        G.add_edge('q → p', 'False → p', objectName='d', importPath='import4')
+        merged, representatives = mergeEquivalentNodes(G)
+        self.assertEqual(representatives, {'p → False': '¬p'})
+        expected = nx.DiGraph()
+        expected.add_edge('¬p', 'q', objectName='a', importPath='import1')
+        expected.add_edge('q', '¬p', objectName='b', importPath='import2')
+        expected.add_edge('¬p', 'r', objectName='c', importPath='import3')
+        expected.add_edge('q → p', 'False → p', objectName='d', importPath='import4')
+        self.assertTrue(nx.utils.misc.graphs_equal(merged, expected))
+
+    def testChunks(self):
+        # test that equal nodes of a group are merged when they are checked in different lean runs
+        G = nx.DiGraph()
+        G.add_nodes_from(['a > b', '(a > b)', 'b < a'])
+        self.assertEqual(mergeEquivalentNodes(G, maxGroupSize=1)[1], {'b < a': 'a > b'})
+
+    def testImports(self):
+        # test that the types are checked with the imports of the objects whose edges they are on
+        G = nx.DiGraph()
+        G.add_edge('p → False', 'q', objectName='a', importPath='NotAPackage')
+        G.add_edge('¬p', 'q', objectName='b', importPath='import2')
+        self.assertEqual(mergeEquivalentNodes(G)[1], {})
+        self.assertEqual(nodeImports(G, ['p → False', '¬p']), ['NotAPackage', 'import2'])
+
+    def testQueries(self):
+        # test that queries for the type of a merged node find the node it was merged into, using the saved map
+        G = nx.DiGraph()
+        G.add_edge('p → False', 'q', objectName='a', importPath='import1')
+        G.add_edge('q', '¬p', objectName='b', importPath='import2')
+        merged, representatives = mergeEquivalentNodes(G)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'derivationGraph.merged.json')
+            saveMergedNodes(representatives, path, merged)
+            mergedNodes = loadMergedNodes(path, merged)
+            # a map saved for a different graph isn't used
+            self.assertIsNone(loadMergedNodes(path, G))
+        self.assertEqual(mergedNodes, {'p → False': '¬p'})
+        self.assertRaises(nx.NodeNotFound, findPath, merged, 'p → False', 'q')
+        self.assertEqual(findPath(merged, 'p → False', 'q', mergedNodes=mergedNodes), (['import1'], ['a']))
+        self.assertEqual(findPath(merged, 'q', 'p → False', mergedNodes=mergedNodes), (['import2'], ['b']))
+        # the type index also maps types written differently from the merged node
+        index = TypeIndex(merged, mergedNodes)
+        self.assertEqual(index.resolve('(p) → False'), '¬p')
+        self.assertEqual(findPath(merged, '(p → False)', 'q', typeIndex=index), (['import1'], ['a']))
+        # the query cache answers a merged node and the node it was merged into from the same entry
+        cache = QueryCache()
+        self.assertEqual(cache.findPath(merged, '¬p', 'q', mergedNodes=mergedNodes), (['import1'], ['a']))
+        self.assertEqual(cache.findPath(merged, '(p → False)', 'q', mergedNodes=mergedNodes), (['import1'], ['a']))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from leanInterface import *
+from generateObjectList import generateObjectListFromExport, generateObjectListParallel, updateObjectList
+from generateObjectList import ObjectListWriter, iterObjectList, writeObjectList
+from pipelineMetrics import metrics
+
+# lean objects are looked up using the fake lean worker so that lean doesn't need to be installed
+fakeLeanCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeLean.py')]
+
+
+# below is a test case that writes a few lean files using objects known to the fake lean worker
+class LeanFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        startLeanSession(1, fakeLeanCommand)
+        self.directory = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.directory.name, 'LeanBackend'))
+        self.files = []
+        for fileName, text in [('A.lean', 'def fake_nat := 3\n'), 
+                               ('B.lean', 'theorem fake_theorem : ∀ (p q : Prop), p → q → p ∧ q := sorry\n'),
+                               ('C.lean', 'def fake_string := "fake"\n-- def not_a_constant\n')]:
+            self.files.append(os.path.join(self.directory.name, 'LeanBackend', fileName))
+            with open(self.files[-1], 'w') as file:
+                file.write(text)
+        self.checkpointPath = os.path.join(self.directory.name, 'objectList.checkpoint')
+
+    def tearDown(self):
+        stopLeanSession()
+        self.directory.cleanup()
+
+class TestingGenerateObjectListParallel(LeanFilesTestCase):
+    def testExtraction(self):
+        # test that all files are extracted and recorded in the checkpoint
+        metrics.reset()
+        objects = generateObjectListParallel([os.path.join(self.directory.name, 'LeanBackend')], 2, self.checkpointPath)
+        self.assertEqual(sorted(objects), [['fake_nat', 'Nat', 'A'], 
+                                           ['fake_string', 'String', 'C'],
+                                           ['fake_theorem', '∀ (p q : Prop), p → q → p ∧ q', 'B']])
+        with open(self.checkpointPath) as checkpoint:
+            self.assertEqual(len(checkpoint.readlines()), 3)
+        # the metrics recorded in the workers are merged into the parent's
+        self.assertEqual(metrics.snapshot()['counters']['extract.files'], 3)
+        self.assertEqual(metrics.snapshot()['stages']['extract']['count'], 3)
+
+    def testResume(self):
+        # test that files in the checkpoint are not extracted again, even if the last entry was cut off
+        with open(self.checkpointPath, 'w') as checkpoint:
+            checkpoint.write(json.dumps({'file': self.files[0], 'objects': [['from_checkpoint', 'Nat', 'A']]}) + '\n')
+            checkpoint.write('{"file": "' + self.files[1])
+        objects = generateObjectListParallel(self.files, 2, self.checkpointPath)
+        self.assertEqual(objects, [['from_checkpoint', 'Nat', 'A'],
+                                   ['fake_theorem', '∀ (p q : Prop), p → q → p ∧ q', 'B'],
+                                   ['fake_string', 'String', 'C']])
+
+    def testFailedFile(self):
+        # test that a file whose import lean can't load is left out of the checkpoint, so the next run extracts it again
+        failedFile = os.path.join(self.directory.name, 'LeanBackend', 'NotAPackage.lean')
+        with open(failedFile, 'w') as file:
+            file.write('def fake_nat := 3\n')
+        metrics.reset()
+        objects = generateObjectListParallel(self.files + [failedFile], 2, self.checkpointPath)
+        self.assertEqual(len(objects), 3)
+        self.assertEqual(metrics.snapshot()['counters']['extract.failedFiles'], 1)
+        with open(self.checkpointPath) as checkpoint:
+            self.assertNotIn(failedFile, [json.loads(line)['file'] for line in checkpoint])
+
+class TestingUpdateObjectList(LeanFilesTestCase):
+    def update(self, objects, manifest):
+        # returns the updated object list and manifest, and the number of files that were extracted
+        objects, manifest, changed = updateObjectList([os.path.join(self.directory.name, 'LeanBackend')], objects, manifest, 2,
+                                                      self.checkpointPath)
+        # the new objects are streamed from the checkpoint, so they are read before it is removed
+        objects = sorted(objects)
+        numExtracted = 0
+        if changed:
+            with open(self.checkpointPath) as checkpoint:
+                numExtracted = len(checkpoint.readlines())
+            os.remove(self.checkpointPath)
+        return objects, manifest, numExtracted
+
+    def testUpdate(self):
+        # test that only the added, changed, and deleted files are extracted again
+        objects, manifest, numExtracted = self.update([], {'version': None, 'files': {}})
+        self.assertEqual(numExtracted, 3)
+        self.assertEqual(len(objects), 3)
+        self.assertEqual(self.update(objects, manifest), (objects, manifest, 0))
+
+        os.remove(self.files[0])
+        with open(self.files[2], 'w') as file:
+            file.write('theorem fake_theorem : ∀ (p q : Prop), p → q → p ∧ q := sorry\n')
+        with open(os.path.join(self.directory.name, 'LeanBackend', 'D.lean'), 'w') as file:
+            file.write('def fake_nat := 3\n')
+        objects, manifest, numExtracted = self.update(objects, manifest)
+        self.assertEqual(numExtracted, 2)
+        self.assertEqual(objects, [['fake_nat', 'Nat', 'D'],
+                                   ['fake_theorem', '∀ (p q : Prop), p → q → p ∧ q', 'B'],
+                                   ['fake_theorem', '∀ (p q : Prop), p → q → p ∧ q', 'C']])
+        self.assertEqual(sorted(manifest['files']), ['LeanBackend/B.lean', 'LeanBackend/C.lean', 'LeanBackend/D.lean'])
+
+    def testFailedFile(self):
+        # test that a file that failed isn't added to the manifest, so that it is extracted again by the next run
+        objects, manifest, _ = self.update([], {'version': None, 'files': {}})
+        with open(os.path.join(self.directory.name, 'LeanBackend', 'NotAPackage.lean'), 'w') as file:
+            file.write('def fake_nat := 3\n')
+        for _ in range(2):
+            updatedObjects, updatedManifest, changed = updateObjectList([os.path.join(self.directory.name, 'LeanBackend')],
+                                                                        objects, manifest, 2, self.checkpointPath)
+            self.assertTrue(changed)
+            self.assertEqual((sorted(updatedObjects), updatedManifest), (objects, manifest))
+            os.remove(self.checkpointPath)
+
+    def testVersionChange(self):
+        # test that every file is extracted again, and the old objects dropped, when the toolchain changes
+        objects, manifest, _ = self.update([], {'version': None, 'files': {}})
+        version = manifest['version']
+        manifest['version'] = {**version, 'toolchain': 'leanprover/lean4:v0.0.0'}
+        updatedObjects, updatedManifest, numExtracted = self.update(objects + [['removed', 'Nat', 'A']], manifest)
+        self.assertEqual(numExtracted, 3)
+        self.assertEqual(updatedObjects, objects)
+        self.assertEqual(updatedManifest['version'], version)
+        # a package bump on its own only extracts the files that changed
+        manifest = {**updatedManifest, 'version': {**version, 'packages': {'mathlib': 'oldRevision'}}}
+        self.assertEqual(self.update(updatedObjects, manifest), (updatedObjects, updatedManifest, 0))
+
+    def testDependents(self):
+        # test that the files importing a changed file (directly or not) are extracted again, and no others
+        with open(self.files[1], 'a') as file:
+            file.write('import A\n')
+        with open(os.path.join(self.directory.name, 'LeanBackend', 'D.lean'), 'w') as file:
+            file.write('import B -- a comment\ndef fake_nat := 3\n')
+        objects, manifest, numExtracted = self.update([], {'version': None, 'files': {}})
+        self.assertEqual(numExtracted, 4)
+        self.assertEqual(manifest['files']['LeanBackend/D.lean']['module'], 'D')
+        with open(self.files[0], 'w') as file:
+            file.write('def fake_string := "fake"\n')
+        updatedObjects, manifest, numExtracted = self.update(objects, manifest)
+        self.assertEqual(numExtracted, 3)
+        self.assertEqual(len(updatedObjects), 4)
+        self.assertIn(['fake_string', 'String', 'A'], updatedObjects)
+        # deleting a module extracts its importers again as well
+        os.remove(self.files[1])
+        updatedObjects, manifest, numExtracted = self.update(updatedObjects, manifest)
+        self.assertEqual(numExtracted, 1)
+        self.assertEqual(sorted(manifest['files']), ['LeanBackend/A.lean', 'LeanBackend/C.lean', 'LeanBackend/D.lean'])
+
+class TestingGenerateObjectListFromExport(unittest.TestCase):
+    def testExport(self):
+        # test reading the object list from a stand in for the export program that prints a fixed set of constants
+        records = [{'name': 'And.intro', 'type': '∀ {a b : Prop}, a → b → a ∧ b', 'module': 'Init.Prelude', 'kind': 'constructor'},
+                   {'name': 'And.rec', 'type': 'sorry', 'module': 'Init.Prelude', 'kind': 'recursor'},
+                   {'name': 'fake_nat', 'type': 'Nat', 'module': 'LeanBackend', 'kind': 'def'}]
+        fakeExportCommand = [sys.executable, '-c', f'import json\nfor record in {records!r}: print(json.dumps(record))']
+        self.assertEqual(generateObjectListFromExport(['LeanBackend'], fakeExportCommand),
+                         [['And.intro', '∀ {a b : Prop}, a → b → a ∧ b', 'Init.Prelude'], ['fake_nat', 'Nat', 'LeanBackend']])
+        self.assertRaises(RuntimeError, generateObjectListFromExport, ['LeanBackend'], [sys.executable, '-c', 'exit(1)'])
+
+class TestingObjectListStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'objectList.jsonl')
+        self.objects = [['fake_nat', 'Nat', 'A'], ['fake_theorem', '∀ (p q : Prop), p → q → p ∧ q', 'B'], ['weird', 'a\nb "c"', 'C']]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testRoundTrip(self):
+        # test that entries written one at a time are streamed back unchanged, one entry per line
+        self.assertEqual(writeObjectList(iter(self.objects), self.path), 3)
+        self.assertEqual(list(iterObjectList(self.path)), self.objects)
+        with open(self.path, encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 3)
+        # the older format is still read
+        legacyPath = os.path.join(self.directory.name, 'objectList.json')
+        with open(legacyPath, 'w') as file:
+            file.write('{\n\t"objectList": ' + json.dumps(self.objects) + '\n}')
+        self.assertEqual(list(iterObjectList(legacyPath)), self.objects)
+
+    def testFailedWrite(self):
+        # test that the existing object list is kept if writing the new one fails, and can be read while it is written
+        writeObjectList(self.objects, self.path)
+        def failingObjects():
+            yield ['new', 'Nat', 'D']
+            raise RuntimeError('extraction failed')
+        with self.assertRaises(RuntimeError):
+            with ObjectListWriter(self.path) as writer:
+                for obj in iterObjectList(self.path):
+                    writer.append(obj)
+                writer.extend(failingObjects())
+        self.assertEqual(list(iterObjectList(self.path)), self.objects)
+        self.assertEqual(os.listdir(self.directory.name), ['objectList.jsonl'])
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
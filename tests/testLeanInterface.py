@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+sys.path.append('../TheoremMap')
+import leanInterface
+from leanInterface import *
+
+# the lean session is tested against a fake lean worker so that lean doesn't need to be installed
+fakeLeanCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeLean.py')]
+
+
+class TestingLeanSession(unittest.TestCase):
+    def setUp(self):
+        startLeanSession(2, fakeLeanCommand)
+
+    def tearDown(self):
+        stopLeanSession()
+
+    def testObjects(self):
+        # test that LeanDef and LeanTheorem work the same way through the session
+        self.assertEqual(LeanDef('fake_nat').value, 3)
+        self.assertEqual(LeanTheorem('fake_theorem').prop, '∀ (p q : Prop), p → q → p ∧ q')
+        self.assertRaises(NameError, LeanDef, 'not_a_constant')
+        self.assertRaises(ImportError, LeanDef, 'fake_nat', requiredImports=['NotAPackage'])
+
+    def testWorkerReuse(self):
+        # test that sequential queries are answered by a single warm worker
+        pids = {LeanDef('worker_pid').value for _ in range(5)}
+        self.assertEqual(len(pids), 1)
+        self.assertEqual(len(leanInterface.leanSession.workers), 1)
+
+    def testCheckMany(self):
+        # test that many names are checked in one lean run, with errors reported per name
+        types = LeanObject.checkMany(['fake_nat', 'not_a_constant', 'fake_theorem'])
+        self.assertEqual(types['fake_nat'], 'Nat')
+        self.assertIsInstance(types['not_a_constant'], NameError)
+        self.assertEqual(types['fake_theorem'], '∀ (p q : Prop), p → q → p ∧ q')
+        types = LeanObject.checkMany(['fake_nat', 'fake_string'], requiredImports=['NotAPackage'])
+        self.assertTrue(all(isinstance(error, ImportError) for error in types.values()))
+        self.assertEqual(LeanObject.checkMany([]), {})
+
+    def testFailedWorker(self):
+        # test that a worker that fails is replaced, including for a query that was already waiting for a worker
+        pool = LeanWorkerPool(1, fakeLeanCommand)
+        worker = pool.acquireWorker()
+        outputs = []
+        waiting = threading.Thread(target=lambda: outputs.append(pool.query('#eval fake_nat')))
+        waiting.start()
+        worker.process.kill()
+        self.assertRaises(RuntimeError, worker.query, '#eval fake_nat')
+        pool.releaseWorker(worker, failed=True)
+        waiting.join(timeout=10)
+        self.assertEqual(outputs, ['3\n'])
+        self.assertEqual(len(pool.workers), 1)
+        self.assertNotEqual(pool.workers[0], worker)
+        pool.close()
+
+    def testTimeout(self):
+        # test that a worker that doesn't answer in time is killed, and replaced for the next query
+        pool = LeanWorkerPool(1, fakeLeanCommand, timeout=1)
+        worker = pool.acquireWorker()
+        pool.releaseWorker(worker)
+        self.assertRaises(TimeoutError, pool.query, '#eval fake_sleep')
+        self.assertIsNotNone(worker.process.poll())
+        self.assertEqual(pool.query('#eval fake_nat'), '3\n')
+        self.assertEqual(len(pool.workers), 1)
+        self.assertNotEqual(pool.workers[0], worker)
+        pool.close()
+
+    def testStop(self):
+        # test that stopping the session closes its workers
+        LeanDef('fake_nat')
+        pool = leanInterface.leanSession
+        stopLeanSession()
+        self.assertIsNone(leanInterface.leanSession)
+        self.assertEqual(pool.workers, [])
+
+class TestingLeanCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cachePath = os.path.join(self.directory.name, 'leanCache.sqlite')
+
+    def tearDown(self):
+        stopLeanSession()
+        disableLeanCache()
+        self.directory.cleanup()
+
+    def testCache(self):
+        # test that stored outputs are returned without lean, until the version changes
+        startLeanSession(1, fakeLeanCommand)
+        enableLeanCache(self.cachePath, {'toolchain': 'v1'})
+        self.assertEqual(LeanDef('fake_nat').value, 3)
+        self.assertRaises(NameError, LeanDef, 'not_a_constant')
+        # a worker that exits straight away can't answer anything, so any query that reaches it fails
+        startLeanSession(1, [sys.executable, '-c', 'pass'])
+        cache = enableLeanCache(self.cachePath, {'toolchain': 'v1'})
+        self.assertEqual(LeanDef('fake_nat').value, 3)
+        self.assertRaises(NameError, LeanDef, 'not_a_constant')
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        enableLeanCache(self.cachePath, {'toolchain': 'v2'})
+        self.assertRaises(RuntimeError, LeanDef, 'fake_nat')
+        # opening the database for another version doesn't remove the outputs stored for the first one
+        cache = enableLeanCache(self.cachePath, {'toolchain': 'v1'})
+        self.assertEqual(LeanDef('fake_nat').value, 3)
+        self.assertEqual(cache.misses, 0)
+
+    def testFailedImportNotCached(self):
+        # test that a script whose imports failed isn't stored, so it is run again once the import can be loaded
+        startLeanSession(1, fakeLeanCommand)
+        cache = enableLeanCache(self.cachePath, {'toolchain': 'v1'})
+        self.assertRaises(ImportError, LeanDef, 'fake_nat', requiredImports=['NotAPackage'])
+        self.assertRaises(ImportError, LeanDef, 'fake_nat', requiredImports=['NotAPackage'])
+        self.assertEqual(cache.hits, 0)
+        self.assertFalse(isCacheableOutput('import LeanBackend\n#check @fake_nat', '<query>:1:0: error: unknown package\n'))
+        self.assertFalse(isCacheableOutput('\n  import LeanBackend\n  import Missing\n#check @x', 'a.lean:3:2: error: object file does not exist\n'))
+        self.assertTrue(isCacheableOutput('import LeanBackend\n#check @x', "<query>:2:7: error: unknown identifier 'x'\n"))
+
+class TestingLazyObjects(unittest.TestCase):
+    def tearDown(self):
+        stopLeanSession()
+
+    def testLazy(self):
+        # test that a lazy object only runs lean when it is first used, and can be resolved again if that failed
+        startLeanSession(1, [sys.executable, '-c', 'pass'])
+        nat, theorem = LeanDef('fake_nat', lazy=True), LeanTheorem('fake_theorem', lazy=True)
+        self.assertRaises(RuntimeError, getattr, nat, 'value')
+        startLeanSession(1, fakeLeanCommand)
+        self.assertEqual(nat.value, 3)
+        self.assertEqual(theorem.prop, '∀ (p q : Prop), p → q → p ∧ q')
+        self.assertRaises(AttributeError, getattr, nat, 'not_an_attribute')
+
+    def testPreload(self):
+        # test that preloading resolves objects in the background, leaving the ones that fail unresolved
+        startLeanSession(1, fakeLeanCommand)
+        objects = [LeanDef('fake_nat', lazy=True), LeanDef('not_a_constant', lazy=True), LeanDef('fake_string', lazy=True)]
+        preloadLeanObjects(objects).join()
+        self.assertEqual([object.pending for object in objects], [None, (None, 'sorry'), None])
+        self.assertEqual(objects[2].type, 'String')
+        self.assertRaises(NameError, getattr, objects[1], 'type')
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import unittest
+sys.path.append('../TheoremMap')
+from leanLexer import tokenize, iterDeclarations
+
+
+class TestingTokenize(unittest.TestCase):
+    def testComments(self):
+        # test that keywords in nested block comments, line comments, strings, and names are skipped
+        text = '/- outer /- def hidden -/ still a comment -/\n-- def alsoHidden\ndef shown := "def \\" def" ++ h.def ++ def_x'
+        self.assertEqual([(token.text, token.name) for token in tokenize(text)], [('def', 'shown')])
+
+    def testIdentifiers(self):
+        # test dotted, primed, and escaped names, character literals, and line numbers
+        text = "theorem Nat.foo' : 'a' = 'a'\n\ndef «weird name».x := '\"'\ndef y := 1"
+        self.assertEqual([(token.name, token.line) for token in tokenize(text)], [("Nat.foo'", 1), ('«weird name».x', 3), ('y', 4)])
+
+class TestingIterDeclarations(unittest.TestCase):
+    def testScopes(self):
+        # test that namespaces, sections, and _root_ names are resolved
+        text = '''namespace A.B
+section S
+def\tf := 1
+end S
+theorem _root_.g : True := trivial
+end A.B
+namespace C
+lemma h : True := trivial
+end C
+def k := 2'''
+        self.assertEqual([declaration.fullName for declaration in iterDeclarations(text)], ['A.B.f', 'g', 'C.h', 'k'])
+
+    def testModifiers(self):
+        # test that attributes and modifiers are recorded, and anonymous instances are skipped
+        text = '''@[simp, to_additive (attr := simp)] protected theorem foo : True := trivial
+private noncomputable def bar := 1
+instance : Inhabited Nat := ⟨0⟩
+instance instNamed : Inhabited Nat := ⟨0⟩'''
+        declarations = list(iterDeclarations(text))
+        self.assertEqual([(declaration.kind, declaration.name, declaration.line) for declaration in declarations],
+                         [('theorem', 'foo', 1), ('def', 'bar', 2), ('instance', 'instNamed', 4)])
+        self.assertEqual(declarations[0].modifiers, ('@[simp, to_additive (attr := simp)]', 'protected'))
+        self.assertEqual(declarations[1].modifiers, ('private', 'noncomputable'))
+
+    def testInstances(self):
+        # test that derived instances are skipped, and that instance names are found after a priority
+        text = '''deriving instance BEq, Hashable for Foo
+@[simp] deriving instance Repr for Bar
+instance (priority := 100) instFoo : Inhabited Nat := ⟨0⟩
+instance (priority := (low)) : Inhabited Nat := ⟨0⟩
+def baz := 1'''
+        declarations = list(iterDeclarations(text))
+        self.assertEqual([(declaration.kind, declaration.name, declaration.line) for declaration in declarations],
+                         [('instance', 'instFoo', 3), ('def', 'baz', 5)])
+        self.assertEqual(declarations[1].modifiers, ())
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
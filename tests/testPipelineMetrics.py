@@ -0,0 +1,67 @@
+import json
+import networkx as nx
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from pipelineMetrics import metrics, PipelineMetrics
+from prover import findPath
+
+
+class TestingPipelineMetrics(unittest.TestCase):
+    def testStages(self):
+        # test that stages are timed, and that errors are counted as failures by name
+        pipelineMetrics = PipelineMetrics()
+        for _ in range(3):
+            with pipelineMetrics.stage('work'):
+                pass
+        with self.assertRaises(KeyError):
+            with pipelineMetrics.stage('work'):
+                raise KeyError('missing')
+        pipelineMetrics.increment('items', 5)
+        snapshot = pipelineMetrics.snapshot()
+        self.assertEqual(snapshot['stages']['work']['count'], 4)
+        self.assertEqual(snapshot['counters'], {'items': 5, 'work.failures.KeyError': 1})
+
+    def testMerge(self):
+        # test that the metrics collected in another process are added to the parent's, and cleared in the worker
+        worker, parent = PipelineMetrics(), PipelineMetrics()
+        with worker.stage('extract'):
+            worker.increment('extract.files')
+        parent.increment('extract.files')
+        parent.merge(pickle.loads(pickle.dumps(worker.collect())))
+        self.assertEqual(parent.snapshot()['counters'], {'extract.files': 2})
+        self.assertEqual(parent.snapshot()['stages']['extract']['count'], 1)
+        self.assertEqual(worker.snapshot()['counters'], {})
+
+    def testLogAndProfiles(self):
+        # test that events are logged as json lines, and that profiled stages are written out for pstats
+        with tempfile.TemporaryDirectory() as directory:
+            pipelineMetrics = PipelineMetrics()
+            pipelineMetrics.enableLog(os.path.join(directory, 'metrics.jsonl'))
+            pipelineMetrics.enableProfiling(['outer'], os.path.join(directory, 'profiles'))
+            with pipelineMetrics.stage('outer'):
+                with pipelineMetrics.stage('inner'):
+                    sorted(range(1000))
+            pipelineMetrics.log('fileExtracted', file='A.lean', objects=3)
+            pipelineMetrics.disableLog()
+            with open(os.path.join(directory, 'metrics.jsonl')) as log:
+                event = json.loads(log.readline())
+            self.assertEqual((event['event'], event['file'], event['objects']), ('fileExtracted', 'A.lean', 3))
+            self.assertEqual([os.path.basename(path) for path in pipelineMetrics.dumpProfiles()], [f'outer.{os.getpid()}.prof'])
+
+    def testSearchStage(self):
+        # test that searches are recorded in the shared metrics
+        G = nx.DiGraph()
+        G.add_edge('p', 'q', objectName='a', importPath='import1')
+        metrics.reset()
+        findPath(G, 'p', 'q')
+        self.assertRaises(nx.NetworkXNoPath, findPath, G, 'q', 'p')
+        self.assertEqual(metrics.snapshot()['stages']['search']['count'], 2)
+        self.assertEqual(metrics.snapshot()['counters'], {'search.failures.NetworkXNoPath': 1})
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,8 @@ import networkx as nx
 import sys
 import unittest
 sys.path.append('../TheoremMap')
-from prover import findPath
+from andJoinedEdges import AndJoinedEdges
+from prover import ConjunctionIndex, findPath, findPaths, findProof, ProofStep, searchMethods, SearchLimitReached
 
 
 class TestingFindPath(unittest.TestCase):
@@ -41,6 +42,101 @@ class TestingFindPath(unittest.TestCase):
         self.assertEqual(findPath(G, 'p', 'k'), (['import1', 'import4'], ['a', 'd']))
         self.assertRaises(nx.NetworkXNoPath, findPath, G, 'j', 'p ∧ q')
 
+class TestingFindPathAndJoined(unittest.TestCase):
+    def testModerate(self):
+        # test that the and-joined edges are found without being added to the graph
+        G = nx.DiGraph()
+        G.add_edge('p', 'q → j → k', objectName='a', importPath='import1')
+        G.add_edge('k', 'r', objectName='b', importPath='import2')
+        G.add_edge('q ∧ j', 'p', objectName='c', importPath='import3')
+        andJoinedEdges = AndJoinedEdges(G)
+        self.assertEqual(findPath(G, 'p ∧ q', 'j → k', andJoinedEdges), 
+                         (['import1'], ['''(fun (args : p ∧ q) =>
+                        a (args.left) (args.right))''']))
+        self.assertEqual(findPath(G, 'p ∧ (q ∧ j)', 'r', andJoinedEdges), 
+                         (['import1', 'import2'], ['''(fun (args : p ∧ q ∧ j) =>
+                        a (args.left) (args.right.left) (args.right.right))''', 'b']))
+        # edges of G leaving a conjunction are still followed
+        self.assertEqual(findPath(G, 'q ∧ j', 'q → j → k', andJoinedEdges), (['import3', 'import1'], ['c', 'a']))
+        self.assertEqual(len(G.edges()), 3)
+        self.assertRaises(nx.NetworkXNoPath, findPath, G, 'k', 'p', andJoinedEdges)
+        self.assertRaises(nx.NodeNotFound, findPath, G, 'p ∧ j', 'k', andJoinedEdges)
+        # a target that is neither a node of G nor reached by an and-joined edge isn't searched for
+        self.assertRaises(nx.NodeNotFound, findPath, G, 'p ∧ q', 's', andJoinedEdges)
+        self.assertRaises(nx.NodeNotFound, findPath, G, 'p ∧ q', 'q → j → r', andJoinedEdges)
+
+# below is a test case with the ladder graph shared by the search tests
+class LadderTestCase(unittest.TestCase):
+    def setUp(self):
+        # a ladder of types where 'a0' reaches 'aN' in N steps, with a long dead end branching off of each rung
+        self.G = nx.DiGraph()
+        for i in range(20):
+            self.G.add_edge(f'a{i}', f'a{i+1}', objectName=f'step{i}', importPath='import1')
+            for j in range(5):
+                self.G.add_edge(f'a{i}' if j == 0 else f'b{i}_{j-1}', f'b{i}_{j}', objectName=f'dead{i}_{j}', importPath='import2')
+        self.G.add_edge('a0', 'a10', objectName='shortcut', importPath='import3')
+
+class TestingSearchMethods(LadderTestCase):
+    def testMethodsAgree(self):
+        # test that every search method finds the same shortest path
+        for method in searchMethods:
+            self.assertEqual(findPath(self.G, 'a0', 'a12', method=method), 
+                             (['import3', 'import1', 'import1'], ['shortcut', 'step10', 'step11']))
+            self.assertEqual(findPath(self.G, 'a3', 'a3', method=method), ([], []))
+            self.assertRaises(nx.NetworkXNoPath, findPath, self.G, 'a5', 'a2', method=method)
+            self.assertRaises(nx.NodeNotFound, findPath, self.G, 'a5', 'c', method=method)
+        self.assertRaises(ValueError, findPath, self.G, 'a0', 'a1', method='dfs')
+
+    def testLimits(self):
+        # test that a search gives up once it has expanded too many nodes, or runs out of time
+        for method in searchMethods:
+            self.assertRaises(SearchLimitReached, findPath, self.G, 'a0', 'a20', method=method, maxNodes=5)
+            self.assertRaises(SearchLimitReached, findPath, self.G, 'a0', 'a20', method=method, timeout=0)
+            self.assertEqual(len(findPath(self.G, 'a0', 'a20', method=method, maxNodes=1000)[1]), 11)
+
+class TestingFindPaths(LadderTestCase):
+    def testBatch(self):
+        # test that a batch of queries gives the same paths as querying one at a time, with a marker for the ones without a path
+        queries = [('a0', 'a12'), ('a3', 'a3'), ('a5', 'a2'), ('a0', 'b4_3'), ('a5', 'c'), ('a0', 'a20'), ('a3', 'a9')]
+        expected = [findPath(self.G, 'a0', 'a12'), ([], []), None, findPath(self.G, 'a0', 'b4_3'), None, 
+                    findPath(self.G, 'a0', 'a20'), findPath(self.G, 'a3', 'a9')]
+        self.assertEqual(findPaths(self.G, queries), expected)
+        self.assertEqual(findPaths(self.G, queries, numWorkers=2), expected)
+        self.assertEqual(findPaths(self.G, queries, maxNodes=3), [None, ([], []), None, None, None, None, None])
+
+class TestingFindProof(unittest.TestCase):
+    def setUp(self):
+        self.G = nx.DiGraph()
+        self.G.add_edge('p', 'q → j → k', objectName='a', importPath='import1')
+        self.G.add_edge('p ∧ q', 'r', objectName='b', importPath='import2')
+        self.G.add_edge('r', 's', objectName='c', importPath='import3')
+        self.G.add_edge('k', 's', objectName='d', importPath='import4')
+        self.G.add_edge('m', 'p ∧ n', objectName='e', importPath='import5')
+
+    def testHypotheses(self):
+        # test that a goal is derived from several hypotheses together, with the steps in the order they are applied
+        self.assertEqual(findProof(self.G, ['p', 'q'], 's'), (['import2', 'import3'], [
+            ProofStep('p ∧ q', 'and.intro', ('p', 'q')),
+            ProofStep('r', 'theorem', ('p ∧ q',), 'b', 'import2'),
+            ProofStep('s', 'theorem', ('r',), 'c', 'import3')]))
+        # the arguments of a theorem are applied one at a time, and a conjunction is split into its sides
+        self.assertEqual(findProof(self.G, ['p', 'q ∧ j'], 'k'), (['import1'], [
+            ProofStep('q → j → k', 'theorem', ('p',), 'a', 'import1'),
+            ProofStep('q', 'and.left', ('q ∧ j',)),
+            ProofStep('j → k', 'apply', ('q → j → k', 'q')),
+            ProofStep('j', 'and.right', ('q ∧ j',)),
+            ProofStep('k', 'apply', ('j → k', 'j'))]))
+        # conjunctions in the goal can be introduced even if they aren't in G
+        self.assertEqual(findProof(self.G, ['m', '(q)'], 'q ∧ n')[1][-1], ProofStep('q ∧ n', 'and.intro', ('q', 'n')))
+        self.assertEqual(findProof(self.G, ['p', 'q'], 'p'), ([], []))
+
+    def testNoProof(self):
+        # test that goals that can't be derived from the hypotheses are rejected, and the limits are applied
+        conjunctionIndex = ConjunctionIndex(self.G)
+        self.assertRaises(nx.NetworkXNoPath, findProof, self.G, ['p'], 's', conjunctionIndex=conjunctionIndex)
+        self.assertRaises(nx.NetworkXNoPath, findProof, self.G, ['q', 'j'], 'k', conjunctionIndex=conjunctionIndex)
+        self.assertRaises(SearchLimitReached, findProof, self.G, ['p', 'q'], 's', maxNodes=2, conjunctionIndex=conjunctionIndex)
+
 # the program begins below
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
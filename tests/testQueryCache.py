@@ -0,0 +1,92 @@
+import networkx as nx
+import os
+import sys
+import tempfile
+import time
+import unittest
+sys.path.append('../TheoremMap')
+from compactGraph import CompactGraph, writeCompactGraph
+from prover import SearchLimitReached
+from queryCache import graphFingerprint, QueryCache
+
+
+class TestingQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.G = nx.DiGraph()
+        self.G.add_edge('p', 'q', objectName='a', importPath='import1')
+        self.G.add_edge('q', 'r → s', objectName='b', importPath='import2')
+
+    def testHitsAndMisses(self):
+        # test that repeated queries (including ones without a path) are answered from the cache
+        cache = QueryCache()
+        self.assertEqual(cache.findPath(self.G, 'p', 'r → s'), (['import1', 'import2'], ['a', 'b']))
+        self.assertEqual(cache.findPath(self.G, ' p', 'r ->  s'), (['import1', 'import2'], ['a', 'b']))
+        self.assertRaises(nx.NetworkXNoPath, cache.findPath, self.G, 'q', 'p')
+        self.assertRaises(nx.NetworkXNoPath, cache.findPath, self.G, 'q', 'p')
+        self.assertRaises(nx.NodeNotFound, cache.findPath, self.G, 'p', 't')
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 3)
+        # types are looked up by the key of their node, so redundant parentheses don't make a new entry
+        self.assertEqual(cache.findPath(self.G, '(p)', '(r → (s))'), (['import1', 'import2'], ['a', 'b']))
+        self.assertEqual(cache.stats()['hits'], 3)
+
+    def testSearchOptions(self):
+        # test that results found with different search options are cached separately
+        cache = QueryCache()
+        self.assertEqual(cache.findPath(self.G, 'p', 'r → s'), (['import1', 'import2'], ['a', 'b']))
+        self.assertRaises(SearchLimitReached, cache.findPath, self.G, 'p', 'r → s', maxNodes=1)
+        self.assertEqual(cache.findPath(self.G, 'p', 'r → s', method='astar', heuristicWeight=2.0), (['import1', 'import2'], ['a', 'b']))
+        self.assertEqual(cache.findPath(self.G, 'p', 'r → s', method='astar'), (['import1', 'import2'], ['a', 'b']))
+        self.assertEqual(cache.stats()['hits'], 0)
+        self.assertEqual(len(cache), 3)
+
+    def testEviction(self):
+        # test that the least recently used result is evicted, and that results expire
+        cache = QueryCache(maxSize=2)
+        cache.findPath(self.G, 'p', 'q')
+        cache.findPath(self.G, 'q', 'r → s')
+        cache.findPath(self.G, 'p', 'q')
+        cache.findPath(self.G, 'p', 'r → s')
+        self.assertEqual([key[:2] for key in cache.results], [('p', 'q'), ('p', 'r → s')])
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache.ttl = 0.01
+        time.sleep(0.02)
+        cache.findPath(self.G, 'p', 'q')
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def testInvalidation(self):
+        # test that changing the graph invalidates the cache
+        cache = QueryCache()
+        self.assertRaises(nx.NetworkXNoPath, cache.findPath, self.G, 'q', 'p')
+        self.G.add_edge('q', 'p', objectName='c', importPath='import3')
+        self.assertEqual(cache.findPath(self.G, 'q', 'p'), (['import3'], ['c']))
+        self.assertEqual(cache.stats()['invalidations'], 1)
+        # moving an edge keeps the number of nodes and edges the same, but still changes the fingerprint
+        fingerprint = graphFingerprint(self.G)
+        self.G.remove_edge('q', 'p')
+        self.G.add_edge('p', 'r → s', objectName='c', importPath='import3')
+        self.assertNotEqual(graphFingerprint(self.G), fingerprint)
+        self.assertRaises(nx.NetworkXNoPath, cache.findPath, self.G, 'q', 'p')
+        self.assertEqual(cache.stats()['invalidations'], 2)
+        self.G.remove_edge('p', 'r → s')
+        self.G.add_edge('q', 'p', objectName='c', importPath='import3')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'derivationGraph.compact')
+            writeCompactGraph(self.G, path)
+            with CompactGraph(path) as compactG:
+                self.assertEqual(cache.findPath(compactG, 'q', 'p'), (['import3'], ['c']))
+                self.assertEqual(graphFingerprint(compactG), graphFingerprint(CompactGraph(path)))
+            self.assertEqual(cache.stats()['invalidations'], 3)
+            # the fingerprint is read from the header, and changes with the contents of the graph
+            self.G.add_edge('r → s', 'p', objectName='d', importPath='import4')
+            with CompactGraph(path) as compactG:
+                fingerprint = graphFingerprint(compactG)
+            writeCompactGraph(self.G, path)
+            with CompactGraph(path) as compactG:
+                self.assertNotEqual(graphFingerprint(compactG), fingerprint)
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import networkx as nx
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from compactGraph import CompactGraph, writeCompactGraph
+from prover import findPath, searchMethods
+from reachabilityIndex import ReachabilityIndex
+
+
+class TestingReachabilityIndex(unittest.TestCase):
+    def setUp(self):
+        # a random graph with a few cycles, so that some components have more than one node
+        rng = random.Random(0)
+        self.G = nx.DiGraph()
+        self.G.add_nodes_from(f'n{i}' for i in range(60))
+        for i in range(90):
+            self.G.add_edge(f'n{rng.randrange(60)}', f'n{rng.randrange(60)}', objectName=f't{i}', importPath='import1')
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testReaches(self):
+        # test that the index agrees with networkx for every pair of nodes
+        index = ReachabilityIndex(self.G)
+        self.assertLess(index.numComponents, 60)
+        for source in self.G.nodes():
+            for target in self.G.nodes():
+                self.assertEqual(index.reaches(source, target), nx.has_path(self.G, source, target))
+        self.assertRaises(nx.NodeNotFound, index.reaches, 'n0', 'm')
+
+    def testSaveLoad(self):
+        # test that an index saved for a compact graph is loaded back, and rejected for a different graph
+        path = os.path.join(self.directory.name, 'derivationGraph.compact')
+        writeCompactGraph(self.G, path)
+        with CompactGraph(path) as compactG:
+            ReachabilityIndex(compactG).save(path + '.reach')
+            index = ReachabilityIndex.load(path + '.reach', compactG)
+            for source in ['n0', 'n1', 'n2', 'n3']:
+                for target in self.G.nodes():
+                    self.assertEqual(index.reaches(source, target), nx.has_path(self.G, source, target))
+        self.assertIsNone(ReachabilityIndex.load(path + '.reach', nx.DiGraph()))
+        # a graph with the same number of nodes and edges but a different edge is also rejected
+        self.G.remove_edge(*next(iter(self.G.edges())))
+        self.G.add_edge('n0', 'n1', objectName='t', importPath='import1')
+        writeCompactGraph(self.G, path)
+        with CompactGraph(path) as compactG:
+            self.assertIsNone(ReachabilityIndex.load(path + '.reach', compactG))
+
+    def testFindPath(self):
+        # test that the prover finds the same paths with the index, and rejects the pairs without a path
+        index = ReachabilityIndex(self.G)
+        for method in searchMethods:
+            for source in ['n0', 'n1', 'n2', 'n3']:
+                for target in self.G.nodes():
+                    if nx.has_path(self.G, source, target):
+                        self.assertEqual(len(findPath(self.G, source, target, method=method, reachabilityIndex=index)[1]),
+                                         nx.shortest_path_length(self.G, source, target))
+                    else:
+                        # the pair is rejected before any node is expanded, so the node limit isn't reached
+                        with self.assertRaises(nx.NetworkXNoPath) as context:
+                            findPath(self.G, source, target, method=method, reachabilityIndex=index, maxNodes=0)
+                        self.assertIs(type(context.exception), nx.NetworkXNoPath)
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
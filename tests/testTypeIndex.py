@@ -0,0 +1,75 @@
+import networkx as nx
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append('../TheoremMap')
+from compactGraph import CompactGraph, writeCompactGraph
+from prover import findPath
+from typeIndex import TypeIndex
+
+
+class TestingTypeIndex(unittest.TestCase):
+    def setUp(self):
+        self.G = nx.DiGraph()
+        self.G.add_edge('n ≤ Nat.succ n', 'n < Nat.succ n + 1', objectName='a', importPath='import1')
+        self.G.add_edge('p ∧ q', 'q ∧ p', objectName='b', importPath='import2')
+        self.G.add_edge('p ∧ q', 'f (x + y) = f x + f y', objectName='c', importPath='import3')
+        self.G.add_node('Nat.succ n ≠ 0')
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testResolve(self):
+        # test that types written differently from the node are mapped to it, and that other types aren't
+        index = TypeIndex(self.G)
+        self.assertEqual(index.resolve('(p) ∧ q'), 'p ∧ q')
+        self.assertEqual(index.resolve('f (x+y) = (f x) + f y'), 'f (x + y) = f x + f y')
+        self.assertIsNone(index.resolve('q ∧ q'))
+
+    def testNodesMentioning(self):
+        # test that nodes are found by their constants, operators, and subterms
+        index = TypeIndex(self.G)
+        self.assertEqual(sorted(index.nodesMentioning(['Nat.succ', '≤'])), ['n ≤ Nat.succ n'])
+        self.assertEqual(sorted(index.nodesMentioning(['Nat.succ'])), ['Nat.succ n ≠ 0', 'n < Nat.succ n + 1', 'n ≤ Nat.succ n'])
+        self.assertEqual(index.nodesMentioning(['x + y']), ['f (x + y) = f x + f y'])
+        self.assertEqual(index.nodesMentioning(['Nat.pred']), [])
+
+    def testClosestNodes(self):
+        # test that the node with the same type ranks first with a score of 1, followed by the most similar types
+        index = TypeIndex(self.G)
+        closest = index.closestNodes('(q) ∧ p')
+        self.assertEqual(closest[0], ('q ∧ p', 1.0))
+        self.assertEqual(closest[1][0], 'p ∧ q')
+        self.assertEqual(index.closestNodes('n ≤ Nat.succ m', limit=1)[0][0], 'n ≤ Nat.succ n')
+        self.assertEqual(index.closestNodes('Real.pi'), [])
+
+    def testSaveLoad(self):
+        # test that an index saved for a compact graph is loaded back, and rejected for a different graph
+        path = os.path.join(self.directory.name, 'derivationGraph.compact')
+        writeCompactGraph(self.G, path)
+        with CompactGraph(path) as compactG:
+            TypeIndex(compactG).save(path + '.types')
+            index = TypeIndex.load(path + '.types', compactG)
+            self.assertEqual(index.resolve('(p) ∧ q'), 'p ∧ q')
+            self.assertEqual(index.closestNodes('(q) ∧ p', limit=1), [('q ∧ p', 1.0)])
+        self.assertIsNone(TypeIndex.load(path + '.types', nx.DiGraph()))
+        # a graph with the same number of nodes and edges but a different node is also rejected
+        self.G.remove_node('Nat.succ n ≠ 0')
+        self.G.add_node('Nat.succ n ≠ 1')
+        writeCompactGraph(self.G, path)
+        with CompactGraph(path) as compactG:
+            self.assertIsNone(TypeIndex.load(path + '.types', compactG))
+
+    def testFindPath(self):
+        # test that the prover finds the nodes of types that aren't written exactly as they are in G
+        index = TypeIndex(self.G)
+        self.assertEqual(findPath(self.G, '(p ∧ q)', 'q  ∧  p', typeIndex=index), (['import2'], ['b']))
+        with self.assertRaises(nx.NodeNotFound) as context:
+            findPath(self.G, 'p ∧ r', 'q ∧ p', typeIndex=index)
+        self.assertIn("'p ∧ q'", str(context.exception))
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
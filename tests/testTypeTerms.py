@@ -0,0 +1,110 @@
+import json
+import shutil
+import sys
+import unittest
+sys.path.append('../TheoremMap')
+from leanInterface import runLeanCommands
+from typeTerms import canonicalizeNotation, makeTypeUnaryMinusExplicit, removeRedundantTypeParentheses, splitTypeTerms, TypeTable
+
+
+class TestingSplitTypeTerms(unittest.TestCase):
+    def testSimple(self):
+        # test splitting at the top level only
+        self.assertEqual(splitTypeTerms('p → q → p ∧ q', '→'), ('p ', ' q ', ' p ∧ q'))
+        self.assertEqual(splitTypeTerms('(p → q) → {r : Prop} → [inst : C (r → q)] → r', '→'), 
+                         ('(p → q) ', ' {r : Prop} ', ' [inst : C (r → q)] ', ' r'))
+        self.assertEqual(splitTypeTerms('p', '→'), ('p',))
+        self.assertEqual(splitTypeTerms('', '→'), ())
+
+    def testEdgeCases(self):
+        # test the edge cases of the original character by character splitter
+        self.assertEqual(splitTypeTerms('p →', '→'), ('p ',)) # no empty term after a trailing delimiter
+        self.assertEqual(splitTypeTerms('→→→', '→→'), ('', '')) # overlapping delimiters
+        self.assertEqual(splitTypeTerms('→ p', ' →'), ('', ' p')) # delimiter starting with a space at the start
+        self.assertEqual(splitTypeTerms('p → q', ''), ('p → q',))
+        self.assertEqual(splitTypeTerms('a b  (c d)', ' '), ('a', 'b', '', '(c d)'))
+
+class TestingTypeTable(unittest.TestCase):
+    def testInterning(self):
+        # test that types differing only in spacing, parentheses, or ascii connectives become the same term
+        typeTable = TypeTable()
+        term = typeTable.parse('p → q ∧ r')
+        self.assertIs(typeTable.parse('(p→  (q ∧ r))'), term)
+        self.assertIs(typeTable.parse('p -> q /\\ r'), term)
+        self.assertIs(typeTable.parse('q ∧ r'), term.children[1]) # subterms are shared
+        self.assertEqual(typeTable.display[term.id], 'p → q ∧ r')
+        self.assertEqual(len(typeTable), 5)
+
+    def testStructure(self):
+        # test precedence, associativity, binders, and the canonical text of the parsed terms
+        typeTable = TypeTable()
+        self.assertEqual(typeTable.parse('(p → q) → r').children[0].key, 'p → q')
+        self.assertEqual(typeTable.parse('p ∨ (q ∧ r)').key, 'p ∨ q ∧ r')
+        self.assertEqual(typeTable.parse('(p ∨ q) ∧ r').key, '(p ∨ q) ∧ r')
+        self.assertEqual(typeTable.parse('p → ∀ x, q x → r').children[1].key, '∀ x, q x → r')
+        self.assertEqual(typeTable.parse('(∀ x, q x) → r').key, '(∀ x, q x) → r')
+        self.assertIsNone(typeTable.parse('∀ x, q x → r').op)
+        self.assertIsNone(typeTable.parse('(a, b)').op)
+        arguments, output = typeTable.arrowSpine(typeTable.parse('p → q → r'))
+        self.assertEqual(([argument.key for argument in arguments], output.key), (['p', 'q'], 'r'))
+
+    def testBinderOperands(self):
+        # test that operands with a binder in them are parenthesized when other operands follow, and that every key
+        # parses back to the same term
+        typeTable = TypeTable()
+        self.assertEqual(typeTable.parse('(Monotone fun x => f x) → Antitone g').key, '(Monotone fun x => f x) → Antitone g')
+        self.assertNotEqual(typeTable.parse('(Monotone fun x => f x) → Antitone g').key, typeTable.parse('Monotone fun x => f x → Antitone g').key)
+        self.assertEqual(typeTable.parse('(p ∧ ∃ x, q x) → r').key, '(p ∧ ∃ x, q x) → r')
+        for text in ['(Monotone fun x => f x) → Antitone g', '(p ∧ ∃ x, q x) → r', '(p → ∀ x, q x) ∧ r', 'p ∧ (f fun x => x) ∨ q',
+                     '(∀ x, q x) → r', 'p → ∀ x, q x → r', '(a ∈ s ∧ ∃ y, b y) ↔ (c ∨ fun z => z) ∧ d', '(∃! x, p x) ∧ (q λ y => y)']:
+            key = typeTable.parse(text).key
+            self.assertEqual(typeTable.parse(key).key, key)
+            self.assertIs(typeTable.parse(key), typeTable.parse(text))
+
+    def testCanonicalAtoms(self):
+        # test that redundant parentheses inside of atoms are removed, without merging types that lean reads differently
+        typeTable = TypeTable()
+        self.assertIs(typeTable.parse('f (x) → (a + b) + c'), typeTable.parse('f x → a + b + c'))
+        self.assertIsNot(typeTable.parse('f (x + y)'), typeTable.parse('f x + y'))
+
+class TestingRemoveRedundantTypeParentheses(unittest.TestCase):
+    # below are expressions and the results remove_redundant_parentheses gives for them in LeanBackend.lean
+    expected = [('(a + b) * c', '(a + b) * c'), ('a + (b * c)', 'a + b * c'), ('((p))', 'p'), ('¬(a = b)', '¬ (a = b)'),
+                ('a  b', 'a b'), ('(a >= b)', 'a > = b'), ('- (-b)', '-(- b)'), ('f (x + y)', 'f x + y'), ('(a', ''), ('a) + (b', 'a ) +')]
+
+    def testExpected(self):
+        # test the results against ones worked out from the lean implementation, including its quirks
+        for expression, result in self.expected:
+            self.assertEqual(removeRedundantTypeParentheses(expression), result)
+        self.assertEqual(makeTypeUnaryMinusExplicit('-a + (- b) * c'), 'unary_minus a + ( - b ) * c')
+        self.assertEqual(makeTypeUnaryMinusExplicit('a - b +'), 'a unary_minus b +')
+
+    def testAgainstLean(self):
+        # test that the results are the same as lean's on the expressions above and a few more
+        if shutil.which('lake') is None:
+            self.skipTest('lake is not installed')
+        expressions = [expression for expression, _ in self.expected] + ['a - (b - c)', '(a ∧ b) ∨ (c → d)', 'x ^ (- y)', '(p ↔ q) ∧ r',
+                                                                          '((a * b) / (c % d))', 'Iff (a) (b)', '(unary_minus a)']
+        outputs = runLeanCommands([f'#eval remove_redundant_parentheses {json.dumps(expression, ensure_ascii=False)}' 
+                                   for expression in expressions])
+        self.assertEqual([removeRedundantTypeParentheses(expression) for expression in expressions], 
+                         [json.loads(output.strip()) for output in outputs])
+
+class TestingCanonicalizeNotation(unittest.TestCase):
+    def testRedundant(self):
+        # test that the parentheses lean doesn't need are removed
+        self.assertEqual(canonicalizeNotation('a + (b * c)'), 'a + b * c')
+        self.assertEqual(canonicalizeNotation('(f x) (y)'), 'f x y')
+        self.assertEqual(canonicalizeNotation('¬(a = b)'), '¬a = b')
+        self.assertEqual(canonicalizeNotation('(a >= b)'), 'a ≥ b')
+        self.assertEqual(canonicalizeNotation('a ^ (b ^ c)'), 'a ^ b ^ c')
+
+    def testNeeded(self):
+        # test that the parentheses lean needs are kept, and unknown notation is left alone
+        for text in ['f (x + y)', '(a + b) * c', '(¬a) = b', '(-a) ^ b', 'a + (b + c)', '(a = b) = c', 'f (-x)',
+                     'x ∈ (s ∪ t)', '(a).1', 'a[(i)]', '(fun x => x) y', 'List (Nat × Nat)']:
+            self.assertEqual(canonicalizeNotation(text), text)
+
+# the program begins below
+if __name__ == '__main__':
+    unittest.main()
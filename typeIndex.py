@@ -0,0 +1,223 @@
+# this file implements an inverted index of the node types of the derivation graph, used to find nodes by what they mention
+# findPath needs the exact text of a node, so a query that is off by a space or a parenthesis isn't found, and finding the
+# nodes that mention a constant (eg. 'Nat.succ') would otherwise take a scan over every node
+# the index is built as follows:
+#   1. the features of each node type are found: its constants, its operators, and its normalized subterms
+#      (the terms of its connectives, and the operator and application terms inside each atom, see canonicalizeNotation)
+#   2. each feature is mapped to the sorted list of the ids of the nodes that have it (its postings)
+#   3. features are weighted by how rare they are (idf), and a query is ranked against the nodes that share its rarest
+#      features by the weighted overlap of their features, so only a small part of the index is read for each query
+import bisect
+import heapq
+import math
+import re
+import struct
+from array import array
+from compactGraph import CompactGraph, encodeStrings, graphFingerprint, hashSize
+from pipelineMetrics import metrics
+from typeTerms import asciiOperators, normalizeTypeText, parseNotation, renderNotation, TypeTable
+
+
+# below is the magic string at the start of every type index file
+magic = b'TMTYPEINDEX00002'
+
+# below is the pattern matching the constants and operators of a type, brackets and separators aren't features
+featureTokenPattern = re.compile(r'[^\W\d][\w.\'!?]*|\d+|<->|->|>=|<=|[^\s\w()\[\]{},:]')
+
+# this function returns the constants ('c:'), operators ('o:'), subterms ('s:'), and the whole normalized type ('t:')
+# of a type as features of the index, queries are broken into features the same way
+def typeIndexFeatures (text : str, typeTable : TypeTable) -> set[str]:
+    text = normalizeTypeText(text)
+    features = set()
+    for token in featureTokenPattern.findall(text):
+        token = asciiOperators.get(token, token)
+        features.add(('c:' if token[0].isalnum() or token[0] == '_' else 'o:') + token)
+    term = typeTable.parse(text)
+    features.add('t:' + term.key)
+    stack = [term]
+    while len(stack) > 0:
+        term = stack.pop()
+        features.add('s:' + term.key)
+        if term.op is not None:
+            stack.extend(term.children)
+            continue
+        # the subterms inside of an atom are found by parsing its notation, if it is notation the parser knows
+        tree = parseNotation(term.key)
+        trees = [tree] if tree is not None else []
+        while len(trees) > 0:
+            tree = trees.pop()
+            if tree[0] == 'name':
+                continue
+            features.add('s:' + renderNotation(tree))
+            trees.extend(tree[2:] if tree[0] != 'app' else tree[1:])
+    return features
+
+# below is a class that stores the type index of a derivation graph
+# like the reachability index, nodes are referred to by id, which are the node ids of a compact graph or positions in
+# G.nodes() for a networkx graph
+# if the nodes of G were merged (see mergeEquivalentNodes), the map from each merged node to the node it was merged into
+# can be passed, so that types written like a merged node resolve to the node it was merged into
+class TypeIndex:
+    @metrics.timed('typeIndex.build')
+    def __init__(self, G, mergedNodes : dict[str, str] = None):
+        self.G = G
+        self.typeTable = TypeTable()
+        self.setMergedNodes(mergedNodes)
+        nodes = [G.nodeText(nodeId) for nodeId in range(G.number_of_nodes())] if isinstance(G, CompactGraph) else list(G.nodes())
+        self.nodes = None if isinstance(G, CompactGraph) else nodes
+        self.numNodes = G.number_of_nodes()
+        self.numEdges = G.number_of_edges()
+        self.fingerprint = graphFingerprint(G)
+        postings = {}
+        for nodeId, node in enumerate(nodes):
+            for feature in typeIndexFeatures(node, self.typeTable):
+                postings.setdefault(feature, array('q')).append(nodeId)
+        self.features = {feature: featureId for featureId, feature in enumerate(postings)}
+        self.pointers = array('q', [0])
+        self.postings = array('q')
+        for nodeIds in postings.values():
+            self.postings.extend(nodeIds)
+            self.pointers.append(len(self.postings))
+        self.computeWeights()
+
+    # this function finds the weight of each feature, and the total weight of the features of each node
+    def computeWeights(self):
+        self.nodeWeights = array('d', [0.0]) * self.numNodes
+        for featureId in range(len(self.features)):
+            weight = self.featureWeight(featureId)
+            for nodeId in self.featurePostings(featureId):
+                self.nodeWeights[nodeId] += weight
+
+    # this function returns the weight of a feature, rarer features weigh more
+    def featureWeight(self, featureId : int | None) -> float:
+        count = self.pointers[featureId + 1] - self.pointers[featureId] if featureId is not None else 0
+        return math.log(1 + self.numNodes / max(count, 1))
+
+    # this function returns the sorted ids of the nodes that have a feature
+    def featurePostings(self, featureId : int) -> array:
+        return self.postings[self.pointers[featureId]:self.pointers[featureId+1]]
+
+    def nodeText(self, nodeId : int) -> str:
+        return self.G.nodeText(nodeId) if self.nodes is None else self.nodes[nodeId]
+
+    # this function maps each merged node, both as it is written and by its normalized type, to the node it was merged into
+    def setMergedNodes(self, mergedNodes : dict[str, str] | None):
+        self.mergedNodes = {}
+        for node, representative in (mergedNodes or {}).items():
+            self.mergedNodes[node] = representative
+            self.mergedNodes.setdefault(self.typeTable.parse(node).key, representative)
+
+    # this function returns the node with the same normalized type as the passed type (eg. 'p → (q)' for 'p → q'),
+    # or the node it was merged into if it is the type of a merged node, or None if there isn't one
+    def resolve(self, text : str) -> str | None:
+        if text in self.G:
+            return text
+        if text in self.mergedNodes:
+            return self.mergedNodes[text]
+        key = self.typeTable.parse(text).key
+        featureId = self.features.get('t:' + key, None)
+        return self.mergedNodes.get(key, None) if featureId is None else self.nodeText(self.featurePostings(featureId)[0])
+
+    # this function returns the nodes whose types mention all of the passed constants, operators, or subterms
+    # (eg. ['Nat.succ', '≤']), in the order of their ids
+    def nodesMentioning(self, terms : list[str]) -> list[str]:
+        featureIds = []
+        for term in terms:
+            term = asciiOperators.get(term.strip(), term.strip())
+            if featureTokenPattern.fullmatch(term) is not None:
+                feature = ('c:' if term[0].isalnum() or term[0] == '_' else 'o:') + term
+            else:
+                feature = 's:' + self.typeTable.parse(term).key
+            if not feature in self.features:
+                return []
+            featureIds.append(self.features[feature])
+        if len(featureIds) == 0:
+            return []
+        # the shortest postings are read in full, and the others are only searched for the nodes left
+        featureIds.sort(key=lambda featureId: self.pointers[featureId + 1] - self.pointers[featureId])
+        nodeIds = self.featurePostings(featureIds[0])
+        for featureId in featureIds[1:]:
+            nodeIds = [nodeId for nodeId in nodeIds if self.hasFeature(featureId, nodeId)]
+        return [self.nodeText(nodeId) for nodeId in nodeIds]
+
+    # this function checks if a node has a feature, using a binary search of its postings
+    def hasFeature(self, featureId : int, nodeId : int) -> bool:
+        start, end = self.pointers[featureId], self.pointers[featureId+1]
+        position = bisect.bisect_left(self.postings, nodeId, start, end)
+        return position < end and self.postings[position] == nodeId
+
+    # this function ranks the nodes by how similar their types are to the passed type, returning up to limit
+    # (node, score) pairs, where the score is the weighted share of features the two types have in common
+    # (1.0 for a node with the same normalized type)
+    # the candidates are the nodes that have one of the rarest features of the type, where a feature is rare if it is had
+    # by at most maxCandidates nodes, so features common to most nodes (eg. '→') only add to the scores of the candidates
+    @metrics.timed('typeIndex.search')
+    def closestNodes(self, text : str, limit : int = 10, maxCandidates : int = 4096) -> list[tuple[str, float]]:
+        featureIds = [self.features.get(feature, None) for feature in typeIndexFeatures(text, self.typeTable)]
+        queryWeight = sum(self.featureWeight(featureId) for featureId in featureIds)
+        featureIds = sorted((featureId for featureId in featureIds if featureId is not None),
+                            key=lambda featureId: self.pointers[featureId + 1] - self.pointers[featureId])
+        if len(featureIds) == 0:
+            return []
+        # read the postings of the rare features (or of the rarest feature, if none are rare) into the shared weights
+        sharedWeights = {}
+        numRead = 0
+        while numRead < len(featureIds) and (numRead == 0 or len(self.featurePostings(featureIds[numRead])) <= maxCandidates):
+            weight = self.featureWeight(featureIds[numRead])
+            for nodeId in self.featurePostings(featureIds[numRead]):
+                sharedWeights[nodeId] = sharedWeights.get(nodeId, 0.0) + weight
+            numRead += 1
+        # the common features are checked for each candidate, by a binary search of their postings, unless there are
+        # so many candidates that reading the postings is quicker
+        for featureId in featureIds[numRead:]:
+            weight = self.featureWeight(featureId)
+            if self.pointers[featureId + 1] - self.pointers[featureId] < 16 * len(sharedWeights):
+                for nodeId in self.featurePostings(featureId):
+                    if nodeId in sharedWeights:
+                        sharedWeights[nodeId] += weight
+            else:
+                for nodeId in sharedWeights:
+                    if self.hasFeature(featureId, nodeId):
+                        sharedWeights[nodeId] += weight
+        scores = heapq.nsmallest(limit, ((-shared / (queryWeight + self.nodeWeights[nodeId] - shared), nodeId) 
+                                         for nodeId, shared in sharedWeights.items()))
+        return [(self.nodeText(nodeId), -score) for score, nodeId in scores]
+
+    # this function writes the index to a file, so it doesn't have to be rebuilt each time the graph is loaded
+    def save(self, path : str):
+        featureOffsets, featureText = encodeStrings(list(self.features))
+        with open(path, 'wb') as file:
+            file.write(magic + bytes.fromhex(self.fingerprint) + struct.pack('<5q', self.numNodes, self.numEdges, len(self.features), len(self.postings), len(featureText)))
+            for values in [featureOffsets, self.pointers, self.postings]:
+                values.tofile(file)
+            file.write(featureText)
+
+    # this function reads an index written by save for the passed graph, or returns None if it was written for a different graph
+    # (one with a different fingerprint) or by an older version
+    # the map of merged nodes isn't saved, so it is passed again
+    @staticmethod
+    def load(path : str, G, mergedNodes : dict[str, str] = None) -> 'TypeIndex | None':
+        index = TypeIndex.__new__(TypeIndex)
+        index.G = G
+        index.typeTable = TypeTable()
+        index.setMergedNodes(mergedNodes)
+        index.nodes = None if isinstance(G, CompactGraph) else list(G.nodes())
+        with open(path, 'rb') as file:
+            fileMagic = file.read(len(magic))
+            if fileMagic[:-4] != magic[:-4]:
+                raise ValueError(f'{path} is not a type index file')
+            if fileMagic != magic:
+                return None
+            index.fingerprint = file.read(hashSize).hex()
+            if index.fingerprint != graphFingerprint(G):
+                return None
+            index.numNodes, index.numEdges, numFeatures, numPostings, textLength = struct.unpack('<5q', file.read(40))
+            featureOffsets, index.pointers, index.postings = [array('q') for _ in range(3)]
+            featureOffsets.fromfile(file, numFeatures + 1)
+            index.pointers.fromfile(file, numFeatures + 1)
+            index.postings.fromfile(file, numPostings)
+            featureText = file.read(textLength)
+        index.features = {featureText[featureOffsets[featureId]:featureOffsets[featureId+1]].decode('utf-8'): featureId
+                          for featureId in range(numFeatures)}
+        index.computeWeights()
+        return index
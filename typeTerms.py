@@ -0,0 +1,510 @@
+# this file contains tools for working with lean types stored as strings in python
+# these are used when building the derivation graph, where every object type has to be split into its terms
+import functools
+import re
+import sys
+
+
+# ---------- term splitting ----------
+
+# below is a function that checks if two occurrences of a delimiter can overlap (eg. '→→' in '→→→')
+@functools.lru_cache(maxsize=None)
+def canOverlap (delim : str) -> bool:
+    return any(delim[k:] == delim[:-k] for k in range(1, len(delim)))
+
+# below is a function that builds (and caches) the pattern used to find the brackets and delimiters in an expression
+# delimiters that can overlap are matched with a lookahead so that every occurrence is found
+@functools.lru_cache(maxsize=None)
+def splitPattern (delim : str) -> re.Pattern:
+    if canOverlap(delim):
+        return re.compile(r'(?P<open>[(\[{])|(?P<close>[)\]}])|(?=' + re.escape(delim) + ')')
+    return re.compile(r'(?P<open>[(\[{])|(?P<close>[)\]}])|' + re.escape(delim))
+
+# below is a pattern matching any bracket
+bracketPattern = re.compile(r'[()\[\]{}]')
+
+# below is a function that splits an expression by a delimiter, keeping all terms contained within brackets intact
+# the brackets and delimiters are found in a single pass, and the terms are returned as slices of the expression
+# results are cached, since the same types come up again and again across the object list
+# (this matches the original character by character implementation for delimiters that don't contain brackets)
+@functools.lru_cache(maxsize=2**18)
+def splitTypeTerms (expression : str, delim : str) -> tuple[str, ...]:
+    if len(expression) == 0:
+        return ()
+    if len(delim) == 0:
+        return (expression,)
+    # for the usual delimiters, split on every occurrence and then glue back together the pieces that were split inside brackets
+    # (the depth at each occurrence is the bracket balance of all pieces before it)
+    if not delim.startswith(' ') and not canOverlap(delim):
+        pieces = expression.split(delim)
+        if bracketPattern.search(expression) is None:
+            split = pieces
+        else:
+            split = []
+            depth = 0
+            for piece in pieces:
+                if depth == 0:
+                    split.append(piece)
+                else:
+                    split[-1] += delim + piece
+                depth += (piece.count('(') + piece.count('[') + piece.count('{') 
+                          - piece.count(')') - piece.count(']') - piece.count('}'))
+        return tuple(split[:-1] if split[-1] == '' else split)
+    # the original implementation compared the delimiter against a window that started out filled with spaces,
+    # so a delimiter starting with spaces can match before the start of the expression
+    padding = ' ' * (len(delim) - 1)
+    padded = padding + expression if len(padding) > 0 and delim.startswith(' ') else expression
+    offset = len(padded) - len(expression)
+
+    depth = 0 # number of open brackets minus the number of closed brackets
+    split = []
+    termStart = 0 # start of the current term in the expression
+    for match in splitPattern(delim).finditer(padded):
+        if match.lastgroup == 'open':
+            depth += 1
+        elif match.lastgroup == 'close':
+            depth -= 1
+        elif depth == 0:
+            # a delimiter overlapping the previous one (or the padding) ends an empty term
+            delimStart = match.start() - offset
+            split.append(expression[termStart:max(delimStart, termStart)])
+            termStart = delimStart + len(delim)
+    # the last term is only added if the expression doesn't end with the delimiter
+    if termStart < len(expression):
+        split.append(expression[termStart:])
+    return tuple(split)
+
+
+# ---------- redundant parentheses ----------
+# below are python versions of make_unary_minus_explicit and remove_redundant_parentheses from LeanBackend.lean, which give
+# the same results without starting lean
+# lean pads every operator and parenthesis with spaces (one pass over the text per operator), splits the text by spaces
+# one character at a time, and joins the terms back together with single spaces, so here the text is split into those
+# same tokens in a single pass instead
+
+# below are the operators and their ranks, copied from operators and operator_precedence in LeanBackend.lean
+leanOperators = ['↔', '<->', '→', '->', '∨', '∧', '=', '≠', '>', '<', '≥', '>=', '≤', '<=', '+', '-', '*', '/', '%', 'unary_minus', '¬', '^']
+leanOperatorPrecedence = {1: ['↔', '<->', 'Iff', ':'], 2: ['→', '->'], 3: ['∨', 'Or'], 4: ['∧', 'And'], 5: ['=', 'Eq', '≠', 'Ne'],
+                          6: ['>', '<', '≥', '>=', '≤', '<='], 7: ['+', '-'], 8: ['*', '/', '%', '×'], 9: ['unary_minus', '¬', 'Not'],
+                          10: ['^'], 11: ['∀', '∃']}
+leanOperatorRanks = {op: rank for rank, ops in leanOperatorPrecedence.items() for op in ops}
+
+# below is the pattern matching the tokens lean separates the text into
+# the operators made of several characters are broken up, since each of their characters is also padded on its own
+leanTokenPattern = re.compile(r'unary_minus|[()↔→∨∧=≠><≥≤+\-*/%¬^]|(?:(?!unary_minus)[^ ()↔→∨∧=≠><≥≤+\-*/%¬^])+')
+
+# this function collapses all sequences of spaces to a single space (the same as collapse_spaces)
+def collapseSpaces (text : str) -> str:
+    return re.sub(' +', ' ', text)
+
+# this function groups tokens into the terms split_terms would produce, where everything inside parentheses is one term
+# (as in lean, a closing parenthesis without an opening one doesn't make the count of open parentheses negative)
+def groupLeanTerms (tokens : list[str]) -> list[str]:
+    terms = []
+    depth = 0
+    for token in tokens:
+        if depth > 0:
+            terms[-1] += ' ' + token
+        else:
+            terms.append(token)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(depth - 1, 0)
+    return terms
+
+# this function replaces the minus signs that make_unary_minus_explicit treats as unary with 'unary_minus'
+# (lean looks at the last term of the whole expression rather than the term before the minus sign, which is kept here)
+def unaryMinusTerms (terms : list[str]) -> list[str]:
+    isUnary = len(terms) > 0 and terms[-1] in leanOperators
+    return ['unary_minus' if term == '-' and (termNum == 0 or isUnary) else term for termNum, term in enumerate(terms)]
+
+def makeTypeUnaryMinusExplicit (expression : str) -> str:
+    return ' '.join(unaryMinusTerms(groupLeanTerms(leanTokenPattern.findall(expression))))
+
+# this function removes the parentheses whose operators all rank above the operators outside of them
+# as in lean, each nested call is passed one less than the number of parentheses, and stops simplifying when it reaches 0
+def removeRedundantTypeParentheses (expression : str, numParentheses : int = None) -> str:
+    numParentheses = expression.count('(') if numParentheses is None else numParentheses
+    if numParentheses == 0:
+        return collapseSpaces(expression)
+    terms = unaryMinusTerms(groupLeanTerms(leanTokenPattern.findall(expression)))
+    maxExternalOperator = max([leanOperatorRanks.get(term, 0) for term in terms if not '(' in term], default=0)
+
+    output = ''
+    for term in terms:
+        if '(' in term:
+            termSimplified = removeRedundantTypeParentheses(term[2:][:-2], numParentheses - 1)
+            subTerms = groupLeanTerms(leanTokenPattern.findall(termSimplified))
+            minInternalOperator = min([leanOperatorRanks.get(subTerm, 0) for subTerm in subTerms if not '(' in subTerm
+                                       and leanOperatorRanks.get(subTerm, 0) != 0] + [len(leanOperatorPrecedence)])
+            if minInternalOperator >= maxExternalOperator:
+                output += ' ' + termSimplified
+            else:
+                output += ' (' + termSimplified + ') '
+        else:
+            output += ' ' + term
+    return collapseSpaces(output.lstrip(' ').rstrip(' ')).replace('unary_minus ', '-')
+
+
+# ---------- notation parsing ----------
+# remove_redundant_parentheses only compares the operators in the text, so it can change what a type means
+# (eg. 'f (x + y)' becomes 'f x + y'), which makes it unsafe for keying the derivation graph
+# instead the atoms of the type table are parsed with a pratt parser, using the precedence lean's notation gives each
+# operator (in the same order as operator_precedence), and printed again with only the parentheses lean needs
+# anything the parser doesn't know (eg. binders, other notation, or projections) leaves the text as it was
+
+# below are the binary operators, with their precedence and the precedence their left and right operands need
+notationOperators = {'↔': (20, 21, 21), '→': (25, 26, 25), '∨': (30, 31, 30), '∧': (35, 36, 35),
+                     '=': (50, 51, 51), '≠': (50, 51, 51), '<': (50, 51, 51), '>': (50, 51, 51), '≤': (50, 51, 51), '≥': (50, 51, 51),
+                     '+': (65, 65, 66), '-': (65, 65, 66), '*': (70, 70, 71), '/': (70, 70, 71), '%': (70, 70, 71), '^': (75, 76, 75)}
+
+# below are the prefix operators, with their precedence and the precedence their operand needs
+maxPrecedence = 1024 # names, brackets, and parenthesized terms
+applicationPrecedence = maxPrecedence - 1 # function applications, whose arguments need maxPrecedence
+prefixOperators = {'¬': (maxPrecedence, 40), '-': (75, 75)}
+
+# below are the ascii spellings of the operators
+asciiOperators = {'<->': '↔', '->': '→', '>=': '≥', '<=': '≤'}
+
+# below are the words that start notation the parser doesn't handle
+notationKeywords = {'fun', 'λ', 'let', 'have', 'show', 'from', 'if', 'then', 'else', 'match', 'with', 'do', 'by', 'at', 'in', 'calc', 'Π', 'Σ'}
+
+# below is the pattern matching a single token, brackets other than parentheses are matched separately
+notationTokenPattern = re.compile(r'(?P<space>\s+)|(?P<paren>[()])|(?P<operator><->|->|>=|<=|[↔→∨∧=≠<>≤≥+\-*/%^¬])|'
+                                  r'(?P<name>[^\W\d][\w.\'!?]*|\d+(?:\.\d+)?)|(?P<bracket>[\[{⟨⦃])')
+closingBrackets = {'[': ']', '{': '}', '⟨': '⟩', '⦃': '⦄'}
+
+# this function splits a type into (kind, text, preceded by space) tokens, or returns None if it uses unknown notation
+# brackets other than parentheses (eg. instance arguments) are kept whole as a single name token
+def tokenizeNotation (text : str) -> list[tuple[str, str, bool]] | None:
+    tokens = []
+    position = 0
+    spaced = True
+    while position < len(text):
+        match = notationTokenPattern.match(text, position)
+        if match is None:
+            return None
+        kind = match.lastgroup
+        if kind == 'space':
+            spaced = True
+            position = match.end()
+            continue
+        end = match.end()
+        if kind == 'bracket':
+            stack = [closingBrackets[text[position]]]
+            while len(stack) > 0:
+                if end >= len(text):
+                    return None
+                if text[end] in closingBrackets:
+                    stack.append(closingBrackets[text[end]])
+                elif text[end] in ')]}⟩⦄' and text[end] != stack.pop():
+                    return None
+                end += 1
+            kind = 'name'
+        token = text[position:end]
+        if kind == 'name' and token in notationKeywords:
+            return None
+        tokens.append((kind, asciiOperators.get(token, token), spaced))
+        spaced = False
+        position = end
+    return tokens
+
+# below is a class that parses tokens into a tree of ('name', text), ('app', function, argument), ('prefix', op, operand),
+# and ('binary', op, left, right) nodes, parentheses only group the tokens and aren't kept in the tree
+class NotationParser:
+    def __init__(self, tokens : list[tuple[str, str, bool]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple[str, str, bool]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else ('end', '', True)
+
+    def advance(self) -> tuple[str, str, bool]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    # this function parses a whole type, raising ValueError if it isn't a single well formed term
+    def parse(self) -> tuple:
+        tree, _ = self.parseTerm(0)
+        if self.position != len(self.tokens):
+            raise ValueError('unexpected token')
+        return tree
+
+    # this function parses a name or parenthesized term
+    def parsePrimary(self) -> tuple:
+        kind, text, _ = self.advance()
+        if kind == 'name':
+            return ('name', text)
+        if text == '(':
+            tree, _ = self.parseTerm(0)
+            if self.advance()[1] != ')':
+                raise ValueError('unclosed parenthesis')
+            return tree
+        raise ValueError('expected a term')
+
+    # this function parses the longest term whose operators all have at least the passed precedence
+    # the term and its precedence are returned
+    def parseTerm(self, minPrecedence : int) -> tuple[tuple, int]:
+        kind, text, _ = self.peek()
+        if kind == 'operator' and text in prefixOperators:
+            self.advance()
+            precedence, operandPrecedence = prefixOperators[text]
+            left, leftPrecedence = ('prefix', text, self.parseTerm(operandPrecedence)[0]), precedence
+        else:
+            left, leftPrecedence = self.parsePrimary(), maxPrecedence
+        while True:
+            kind, text, spaced = self.peek()
+            if kind == 'name' or text == '(':
+                # arguments have to be separated from the function by a space, anything else (eg. 'a[i]') is other notation
+                if not spaced:
+                    raise ValueError('unknown notation')
+                if minPrecedence > applicationPrecedence or leftPrecedence < applicationPrecedence:
+                    break
+                left, leftPrecedence = ('app', left, self.parsePrimary()), applicationPrecedence
+            elif kind == 'operator' and text in notationOperators:
+                precedence, leftOperandPrecedence, rightOperandPrecedence = notationOperators[text]
+                if precedence < minPrecedence or leftPrecedence < leftOperandPrecedence:
+                    break
+                self.advance()
+                left, leftPrecedence = ('binary', text, left, self.parseTerm(rightOperandPrecedence)[0]), precedence
+            else:
+                break
+        return left, leftPrecedence
+
+# this function returns the precedence of a parsed term
+def notationPrecedence (tree : tuple) -> int:
+    if tree[0] == 'name':
+        return maxPrecedence
+    elif tree[0] == 'app':
+        return applicationPrecedence
+    elif tree[0] == 'prefix':
+        return prefixOperators[tree[1]][0]
+    return notationOperators[tree[1]][0]
+
+# this function prints a parsed term, adding parentheses only where they are needed
+# followingPrecedence is the precedence of what comes after the term (or -1 if nothing does), since the operand of a
+# prefix operator extends as far to the right as it can
+def renderNotation (tree : tuple, requiredPrecedence : int = 0, followingPrecedence : int = -1) -> str:
+    needsParentheses = (notationPrecedence(tree) < requiredPrecedence 
+                        or (tree[0] == 'prefix' and followingPrecedence >= prefixOperators[tree[1]][1]))
+    if needsParentheses:
+        followingPrecedence = -1
+    if tree[0] == 'name':
+        text = tree[1]
+    elif tree[0] == 'app':
+        text = (renderNotation(tree[1], applicationPrecedence, maxPrecedence) + ' ' 
+                + renderNotation(tree[2], maxPrecedence, followingPrecedence))
+    elif tree[0] == 'prefix':
+        operand = renderNotation(tree[2], prefixOperators[tree[1]][1], followingPrecedence)
+        text = tree[1] + (' ' if operand.startswith('-') else '') + operand # '--' would start a comment
+    else:
+        precedence, leftOperandPrecedence, rightOperandPrecedence = notationOperators[tree[1]]
+        text = (renderNotation(tree[2], leftOperandPrecedence, precedence) + f' {tree[1]} ' 
+                + renderNotation(tree[3], rightOperandPrecedence, followingPrecedence))
+    return f'({text})' if needsParentheses else text
+
+# this function parses a type
+def parseNotation (text : str) -> tuple | None:
+    tokens = tokenizeNotation(text)
+    if tokens is None or len(tokens) == 0:
+        return None
+    try:
+        return NotationParser(tokens).parse()
+    except ValueError:
+        return None
+
+# this function removes the redundant parentheses from a type (and rewrites ascii operators and the spacing),
+# returning the type unchanged if it uses notation the parser doesn't know
+# the printed type is parsed again as a check, and is only used if it gives back the same term
+@functools.lru_cache(maxsize=2**18)
+def canonicalizeNotation (text : str) -> str:
+    tree = parseNotation(text)
+    if tree is None:
+        return text
+    canonical = renderNotation(tree)
+    return canonical if parseNotation(canonical) == tree else text
+
+
+# ---------- interned type terms ----------
+# types are parsed into a tree of logical connectives ('↔', '→', '∨', '∧') over atoms (everything else),
+# and every tree is hash-consed, so structurally identical types (and subterms) are stored once as the same TypeTerm
+# this makes types that only differ in spacing or redundant parentheses (eg. 'p → q' and '(p → q)') the same term
+# each term has a canonical text rendering, which is what the derivation graph uses to key its nodes
+
+# below are the connectives that are parsed, ranked by order of operation (the same ranking as operator_precedence in
+# LeanBackend.lean), all of them are right associative except '↔'
+connectivePrecedence = {'↔': 1, '→': 2, '∨': 3, '∧': 4}
+
+# below are the ascii spellings of the connectives
+asciiConnectives = [('<->', '↔'), ('->', '→'), ('/\\', '∧'), ('\\/', '∨')]
+
+# below is a pattern matching a binder (eg. '∀ x,'), the body of a binder extends as far to the right as possible
+binderPattern = re.compile(r'(?:(?<=^)|(?<=[\s(]))(?:∀|∃!?|λ|fun)(?=[\s({\[⦃])')
+
+# below is the placeholder used for the body of a binder while the connectives before it are parsed
+binderPlaceholder = '\x00'
+
+# below is a class used to represent a single interned type term
+class TypeTerm:
+    __slots__ = ('id', 'op', 'children', 'key')
+
+    def __init__(self, id : int, op : str | None, children : tuple, key : str):
+        self.id = id
+        self.op = op # the connective, or None for atoms
+        self.children = children # the two sides of the connective, or () for atoms
+        self.key = key # the canonical text of the term
+
+    def __repr__(self):
+        return f'TypeTerm({self.id}, {self.key!r})'
+
+# this function collapses whitespace and rewrites ascii connectives, without changing the meaning of the type
+def normalizeTypeText (text : str) -> str:
+    for ascii, unicode in asciiConnectives:
+        text = text.replace(ascii, unicode)
+    text = ' '.join(text.split())
+    return text.replace('( ', '(').replace(' )', ')')
+
+# this function removes parentheses that wrap the entire text, unless they make a tuple or type ascription
+def stripOuterParentheses (text : str) -> str:
+    while text.startswith('(') and text.endswith(')'):
+        depth = 0
+        for position, char in enumerate(text):
+            if char in '([{':
+                depth += 1
+            elif char in ')]}':
+                depth -= 1
+            elif depth == 1 and char in ',:':
+                return text
+            if depth == 0 and position < len(text) - 1:
+                return text
+        text = text[1:-1].strip()
+    return text
+
+# below is a pattern matching a binder predicate (eg. 'x y ∈ s' in '∀ x y ∈ s,'), which binds each name with a hypothesis
+binderPredicatePattern = re.compile(r'((?:[^\s()\[\]{}⦃⦄]+ )+?)(∈|∉|⊆|⊂|⊇|⊃|<|≤|>|≥|≠) (.+)')
+
+# this function strips the leading ∀ binders from the type of a theorem (eg. '∀ {n m : ℕ}, n < m → n ≤ m' -> 'n < m → n ≤ m'),
+# so that the arguments after them are split into edges like any other type, rather than the whole type being one atom
+# a binder predicate becomes a hypothesis of each name it binds (eg. '∀ x ∈ s, p x' -> '(x ∈ s) → (p x)')
+def stripLeadingBinders (text : str) -> str:
+    text = stripOuterParentheses(normalizeTypeText(text))
+    hypotheses = []
+    while text.startswith('∀') or text.startswith('Π'):
+        # the binders end at the first comma outside of brackets
+        depth = 0
+        comma = None
+        for position, char in enumerate(text):
+            if char in '([{⦃⟨':
+                depth += 1
+            elif char in ')]}⦄⟩':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                comma = position
+                break
+        if comma is None:
+            break
+        binders = text[1:comma].strip()
+        match = binderPredicatePattern.fullmatch(binders) if not binders[:1] in '([{⦃' else None
+        if match is not None:
+            hypotheses += [f'({name} {match.group(2)} {match.group(3)})' for name in match.group(1).split()]
+        text = stripOuterParentheses(text[comma+1:].strip())
+    return ' → '.join(hypotheses + [f'({text})' if len(hypotheses) > 0 else text])
+
+# below is a class that parses types into interned TypeTerms
+class TypeTable:
+    def __init__(self):
+        self.terms = {} # maps (op, child ids) or (None, atom text) to the interned term
+        self.display = {} # maps term ids to the first text the term was parsed from
+
+    def __len__(self):
+        return len(self.terms)
+
+    # this function returns the interned atom with the passed (normalized) text
+    # the redundant parentheses inside of the atom are removed first (see canonicalizeNotation)
+    def atom(self, text : str) -> TypeTerm:
+        text = canonicalizeNotation(text)
+        signature = (None, text)
+        term = self.terms.get(signature, None)
+        if term is None:
+            term = TypeTerm(len(self.terms), None, (), sys.intern(text))
+            self.terms[signature] = term
+        return term
+
+    # this function returns the interned term joining the two passed terms with a connective
+    def join(self, op : str, left : TypeTerm, right : TypeTerm) -> TypeTerm:
+        signature = (op, left.id, right.id)
+        term = self.terms.get(signature, None)
+        if term is None:
+            term = TypeTerm(len(self.terms), op, (left, right), 
+                            sys.intern(f'{self.renderChild(op, left, True)} {op} {self.renderChild(op, right, False)}'))
+            self.terms[signature] = term
+        return term
+
+    # this function joins a list of terms with a right associative connective (eg. [p, q, r] -> 'p ∧ q ∧ r')
+    def joinAll(self, op : str, terms : list[TypeTerm]) -> TypeTerm:
+        term = terms[-1]
+        for left in reversed(terms[:-1]):
+            term = self.join(op, left, term)
+        return term
+
+    # this function renders one side of a connective, adding parentheses only if they are needed
+    # the body of a binder extends as far right as it can, so a left operand with a top level binder anywhere in its text
+    # (eg. 'Monotone fun x => f x', or 'p ∧ ∀ x, q x') is always parenthesized, otherwise it would take in the rest of the term
+    def renderChild(self, op : str, child : TypeTerm, isLeft : bool) -> str:
+        if child.op is None:
+            needsParentheses = False
+        else:
+            childPrecedence, precedence = connectivePrecedence[child.op], connectivePrecedence[op]
+            needsParentheses = childPrecedence < precedence or (childPrecedence == precedence and (isLeft or op == '↔'))
+        if not needsParentheses and isLeft:
+            needsParentheses = self.findTopLevelBinder(child.key) is not None
+        return f'({child.key})' if needsParentheses else child.key
+
+    # this function parses a type into an interned term, remembering the text it was first parsed from
+    def parse(self, text : str) -> TypeTerm:
+        term = self.parseNormalized(normalizeTypeText(text))
+        if not term.id in self.display:
+            self.display[term.id] = text
+        return term
+
+    def parseNormalized(self, text : str) -> TypeTerm:
+        text = stripOuterParentheses(text)
+        # the body of the first top level binder belongs to the rightmost operand, so it is parsed on its own
+        binder = self.findTopLevelBinder(text)
+        if binder is not None and binder > 0:
+            return self.substituteBinder(self.parseNormalized(text[:binder] + binderPlaceholder), self.atom(text[binder:]))
+        elif binder == 0:
+            return self.atom(text)
+        # split by the connective with the lowest precedence that appears at the top level
+        for op in connectivePrecedence:
+            if op in text:
+                parts = splitTypeTerms(text, op)
+                if len(parts) > 1 and all(part.strip() for part in parts) and not (op == '↔' and len(parts) > 2):
+                    return self.joinAll(op, [self.parseNormalized(part.strip()) for part in parts])
+        return self.atom(text)
+
+    # this function finds the start of the first binder that isn't inside of brackets
+    def findTopLevelBinder(self, text : str) -> int | None:
+        for match in binderPattern.finditer(text):
+            prefix = text[:match.start()]
+            if (prefix.count('(') + prefix.count('[') + prefix.count('{') 
+                    == prefix.count(')') + prefix.count(']') + prefix.count('}')):
+                return match.start()
+        return None
+
+    # this function replaces the binder placeholder in a parsed term with the parsed binder
+    def substituteBinder(self, term : TypeTerm, binder : TypeTerm) -> TypeTerm:
+        if term.op is None:
+            return binder if term.key == binderPlaceholder else self.atom(term.key.replace(binderPlaceholder, binder.key))
+        left, right = term.children
+        return self.join(term.op, left, self.substituteBinder(right, binder))
+
+    # this function splits a chain of implications into its arguments and output (eg. 'p → q → r' -> [p, q], r)
+    def arrowSpine(self, term : TypeTerm) -> tuple[list[TypeTerm], TypeTerm]:
+        arguments = []
+        while term.op == '→':
+            arguments.append(term.children[0])
+            term = term.children[1]
+        return arguments, term